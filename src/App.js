@@ -8,6 +8,8 @@ import CreatureData from './CreatureData';
 const NUM_SENSORY_NEURONS = 21;
 const NUM_INTERNAL_NEURONS = 4;
 const NUM_ACTION_NEURONS = 16;
+// Largest frame the server sends; bigger worlds are downsampled to fit
+const MAP_RESOLUTION = 256;
 
 function App() {
   const [simulationStarted, setSimulationStarted] = useState(false);
@@ -27,6 +29,7 @@ function App() {
     steps_per_generation: 100,
   });
   const eventSourceRef = useRef(null);
+  const sessionIdRef = useRef(null);
 
   const handleParamChange = (e) => {
     setSimulationParams({
@@ -41,23 +44,31 @@ function App() {
       headers: {
         'Content-Type': 'application/json',
       },
-      body: JSON.stringify(simulationParams),
+      // Reuse this page's session, so a restart does not take up another one
+      body: JSON.stringify(sessionIdRef.current ? { ...simulationParams, session_id: sessionIdRef.current } : simulationParams),
     })
     .then(response => response.json())
     .then(data => {
       console.log('Simulation started:', data);
+      if (data.error) {
+        throw new Error(data.error);
+      }
+      sessionIdRef.current = data.session_id;
       setSimulationStatus('running');
       setSimulationStarted(true);
       startEventSource();
     })
     .catch((error) => {
       console.error('Error:', error);
+      sessionIdRef.current = null;  // The session may have been evicted; the next start opens a new one
       setError('Failed to start simulation. Please try again.');
     });
   };
 
   const startEventSource = () => {
-    eventSourceRef.current = new EventSource('/api/simulation-data');
+    eventSourceRef.current = new EventSource(
+      `/api/simulation-data?format=delta&session=${sessionIdRef.current}&resolution=${MAP_RESOLUTION},${MAP_RESOLUTION}`
+    );
     eventSourceRef.current.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
@@ -78,6 +89,16 @@ function App() {
     };
   };
 
+  const resyncStream = (streamId) => {
+    fetch('/api/simulation-data/resync', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ stream_id: streamId }),
+    }).catch((error) => console.error('Resync failed:', error));
+  };
+
   const resetSimulation = () => {
     if (eventSourceRef.current) {
       eventSourceRef.current.close();
@@ -164,7 +185,7 @@ function App() {
           </div>
         ) : (
           <div style={{ display: 'flex', flexDirection: 'column', alignItems: 'center', width: '100%', maxWidth: '800px', margin: '0 auto' }}>
-            <WorldMap worldState={simulationData.world_state} />
+            <WorldMap worldState={simulationData.world_state} onResync={resyncStream} />
             {simulationStatus === 'over' && (
               <div style={{
                 color: 'red',
@@ -1,13 +1,89 @@
 import React, { useRef, useEffect } from 'react';
 
-const WorldMap = ({ worldState }) => {
+const decodeBase64 = (data) => {
+  const binary = atob(data);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+  return bytes;
+};
+
+const WorldMap = ({ worldState, onResync }) => {
   const canvasRef = useRef(null);
+  const deltaFrameRef = useRef(null);
+  const resyncPendingRef = useRef(false);
 
   useEffect(() => {
-    if (!worldState || !Array.isArray(worldState) || worldState.length === 0) return;
+    if (!worldState) return;
 
     const canvas = canvasRef.current;
     const ctx = canvas.getContext('2d');
+
+    // Encoded frames carry their size, which follows the requested resolution
+    if (worldState.width && worldState.height &&
+        (canvas.width !== worldState.width || canvas.height !== worldState.height)) {
+      canvas.width = worldState.width;
+      canvas.height = worldState.height;
+    }
+
+    // Delta stream: keep the last frame and patch changed cells into it
+    if (worldState.format === 'delta') {
+      const last = deltaFrameRef.current;
+      if (worldState.type === 'key') {
+        const rgb = decodeBase64(worldState.data);
+        const imageData = ctx.createImageData(worldState.width, worldState.height);
+        for (let p = 0, i = 0; p < rgb.length; p += 3, i += 4) {
+          imageData.data[i] = rgb[p];
+          imageData.data[i + 1] = rgb[p + 1];
+          imageData.data[i + 2] = rgb[p + 2];
+          imageData.data[i + 3] = 255;
+        }
+        deltaFrameRef.current = { imageData, frame: worldState.frame };
+        resyncPendingRef.current = false;
+      } else if (!last || last.frame !== worldState.base) {
+        // Missed a frame: ask the server for a fresh keyframe, once per gap
+        deltaFrameRef.current = null;
+        if (onResync && !resyncPendingRef.current) {
+          resyncPendingRef.current = true;
+          onResync(worldState.stream_id);
+        }
+        return;
+      } else {
+        const cells = new Uint32Array(decodeBase64(worldState.cells).buffer);
+        const colors = decodeBase64(worldState.colors);
+        for (let c = 0; c < cells.length; c++) {
+          const i = cells[c] * 4;
+          last.imageData.data[i] = colors[c * 3];
+          last.imageData.data[i + 1] = colors[c * 3 + 1];
+          last.imageData.data[i + 2] = colors[c * 3 + 2];
+        }
+        last.frame = worldState.frame;
+      }
+      ctx.putImageData(deltaFrameRef.current.imageData, 0, 0);
+      return;
+    }
+
+    // Encoded frames: base64 PNG or raw base64 RGB
+    if (worldState.format === 'png') {
+      const image = new Image();
+      image.onload = () => ctx.drawImage(image, 0, 0);
+      image.src = `data:image/png;base64,${worldState.data}`;
+      return;
+    }
+    if (worldState.format === 'rgb') {
+      const bytes = atob(worldState.data);
+      const imageData = ctx.createImageData(worldState.width, worldState.height);
+      for (let p = 0, i = 0; p < bytes.length; p += 3, i += 4) {
+        imageData.data[i] = bytes.charCodeAt(p);         // Red
+        imageData.data[i + 1] = bytes.charCodeAt(p + 1); // Green
+        imageData.data[i + 2] = bytes.charCodeAt(p + 2); // Blue
+        imageData.data[i + 3] = 255;                     // Alpha
+      }
+      ctx.putImageData(imageData, 0, 0);
+      return;
+    }
+
+    // Legacy nested-list frame
+    if (!Array.isArray(worldState) || worldState.length === 0) return;
     const imageData = ctx.createImageData(128, 128);
 
     for (let y = 0; y < 128; y++) {
@@ -28,7 +104,7 @@ const WorldMap = ({ worldState }) => {
     }
 
     ctx.putImageData(imageData, 0, 0);
-  }, [worldState]);
+  }, [worldState, onResync]);
 
   return (
     <div style={{
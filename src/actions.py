@@ -0,0 +1,40 @@
+# actions.py
+
+import numpy as np
+from .creature import Creature
+from .sensing import DIRECTION_VECTORS
+
+# Columns of the brain output matrix, in Creature.ACTION_NEURONS order
+(MOVE_X, MOVE_Y, MOVE_FORWARD, MOVE_RL, MOVE_RANDOM, SET_OSCILLATOR_PERIOD, SET_LONGPROBE_DIST,
+ SET_RESPONSIVENESS, EMIT_SIGNAL0, MOVE_EAST, MOVE_WEST, MOVE_NORTH, MOVE_SOUTH, MOVE_LEFT,
+ MOVE_RIGHT, MOVE_REVERSE) = range(len(Creature.ACTION_NEURONS))
+
+def action_targets(x, y, direction, outputs, rng, width, height):
+    # Cell each creature tries to reach: one step forward, a random neighbor,
+    # or the MOVE_X / MOVE_Y step, in that order of precedence
+    forward = outputs[:, MOVE_FORWARD] > 0.5
+    random = ~forward & (outputs[:, MOVE_RANDOM] > 0.5)
+    dx = np.clip(outputs[:, MOVE_X] * 3, -1, 1).astype(np.int64)  # Truncates like int()
+    dy = np.clip(outputs[:, MOVE_Y] * 3, -1, 1).astype(np.int64)
+    dx[forward] = DIRECTION_VECTORS[direction[forward], 0]
+    dy[forward] = DIRECTION_VECTORS[direction[forward], 1]
+    steps = rng.integers(-1, 2, (int(np.count_nonzero(random)), 2))
+    dx[random] = steps[:, 0]
+    dy[random] = steps[:, 1]
+    return (x + dx) % width, (y + dy) % height
+
+def resolve_collisions(cells, targets, moving):
+    # Movers may not enter a cell where a creature stays, and of several movers
+    # entering the same cell the lowest row wins. Blocked movers stay where they
+    # are, which can block others in turn, so this repeats until nothing changes;
+    # every round only removes movers, so it ends.
+    moving = moving.copy()
+    while True:
+        blocked = np.isin(targets, cells[~moving])
+        candidates = np.flatnonzero(moving & ~blocked)
+        _, first = np.unique(targets[candidates], return_index=True)
+        allowed = np.zeros_like(moving)
+        allowed[candidates[first]] = True
+        if np.array_equal(allowed, moving):
+            return moving
+        moving = allowed
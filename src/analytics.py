@@ -0,0 +1,130 @@
+# analytics.py
+
+import numpy as np
+from .genome import decode_fields
+from .config import GENOME_CLUSTERS
+
+GENE_FIELDS = ('source_type', 'source_num', 'sink_type', 'sink_num', 'weight')
+FIELD_BITS = (1, 7, 1, 7, 16)
+WEIGHT_OFFSET = 1 << 15  # Shifts int16 weights to unsigned histogram bins
+RADIX_BITS = 8
+
+def column_histograms(codes, bins, mask=None):
+    # Per-column value counts of non-negative integer codes, shape (columns, bins)
+    columns = codes.shape[1]
+    keys = codes + np.arange(columns, dtype=np.int64) * bins
+    keys = keys.ravel() if mask is None else keys[mask]
+    return np.bincount(keys, minlength=columns * bins).reshape(columns, bins)
+
+def locate(cumulative, ranks):
+    # Bin holding each column's zero-based rank, and the rank left within that bin
+    value = np.argmax(cumulative > ranks[:, None], axis=1)
+    below = np.where(value > 0, cumulative[np.arange(len(value)), value - 1], 0)
+    return value, ranks - below
+
+def select_ranks(codes, bits, ranks):
+    # Per-column values at each of `ranks` in sorted order, found by counting
+    # rather than sorting. Codes wider than RADIX_BITS (up to twice that) take a
+    # second pass over the low digit, counting only rows in the selected bucket.
+    codes = np.asarray(codes, dtype=np.int64)
+    if bits <= RADIX_BITS:
+        cumulative = np.cumsum(column_histograms(codes, 1 << bits), axis=1)
+        return [locate(cumulative, rank)[0] for rank in ranks]
+    shift = bits - RADIX_BITS
+    high, low = codes >> shift, codes & ((1 << shift) - 1)
+    cumulative = np.cumsum(column_histograms(high, 1 << RADIX_BITS), axis=1)
+    inner = {}  # Ranks in the same buckets share the second pass
+    selected = []
+    for rank in ranks:
+        bucket, rest = locate(cumulative, rank)
+        key = bucket.tobytes()
+        if key not in inner:
+            inner[key] = np.cumsum(column_histograms(low, 1 << shift, high == bucket), axis=1)
+        selected.append(bucket << shift | locate(inner[key], rest)[0])
+    return selected
+
+def field_medians(genomes):
+    # Per-locus medians of each decoded gene field, truncated like int(np.median(...))
+    genomes = np.asarray(genomes, dtype=np.uint32)
+    count, loci = genomes.shape
+    low = np.full(loci, (count - 1) // 2)
+    high = np.full(loci, count // 2)
+    medians = []
+    for name, bits, field in zip(GENE_FIELDS, FIELD_BITS, decode_fields(genomes)):
+        offset = WEIGHT_OFFSET if name == 'weight' else 0
+        codes = field.astype(np.int64) + offset
+        lower, upper = select_ranks(codes, bits, (low, high))
+        medians.append(np.trunc((lower + upper - 2 * offset) / 2).astype(np.int64))
+    return medians
+
+def median_genes(genomes):
+    # The median genome as Gene.__dict__ records
+    source_type, source_num, sink_type, sink_num, weight = field_medians(genomes)
+    gene_value = ((source_type & 0x1) << 31 | (source_num & 0x7F) << 24 | (sink_type & 0x1) << 23 |
+                  (sink_num & 0x7F) << 16 | (weight & 0xFFFF))
+    return [
+        {'gene_value': value, 'source_type': st, 'source_num': sn, 'sink_type': kt, 'sink_num': kn, 'weight': w}
+        for value, st, sn, kt, kn, w in zip(gene_value.tolist(), source_type.tolist(), source_num.tolist(),
+                                            sink_type.tolist(), sink_num.tolist(), weight.tolist())
+    ]
+
+def locus_diversity(genomes):
+    # Distinct wirings, Shannon entropy (bits) and share of the most common
+    # wiring at each locus, plus the spread of the raw weights
+    genomes = np.asarray(genomes, dtype=np.uint32)
+    count, loci = genomes.shape
+    keys = (np.arange(loci, dtype=np.int64) << 16) | (genomes >> 16).astype(np.int64)
+    values, counts = np.unique(keys.ravel(), return_counts=True)
+    locus = values >> 16
+    share = counts / count
+    starts = np.flatnonzero(np.r_[True, locus[1:] != locus[:-1]])
+    weights = decode_fields(genomes)[4].astype(np.float64)
+    return {
+        'distinct_topologies': np.bincount(locus, minlength=loci).tolist(),
+        'topology_entropy': np.bincount(locus, weights=-share * np.log2(share), minlength=loci).tolist(),
+        'dominant_share': np.maximum.reduceat(share, starts).tolist(),
+        'weight_std': weights.std(axis=0).tolist(),
+    }
+
+def topology_clusters(genomes, ids, top=GENOME_CLUSTERS):
+    # Largest groups of genomes wired identically at every locus (weights ignored)
+    genomes = np.asarray(genomes, dtype=np.uint32)
+    count, loci = genomes.shape
+    topology = np.ascontiguousarray(genomes >> 16, dtype=np.uint16)
+    rows = topology.view(np.dtype((np.void, topology.itemsize * loci))).ravel()
+    _, first, sizes = np.unique(rows, return_index=True, return_counts=True)
+    # Largest first, ties broken by the earliest member
+    order = np.lexsort((first, -sizes))[:top]
+    return [{
+        'size': int(sizes[cluster]),
+        'share': float(sizes[cluster] / count),
+        'creature': int(ids[first[cluster]]),
+        'topology': topology[first[cluster]].tolist(),
+    } for cluster in order]
+
+def genome_summary(genomes, ids):
+    genomes = np.asarray(genomes, dtype=np.uint32)
+    if len(genomes) == 0:
+        return {'population': 0, 'median_genome': [], 'diversity': {}, 'clusters': []}
+    return {
+        'population': len(genomes),
+        'median_genome': median_genes(genomes),
+        'diversity': locus_diversity(genomes),
+        'clusters': topology_clusters(genomes, ids),
+    }
+
+class GenomeAnalytics:
+    # Genome summary of a world, recomputed at most once every `interval` steps
+    # and served from cache in between
+    def __init__(self, interval):
+        self.interval = max(1, int(interval))
+        self.step = None
+        self.summary = None
+
+    def get(self, world):
+        step = world.step_count
+        stale = self.summary is None or step < self.step or step - self.step >= self.interval
+        if stale or (len(world.population) == 0) != (self.summary['population'] == 0):
+            self.summary = genome_summary(world.population.genomes, world.population.id)
+            self.step = step
+        return self.summary
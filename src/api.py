@@ -3,54 +3,224 @@
 from flask import Flask, jsonify, Response, request
 from flask_cors import CORS
 import json
-from .simulation import simulation
+import os
+import struct
+import time
+from .sessions import sessions, SessionLimitError
+from .checkpoint import checkpoint_path
+from .config import FRAME_FORMATS, DEFAULT_FRAME_FORMAT
+from .frames import DeltaFrameEncoder
+from .render import Viewport
+from .events import EVENT_TYPES
+from .metrics import metrics
 import logging
 from .utils import setup_logging
 import sys
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)
 
+# Open delta streams by stream_id, so clients can ask for a fresh keyframe
+delta_streams = {}
+
+def requested_session():
+    # The session named by ?session=<id> or a "session_id" body field; requests
+    # naming none go to the newest session. Returns (session, error, status).
+    session_id = request.args.get('session') or (request.get_json(silent=True) or {}).get('session_id')
+    session = sessions.get(session_id)
+    if session is not None:
+        return session, None, 200
+    if session_id is None:
+        return None, {"error": "Simulation not started"}, 400
+    return None, {"error": f"Unknown session '{session_id}'"}, 404
+
 @app.route('/api/start-simulation', methods=['POST'])
 def start_simulation():
     try:
-        params = request.json if request.json else {}
-        simulation.start_simulation(params)
-        return jsonify({"message": "Simulation started successfully", "params": simulation.params}), 200
+        params = dict(request.json) if request.json else {}
+        # Naming a session restarts its world; otherwise a new session is created
+        session_id = params.pop('session_id', None)
+        session = None
+        if session_id is not None:
+            session = sessions.get(session_id)
+            if session is None:
+                return jsonify({"error": f"Unknown session '{session_id}'"}), 404
+        session = sessions.start(params, session)
+        return jsonify({"message": "Simulation started successfully", "session_id": session.id,
+                        "params": session.params}), 200
+    except SessionLimitError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         logger.error(f"Failed to start simulation: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/sessions')
+def list_sessions():
+    return jsonify({"sessions": sessions.describe(), "max_sessions": sessions.max_sessions}), 200
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    if not sessions.close(session_id):
+        return jsonify({"error": f"Unknown session '{session_id}'"}), 404
+    return jsonify({"message": "Session closed", "session_id": session_id}), 200
+
+def binary_message(data):
+    # Length-prefixed JSON metadata followed by the raw RGB frame
+    frame = data.pop('world_state', b'')
+    meta = json.dumps(data).encode('utf-8')
+    return struct.pack('>II', len(meta), len(frame)) + meta + frame
+
 @app.route('/api/simulation-data')
 def simulation_data():
+    frame_format = request.args.get('format', DEFAULT_FRAME_FORMAT)
+    if frame_format not in FRAME_FORMATS:
+        return jsonify({"error": f"Unknown format '{frame_format}', expected one of {list(FRAME_FORMATS)}"}), 400
+    try:
+        # Optional ?viewport=x,y,width,height&resolution=width,height&pooling=max|mean
+        viewport = Viewport.parse(request.args.get('viewport'), request.args.get('resolution'),
+                                  request.args.get('pooling'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    binary = frame_format == 'binary'
+    encoder = DeltaFrameEncoder() if frame_format == 'delta' else None
+    session, error, _ = requested_session()
+
     def generate():
-        if simulation.world is None:
-            yield f"data: {json.dumps({'error': 'Simulation not started'})}\n\n"
+        if session is None:
+            yield binary_message(error) if binary else f"data: {json.dumps(error)}\n\n"
             return
-        while True:
-            try:
-                simulation.run_step()
-                data = simulation.get_simulation_data()
-                logger.info(f"Sending data: {data}")
-                yield f"data: {json.dumps(data)}\n\n"
-                
-                if data['isSimulationOver']:
+        if encoder is not None:
+            delta_streams[encoder.stream_id] = encoder
+        try:
+            # Frames come from the session's worker; viewers never step the world
+            for frame in session.subscribe():
+                if frame is None:
+                    if not binary:
+                        yield ": keepalive\n\n"
+                    continue
+                try:
+                    data = frame.data(frame_format, encoder, viewport)
+                    if binary:
+                        yield binary_message(data)
+                    else:
+                        started = time.perf_counter()
+                        message = json.dumps(data)
+                        metrics.observe('json_encoding', time.perf_counter() - started)
+                        yield f"data: {message}\n\n"
+                except Exception as e:
+                    error_message = f"Error in simulation_data: {str(e)}"
+                    logger.error(error_message, exc_info=True)
+                    error = {'error': error_message}
+                    yield binary_message(error) if binary else f"data: {json.dumps(error)}\n\n"
+                    break
+                if frame.is_over or frame.error is not None:
                     break
-            except Exception as e:
-                error_message = f"Error in simulation_data: {str(e)}"
-                logger.error(error_message, exc_info=True)
-                yield f"data: {json.dumps({'error': error_message})}\n\n"
-                break
-            sys.stdout.flush()
-    return Response(generate(), mimetype='text/event-stream')
+                sys.stdout.flush()
+        finally:
+            if encoder is not None:
+                delta_streams.pop(encoder.stream_id, None)
+    mimetype = 'application/octet-stream' if binary else 'text/event-stream'
+    return Response(generate(), mimetype=mimetype)
+
+@app.route('/api/simulation-data/resync', methods=['POST'])
+def resync_stream():
+    stream_id = (request.json or {}).get('stream_id')
+    encoder = delta_streams.get(stream_id)
+    if encoder is None:
+        return jsonify({"error": f"Unknown stream '{stream_id}'"}), 404
+    encoder.request_resync()
+    return jsonify({"message": "Keyframe will be sent with the next frame", "stream_id": stream_id}), 200
+
+@app.route('/api/checkpoint', methods=['POST'])
+def save_checkpoint():
+    session, error, status = requested_session()
+    if session is None:
+        return jsonify(error), status
+    try:
+        name = (request.get_json(silent=True) or {}).get('name')
+        saved = session.call('checkpoint', name)
+        return jsonify({"message": "Checkpoint saved", **saved}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Failed to save checkpoint: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/restore', methods=['POST'])
+def restore_checkpoint():
+    session, error, status = requested_session()
+    if session is None:
+        return jsonify(error), status
+    try:
+        body = request.get_json(silent=True) or {}
+        path = checkpoint_path(body.get('name'))
+        if not os.path.exists(path):
+            return jsonify({"error": f"Unknown checkpoint '{body.get('name')}'"}), 404
+        # Optional params fork the restored world, e.g. a different mutation pressure
+        restored = session.call('restore', path, body.get('params') or {})
+        session.params = restored['params']
+        return jsonify({"message": "Checkpoint restored", "name": os.path.basename(path), **restored}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Failed to restore checkpoint: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/events')
+def recent_events():
+    session, error, status = requested_session()
+    if session is None:
+        return jsonify(error), status
+    event_type = request.args.get('type')
+    if event_type is not None and event_type not in EVENT_TYPES:
+        return jsonify({"error": f"Unknown event type '{event_type}', expected one of {list(EVENT_TYPES)}"}), 400
+    try:
+        events = session.call('events', request.args.get('limit', 100, type=int), event_type)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if events is None:
+        return jsonify({"error": "Event log is disabled, start the simulation with \"event_log\": true"}), 404
+    return jsonify(events), 200
+
+@app.route('/api/genomes')
+def genome_stats():
+    session, error, status = requested_session()
+    if session is None:
+        return jsonify(error), status
+    try:
+        return jsonify(session.call('genomes')), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/metrics')
+def get_metrics():
+    # JSON by default; ?format=prometheus gives the Prometheus text exposition format.
+    # With ?session=<id> the step metrics of that session's worker, otherwise
+    # the frame encoding metrics of this server and the list of sessions.
+    prometheus = request.args.get('format') == 'prometheus'
+    if request.args.get('session') is not None:
+        session, error, status = requested_session()
+        if session is None:
+            return jsonify(error), status
+        report = session.call('metrics', prometheus)
+        if prometheus:
+            return Response(report, mimetype='text/plain; version=0.0.4')
+        return jsonify(report), 200
+    if prometheus:
+        return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+    snapshot = metrics.snapshot()
+    snapshot['sessions'] = sessions.describe()
+    return jsonify(snapshot), 200
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
     return jsonify({"message": "Backend is working"}), 200
 
 if __name__ == "__main__":
+    # Only here: session workers are spawned processes that re-import this module,
+    # and each would otherwise open a log file of its own
+    setup_logging()
     logger.info("Starting the Flask application")
     app.run(debug=False, threaded=True, port=5000)
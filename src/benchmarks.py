@@ -0,0 +1,259 @@
+# benchmarks.py
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+from .world import World
+from .creature import Creature
+from .brain import BrainBatch, brain_cache
+from .analytics import genome_summary
+from .render import Viewport
+from .config import NUM_SENSORY_NEURONS, DEFAULT_NUM_GENES
+
+DEFAULT_SEED = 1234
+DEFAULT_THRESHOLD = 0.10  # Relative slowdown of the median that counts as a regression
+
+class Benchmark:
+    # `setup(seed, **params)` builds fresh state outside the timer and `run(state)`
+    # is timed; `ops` is the work per run, so results also read as ops/second.
+    def __init__(self, name, setup, run, params, ops=1, quick=False):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.params = params
+        self.ops = ops
+        self.quick = quick
+
+    @property
+    def key(self):
+        args = ','.join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{args}]" if args else self.name
+
+def make_world(population, grid, seed):
+    return World(grid, grid, population, {'seed': seed})
+
+def setup_world_update(seed, population, grid, steps):
+    world = make_world(population, grid, seed)
+    return world, steps
+
+def run_world_update(state):
+    world, steps = state
+    for _ in range(steps):
+        world.update()
+
+def setup_predict(seed, creatures):
+    rng = np.random.default_rng(seed)
+    population = [Creature(0, 0, 0, DEFAULT_NUM_GENES, rng=rng) for _ in range(creatures)]
+    inputs = rng.random((creatures, NUM_SENSORY_NEURONS))
+    return population, inputs
+
+def run_predict(state):
+    population, inputs = state
+    for creature, row in zip(population, inputs):
+        creature.predict(row)
+
+def setup_batch_predict(seed, creatures):
+    world = make_world(creatures, 256, seed)
+    return world.population.brain_arrays, np.random.default_rng(seed).random((creatures, NUM_SENSORY_NEURONS))
+
+def run_batch_predict(state):
+    packed, inputs = state
+    BrainBatch(packed).predict(inputs)
+
+def setup_world_state_json(seed, population, grid):
+    world = make_world(population, grid, seed)
+    for _ in range(5):
+        world.update()
+    return world
+
+def run_world_state_json(world):
+    json.dumps({'stats': world.get_stats(), 'world_state': world.get_world_state()})
+
+def setup_render_viewport(seed, population, grid, resolution):
+    world = make_world(population, grid, seed)
+    for _ in range(5):
+        world.update()
+    return world.render_snapshot(), Viewport(resolution=(resolution, resolution))
+
+def run_render_viewport(state):
+    snapshot, viewport = state
+    snapshot.render(viewport)
+
+def setup_end_generation(seed, population, grid):
+    world = make_world(population, grid, seed)
+    world.population.energy = np.random.default_rng(seed).uniform(0, 1000, len(world.population))
+    return world
+
+def run_end_generation(world):
+    world.end_generation()
+
+def setup_median_genome(seed, population):
+    return make_world(population, 256, seed)
+
+def run_median_genome(world):
+    world.get_median_genome()
+
+def setup_genome_summary(seed, population):
+    world = make_world(population, 256, seed)
+    return world.population.genomes, world.population.id
+
+def run_genome_summary(state):
+    genome_summary(*state)
+
+def build_suite():
+    suite = []
+    for population in (100, 1000, 10000):
+        for grid in (64, 256, 1024):
+            steps = 10 if population <= 1000 else 2
+            suite.append(Benchmark('world_update', setup_world_update, run_world_update,
+                                   {'population': population, 'grid': grid, 'steps': steps},
+                                   ops=steps, quick=population <= 1000 and grid <= 256))
+    for creatures in (100, 1000):
+        suite.append(Benchmark('creature_predict', setup_predict, run_predict,
+                               {'creatures': creatures}, ops=creatures, quick=creatures == 100))
+    for creatures in (1000, 10000):
+        suite.append(Benchmark('batch_predict', setup_batch_predict, run_batch_predict,
+                               {'creatures': creatures}, ops=creatures, quick=creatures == 1000))
+    for grid in (128, 512):
+        suite.append(Benchmark('world_state_json', setup_world_state_json, run_world_state_json,
+                               {'population': 1000, 'grid': grid}, quick=grid == 128))
+    for grid in (512, 2048):
+        suite.append(Benchmark('render_viewport', setup_render_viewport, run_render_viewport,
+                               {'population': 10000, 'grid': grid, 'resolution': 256}, quick=grid == 512))
+    for population in (1000, 10000):
+        suite.append(Benchmark('end_generation', setup_end_generation, run_end_generation,
+                               {'population': population, 'grid': 256}, quick=population == 1000))
+    for population in (1000, 10000):
+        suite.append(Benchmark('median_genome', setup_median_genome, run_median_genome,
+                               {'population': population}, quick=population == 1000))
+    for population in (1000, 10000):
+        suite.append(Benchmark('genome_summary', setup_genome_summary, run_genome_summary,
+                               {'population': population}, quick=population == 1000))
+    return suite
+
+def measure(benchmark, repeat, seed):
+    # Every repeat starts from the same seeded state, so runs are comparable
+    timings = []
+    for _ in range(repeat):
+        brain_cache.clear()
+        state = benchmark.setup(seed, **benchmark.params)
+        started = time.perf_counter()
+        benchmark.run(state)
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        'name': benchmark.name,
+        'params': benchmark.params,
+        'repeat': repeat,
+        'min': min(timings),
+        'median': median,
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'ops': benchmark.ops,
+        'ops_per_second': benchmark.ops / median if median > 0 else 0.0,
+        'timings': timings,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment(seed, repeat):
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'seed': seed,
+        'repeat': repeat,
+    }
+
+def run_suite(benchmarks, repeat=3, seed=DEFAULT_SEED, on_result=None):
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.key] = measure(benchmark, repeat, seed)
+        if on_result is not None:
+            on_result(benchmark.key, results[benchmark.key])
+    return {'environment': environment(seed, repeat), 'results': results}
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    # Median time ratio per benchmark present in both reports
+    comparison = {}
+    for key, result in report['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if previous is None or previous['median'] <= 0:
+            continue
+        ratio = result['median'] / previous['median']
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'unchanged'
+        comparison[key] = {'baseline': previous['median'], 'current': result['median'],
+                           'ratio': ratio, 'status': status}
+    return comparison
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Seeded benchmarks for the Enki simulation core.")
+    parser.add_argument('--quick', action='store_true', help="only the small cases")
+    parser.add_argument('--filter', action='append', default=[],
+                        help="run benchmarks whose key contains this text; may be repeated")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', help="write the JSON report here")
+    parser.add_argument('--compare', help="baseline JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown that counts as a regression")
+    parser.add_argument('--list', action='store_true', help="list benchmark keys and exit")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    suite = build_suite()
+    if args.quick:
+        suite = [benchmark for benchmark in suite if benchmark.quick]
+    if args.filter:
+        suite = [benchmark for benchmark in suite if any(text in benchmark.key for text in args.filter)]
+    if args.list:
+        for benchmark in suite:
+            print(benchmark.key)
+        return 0
+
+    def report_result(key, result):
+        print(f"{key:<60}{result['median'] * 1000:>12.3f} ms{result['ops_per_second']:>14.1f} ops/s", flush=True)
+
+    report = run_suite(suite, max(1, args.repeat), args.seed, report_result)
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report['comparison'] = compare(report, baseline, args.threshold)
+        print()
+        for key, entry in report['comparison'].items():
+            print(f"{key:<60}{entry['ratio']:>8.2f}x  {entry['status']}")
+        regressions = sum(entry['status'] == 'regression' for entry in report['comparison'].values())
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# brain.py
+
+import numpy as np
+from collections import OrderedDict
+from .config import NUM_SENSORY_NEURONS, NUM_ACTION_NEURONS, BRAIN_CACHE_SIZE
+from .genome import decode_fields
+
+SENSOR = 1
+INTERNAL = 0
+
+class CompiledBrain:
+    def __init__(self, num_neurons, bias, driven, sensor_internal, sensor_action, internal_action):
+        self.num_neurons = num_neurons
+        self.bias = bias
+        self.driven = driven
+        # Each edge set is a (source, sink, weight) triple of arrays
+        self.si_src, self.si_dst, self.si_weight = sensor_internal
+        self.sa_src, self.sa_dst, self.sa_weight = sensor_action
+        self.ia_src, self.ia_dst, self.ia_weight = internal_action
+        # Compiled brains are shared between creatures with identical genomes
+        for array in (self.bias, self.driven, self.si_src, self.si_dst, self.si_weight,
+                      self.sa_src, self.sa_dst, self.sa_weight,
+                      self.ia_src, self.ia_dst, self.ia_weight):
+            if array.flags.writeable:  # Views of read-only arrays already are
+                array.flags.writeable = False
+
+    @property
+    def num_connections(self):
+        return len(self.si_src) + len(self.sa_src) + len(self.ia_src)
+
+    def predict(self, inputs):
+        internal = self.bias + np.bincount(self.si_dst, weights=inputs[self.si_src] * self.si_weight,
+                                           minlength=self.num_neurons)
+        internal = np.where(self.driven, np.tanh(internal), internal)
+        actions = np.zeros(NUM_ACTION_NEURONS)
+        actions += np.bincount(self.sa_dst, weights=inputs[self.sa_src] * self.sa_weight,
+                               minlength=NUM_ACTION_NEURONS)
+        actions += np.bincount(self.ia_dst, weights=internal[self.ia_src] * self.ia_weight,
+                               minlength=NUM_ACTION_NEURONS)
+        return np.tanh(actions)
+
+def edge_arrays(edges):
+    if not edges:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    src, dst, weight = zip(*edges)
+    return np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64), np.array(weight, dtype=np.float64)
+
+def count_neurons(values):
+    # Matches Creature.create_brain: one neuron per distinct internal id
+    source_type, source_num, sink_type, sink_num, _ = decode_fields(values)
+    return len(set(source_num[source_type == INTERNAL].tolist()) |
+               set(sink_num[sink_type == INTERNAL].tolist()))
+
+def compile_brain(values, num_neurons):
+    # Creature.predict accumulates internal neurons in connection order and reads
+    # internal sources before activation, so every internal neuron's input is an
+    # affine function of the sensors. Fold internal->internal links into that form.
+    const = [0.5] * num_neurons
+    terms = [{} for _ in range(num_neurons)]
+    driven = [False] * num_neurons
+    sensor_action = []
+    internal_action = []
+
+    source_type, source_num, sink_type, sink_num, weight = decode_fields(values)
+    weights = np.power(weight / 8000.0, 3) / 64.0  # Gene.weight_as_float
+    for is_sensor, source, to_internal, sink, weight in zip(
+            (source_type == SENSOR).tolist(), source_num.tolist(),
+            (sink_type == INTERNAL).tolist(), sink_num.tolist(), weights.tolist()):
+        if source >= (NUM_SENSORY_NEURONS if is_sensor else num_neurons):
+            continue  # Skip this connection if the source_num is out of range
+
+        if to_internal:
+            if sink >= num_neurons:
+                continue
+            if is_sensor:
+                terms[sink][source] = terms[sink].get(source, 0.0) + weight
+            else:
+                # Snapshot the source first, it may be the sink itself
+                src_const, src_terms = const[source], list(terms[source].items())
+                const[sink] += weight * src_const
+                for sensor, coeff in src_terms:
+                    terms[sink][sensor] = terms[sink].get(sensor, 0.0) + weight * coeff
+            driven[sink] = True
+        elif sink < NUM_ACTION_NEURONS:
+            edges = sensor_action if is_sensor else internal_action
+            edges.append((source, sink, weight))
+
+    # After folding only internal->action links read neurons, so any neuron
+    # without one can never reach an action. Drop it and renumber the rest.
+    live = sorted({src for src, _, _ in internal_action})
+    remap = {neuron: index for index, neuron in enumerate(live)}
+    sensor_internal = [(sensor, remap[neuron], coeff)
+                       for neuron in live
+                       for sensor, coeff in terms[neuron].items()]
+    internal_action = [(remap[src], sink, weight) for src, sink, weight in internal_action]
+    return CompiledBrain(
+        len(live),
+        np.array([const[neuron] for neuron in live], dtype=np.float64),
+        np.array([driven[neuron] for neuron in live], dtype=bool),
+        edge_arrays(sensor_internal),
+        edge_arrays(sensor_action),
+        edge_arrays(internal_action),
+    )
+
+EDGE_SETS = ('si', 'sa', 'ia')
+
+# Packed brains are a dict of arrays: per-brain 'neurons' and '<set>_edges'
+# counts, with every brain's 'bias', 'driven' and '<set>_src', '<set>_dst' and
+# '<set>_weight' concatenated in brain order. Populations keep their brains in
+# this form, so batching, reordering and saving them are whole-array operations.
+PER_NEURON = ('bias', 'driven')
+PER_EDGE = ('src', 'dst', 'weight')
+
+def concat(arrays, dtype):
+    return np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+
+def pack_brains(brains):
+    # Flatten brains into a few concatenated arrays plus per-brain lengths, for bulk storage
+    packed = {'neurons': np.fromiter((b.num_neurons for b in brains), dtype=np.int64, count=len(brains))}
+    packed['bias'] = concat([b.bias for b in brains], np.float64)
+    packed['driven'] = concat([b.driven for b in brains], bool)
+    for prefix in EDGE_SETS:
+        srcs = [getattr(b, prefix + '_src') for b in brains]
+        packed[prefix + '_edges'] = np.fromiter((len(s) for s in srcs), dtype=np.int64, count=len(brains))
+        packed[prefix + '_src'] = concat(srcs, np.int64)
+        packed[prefix + '_dst'] = concat([getattr(b, prefix + '_dst') for b in brains], np.int64)
+        packed[prefix + '_weight'] = concat([getattr(b, prefix + '_weight') for b in brains], np.float64)
+    return packed
+
+def concat_brains(parts):
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def segments(lengths, indices):
+    # Positions, in a concatenation of segments of `lengths`, of the elements of
+    # segments `indices`, in that order
+    lengths = np.asarray(lengths, dtype=np.int64)
+    starts = np.cumsum(lengths) - lengths
+    taken = lengths[indices]
+    first = np.cumsum(taken) - taken
+    return np.repeat(starts[indices] - first, taken) + np.arange(int(taken.sum()), dtype=np.int64)
+
+def take_brains(packed, indices):
+    # The packed brains at `indices`, in that order
+    indices = np.asarray(indices, dtype=np.int64)
+    taken = {'neurons': packed['neurons'][indices]}
+    positions = segments(packed['neurons'], indices)
+    for name in PER_NEURON:
+        taken[name] = packed[name][positions]
+    for prefix in EDGE_SETS:
+        taken[prefix + '_edges'] = packed[prefix + '_edges'][indices]
+        positions = segments(packed[prefix + '_edges'], indices)
+        for name in PER_EDGE:
+            taken[f'{prefix}_{name}'] = packed[f'{prefix}_{name}'][positions]
+    return taken
+
+def unpack_brains(packed):
+    # Inverse of pack_brains; every brain is a set of views into the packed arrays
+    def bounds(lengths):
+        ends = np.cumsum(lengths).tolist()
+        return list(zip([0] + ends[:-1], ends))
+
+    neurons = packed['neurons'].tolist()
+    neuron_bounds = bounds(packed['neurons'])
+    for array in packed.values():
+        array.flags.writeable = False
+    bias, driven = packed['bias'], packed['driven']
+    edges = []
+    for prefix in EDGE_SETS:
+        src, dst, weight = packed[prefix + '_src'], packed[prefix + '_dst'], packed[prefix + '_weight']
+        edges.append([(src[a:b], dst[a:b], weight[a:b]) for a, b in bounds(packed[prefix + '_edges'])])
+    return [CompiledBrain(count, bias[a:b], driven[a:b], si, sa, ia)
+            for count, (a, b), si, sa, ia in zip(neurons, neuron_bounds, *edges)]
+
+class BrainCache:
+    def __init__(self, max_size=BRAIN_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, values):
+        key = np.ascontiguousarray(values, dtype=np.uint32).tobytes()
+        compiled = self.entries.get(key)
+        if compiled is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return compiled
+        self.misses += 1
+        compiled = compile_brain(values, count_neurons(values))
+        self.entries[key] = compiled
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+brain_cache = BrainCache()
+
+class BrainBatch:
+    # Inference for a whole set of packed brains at once: every brain's internal
+    # neurons get slots in one population-wide array and action edges write into
+    # the flattened (N, actions) output
+    def __init__(self, packed):
+        neurons = packed['neurons']
+        self.size = len(neurons)
+        self.num_slots = int(neurons.sum())
+        self.offsets = np.cumsum(neurons) - neurons
+        self.bias = packed['bias']
+        self.driven = packed['driven']
+
+        # Sensor -> internal edges, sinks shifted into population-wide neuron slots
+        row, src, dst, weight = self.edges(packed, 'si')
+        self.si_row, self.si_src, self.si_weight = row, src, weight
+        self.si_slot = self.offsets[row] + dst
+
+        # Edges into action neurons, sinks flattened into the (N, actions) output
+        row, src, dst, weight = self.edges(packed, 'sa')
+        self.sa_row, self.sa_src, self.sa_weight = row, src, weight
+        self.sa_out = row * NUM_ACTION_NEURONS + dst
+
+        row, src, dst, weight = self.edges(packed, 'ia')
+        self.ia_slot, self.ia_weight = self.offsets[row] + src, weight
+        self.ia_out = row * NUM_ACTION_NEURONS + dst
+
+    @classmethod
+    def from_brains(cls, brains):
+        return cls(pack_brains(brains))
+
+    def edges(self, packed, prefix):
+        row = np.repeat(np.arange(self.size, dtype=np.int64), packed[prefix + '_edges'])
+        return row, packed[prefix + '_src'], packed[prefix + '_dst'], packed[prefix + '_weight']
+
+    def predict(self, inputs):
+        if inputs.shape != (self.size, NUM_SENSORY_NEURONS):
+            raise ValueError(f"Expected inputs of shape {(self.size, NUM_SENSORY_NEURONS)}, got {inputs.shape}")
+
+        internal = self.bias + np.bincount(self.si_slot, weights=inputs[self.si_row, self.si_src] * self.si_weight,
+                                           minlength=self.num_slots)
+        internal = np.where(self.driven, np.tanh(internal), internal)
+
+        num_outputs = self.size * NUM_ACTION_NEURONS
+        actions = np.zeros(num_outputs)
+        actions += np.bincount(self.sa_out, weights=inputs[self.sa_row, self.sa_src] * self.sa_weight,
+                               minlength=num_outputs)
+        actions += np.bincount(self.ia_out, weights=internal[self.ia_slot] * self.ia_weight,
+                               minlength=num_outputs)
+        return np.tanh(actions.reshape(self.size, NUM_ACTION_NEURONS))
@@ -0,0 +1,102 @@
+# cells.py
+
+import numpy as np
+
+EMPTY_INDEX = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+class CellStore:
+    # Sparse per-cell values: a column of flat cell indices plus named value
+    # columns, all indexed by slot, and the slots sorted by cell so any number of
+    # cells are looked up in one searchsorted pass. New cells take slots in order
+    # of first appearance and removals keep the remaining slots in order.
+    #
+    # The sorted index has two levels: the bulk of the cells, and the cells added
+    # since, merged into the bulk once there are MERGE_SIZE of them. Small
+    # batches of new cells then cost O(MERGE_SIZE), not O(cells stored).
+    MIN_CAPACITY = 64
+    MERGE_SIZE = 4096
+
+    def __init__(self, columns):
+        self.size = 0
+        self.cells = np.zeros(self.MIN_CAPACITY, dtype=np.int64)
+        self.columns = {name: np.zeros(self.MIN_CAPACITY, dtype=dtype) for name, dtype in columns.items()}
+        self.index = [EMPTY_INDEX, EMPTY_INDEX]  # (sorted cells, their slots) for the bulk and the recent cells
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name][:self.size]
+
+    def reserve(self, count):
+        if count <= len(self.cells):
+            return
+        capacity = max(count, 2 * len(self.cells))
+        for name, column in [('cells', self.cells), *self.columns.items()]:
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            if name == 'cells':
+                self.cells = grown
+            else:
+                self.columns[name] = grown
+
+    def find(self, cells):
+        # Slot of each cell, -1 where the cell is not stored
+        cells = np.asarray(cells, dtype=np.int64)
+        slots = np.full(cells.shape, -1, dtype=np.int64)
+        for sorted_cells, sorted_slots in self.index:
+            if len(sorted_cells):
+                position = np.minimum(np.searchsorted(sorted_cells, cells), len(sorted_cells) - 1)
+                slots = np.where(sorted_cells[position] == cells, sorted_slots[position], slots)
+        return slots
+
+    def insert(self, cells):
+        # Slot of each cell, adding the cells not stored yet with zeroed values
+        cells = np.asarray(cells, dtype=np.int64)
+        slots = self.find(cells)
+        missing = np.flatnonzero(slots < 0)
+        if len(missing) == 0:
+            return slots
+        new, first, inverse = np.unique(cells[missing], return_index=True, return_inverse=True)
+        rank = np.empty(len(new), dtype=np.int64)
+        rank[np.argsort(first, kind='stable')] = np.arange(len(new))
+        start = self.size
+        self.reserve(start + len(new))
+        self.cells[start + rank] = new
+        for column in self.columns.values():
+            column[start:start + len(new)] = 0
+        self.size += len(new)
+        self.index[1] = self.merged(self.index[1], new, start + rank)
+        if len(self.index[1][0]) >= self.MERGE_SIZE:
+            self.index = [self.merged(self.index[0], *self.index[1]), EMPTY_INDEX]
+        slots[missing] = start + rank[inverse.reshape(-1)]
+        return slots
+
+    @staticmethod
+    def merged(index, cells, slots):
+        # `index` with sorted `cells` and their slots added
+        position = np.searchsorted(index[0], cells)
+        return np.insert(index[0], position, cells), np.insert(index[1], position, slots)
+
+    def compact(self, keep):
+        # Keeps the slots where `keep` is true
+        kept = np.flatnonzero(keep)
+        for column in (self.cells, *self.columns.values()):
+            column[:len(kept)] = column[kept]
+        renumbered = np.cumsum(keep) - 1
+        for level, (sorted_cells, sorted_slots) in enumerate(self.index):
+            stays = keep[sorted_slots]
+            self.index[level] = sorted_cells[stays], renumbered[sorted_slots[stays]]
+        self.size = len(kept)
+
+    def restore(self, cells, **columns):
+        cells = np.asarray(cells, dtype=np.int64)
+        count = len(cells)
+        self.size = 0
+        self.reserve(count)
+        self.cells[:count] = cells
+        for name, values in columns.items():
+            self.columns[name][:count] = values
+        self.size = count
+        order = np.argsort(cells, kind='stable')
+        self.index = [(cells[order], order), EMPTY_INDEX]
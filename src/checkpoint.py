@@ -0,0 +1,94 @@
+# checkpoint.py
+
+import json
+import os
+import re
+import numpy as np
+from .world import World
+from .population import Population
+from .config import CHECKPOINT_DIR
+
+CHECKPOINT_VERSION = 5
+
+# Layout of the 'counters' array
+COUNTER_FIELDS = ('version', 'width', 'height', 'step_count', 'generation', 'size', 'next_id', 'num_genes',
+                  'pheromone_now')
+
+def encode_json(value):
+    # Small metadata travels as utf-8 bytes so the archive never needs pickle
+    return np.frombuffer(json.dumps(value).encode('utf-8'), dtype=np.uint8)
+
+def decode_json(array):
+    return json.loads(array.tobytes().decode('utf-8'))
+
+def checkpoint_path(name):
+    if not name or not re.fullmatch(r'[A-Za-z0-9_.-]+', name) or name.startswith('.'):
+        raise ValueError(f"Invalid checkpoint name '{name}'")
+    return os.path.join(CHECKPOINT_DIR, name if name.endswith('.npz') else f"{name}.npz")
+
+def check_cells(cells, world):
+    if len(cells) and (cells.min() < 0 or cells.max() >= world.width * world.height):
+        raise ValueError("Checkpoint field cells lie outside the world")
+
+def save_world(world, file, params=None, compress=False):
+    # `file` is a path or a binary file object. Every array is written as-is, in bulk.
+    population = world.population
+    arrays = {
+        'counters': np.array([
+            CHECKPOINT_VERSION, world.width, world.height, world.step_count, world.generation,
+            population.size, population.next_id, population.num_genes, world.pheromone_field.now
+        ], dtype=np.int64),
+        'world_params': encode_json(world.params),
+        'simulation_params': encode_json(params if params is not None else {}),
+        'genomes': population.genomes,
+    }
+    # Only the active pheromone cells, so decay continues exactly where it left off
+    arrays['pheromone_cells'], arrays['pheromone_values'], arrays['pheromone_ticks'] = world.pheromone_field.state()
+    arrays['food_cells'], arrays['food_energy'] = world.food_layer.state()
+    for name in Population.COLUMNS:
+        arrays[f'column_{name}'] = getattr(population, name)
+    # The population's packed brains, so a restore neither recompiles nor repacks
+    for name, array in population.brain_arrays.items():
+        arrays[f'brain_{name}'] = array
+    (np.savez_compressed if compress else np.savez)(file, **arrays)
+
+def load_world(file, param_overrides=None, restore_random_state=True):
+    # Returns (world, simulation params). `param_overrides` forks the saved world
+    # under different World params.
+    with np.load(file, allow_pickle=False) as archive:
+        counters = dict(zip(COUNTER_FIELDS, (int(v) for v in archive['counters'])))
+        if counters['version'] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {counters['version']}")
+        world_params = decode_json(archive['world_params'])
+        simulation_params = decode_json(archive['simulation_params'])
+        if not restore_random_state:
+            world_params['seed'] = None  # The fork draws a fresh seed
+        if param_overrides:
+            world_params.update(param_overrides)
+            simulation_params.update(param_overrides)
+        world_params['num_genes'] = counters['num_genes']  # Genome width is fixed by the saved population
+
+        world = World.from_state(counters['width'], counters['height'], world_params, counters['size'])
+        world.step_count = counters['step_count']
+        world.generation = counters['generation']
+        check_cells(archive['food_cells'], world)
+        world.food_layer.restore(archive['food_cells'], archive['food_energy'])
+        check_cells(archive['pheromone_cells'], world)
+        world.pheromone_field.restore(archive['pheromone_cells'], archive['pheromone_values'],
+                                      archive['pheromone_ticks'], counters['pheromone_now'])
+
+        size = counters['size']
+        population = world.population
+        population.reserve(size)
+        for name in Population.COLUMNS:
+            population.data[name][:size] = archive[f'column_{name}']
+        population.genome_data[:size] = archive['genomes']
+        population.size = size
+        population.next_id = counters['next_id']
+        packed = {key[len('brain_'):]: archive[key] for key in archive.files if key.startswith('brain_')}
+        if len(packed['neurons']) != size:
+            raise ValueError("Checkpoint brains do not match the population size")
+        population.set_brain_arrays(packed)
+        world.occupancy.rebuild(population.x, population.y)
+        world.stats.resync(world)
+    return world, simulation_params
@@ -17,9 +17,69 @@ DEFAULT_LONG_PROBE_ENERGY_COST = 2
 
 # Simulation settings
 MUTATION_RATE = 0.01
+DEFAULT_STEPS_PER_GENERATION = 100
+MATING_RADIUS = 10  # Reach of an oscillator-triggered mating during actions
+PARTNER_RADIUS = 1  # Reach of partner search at the end of a generation
+PAIR_BATCH_SIZE = 1 << 21  # Candidate pairs examined per batch in partner searches
+DEFAULT_WORKERS = 0  # Tile worker processes for sensing and brains; 0 or 1 steps in-process
+
+# Streaming settings
+FRAME_FORMATS = ('json', 'png', 'rgb', 'binary', 'delta')  # 'json' is the legacy nested-list frame
+DEFAULT_FRAME_FORMAT = 'json'
+DELTA_KEYFRAME_INTERVAL = 100  # Frames between full keyframes in the delta stream
+DEFAULT_TARGET_STEP_RATE = 30  # Background engine steps per second, 0 runs unthrottled
+FRAME_BUFFER_SIZE = 8  # Frames kept for subscribers before slow ones start dropping
+SUBSCRIBER_KEEPALIVE = 15.0  # Seconds without a frame before a stream sends a keepalive
+POOLING_MODES = ('max', 'mean')  # How cells drawn into one pixel of a downsampled frame are combined
+DEFAULT_POOLING = 'max'
+
+# Session settings
+MAX_SESSIONS = 4  # Simulations hosted at once, each stepped by its own worker process
+SESSION_IDLE_TIMEOUT = 600.0  # Seconds without requests or viewers before a session is evicted
+SESSION_REAP_INTERVAL = 30.0  # Seconds between sweeps for idle sessions
+SESSION_COMMAND_TIMEOUT = 120.0  # Seconds to wait for a session worker to answer a request
+
+# Event log settings
+DEFAULT_EVENT_LOG = False  # Off by default; World.events is None and no call site does any work
+EVENT_LOG_CAPACITY = 65536  # Records kept in the in-memory ring
+EVENT_SAMPLE_RATES = {  # Fraction of each event type that is recorded
+    'move': 0.01,
+    'pheromone': 0.1,
+    'birth': 1.0,
+    'death': 1.0,
+    'food': 1.0,
+}
+
+# Metrics settings
+METRICS_WINDOW = 1000  # Recent samples per phase used for percentiles
+METRICS_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)  # Seconds
+
+# Statistics settings
+STATS_RESYNC_INTERVAL = 1000  # Steps between exact recounts of the incrementally kept stats
+
+# Pheromone settings
+PHEROMONE_DECAY = 0.99  # Fraction of a deposit left after each step
+PHEROMONE_EPSILON = 1e-4  # Cells that have faded below this are dropped from the sparse field
+
+# Action settings
+DEFAULT_COLLISIONS = False  # Whether creatures are kept from moving into occupied cells
+
+# Random number settings
+RNG_BLOCK_SIZE = 4096  # Uniform draws pre-drawn at a time for scalar random calls
+
+# Food settings
+FOOD_SPAWN_RATE = 0.7  # Expected food cells spawned per step; the fraction is a per-step chance
+
+# Genome analytics settings
+GENOME_STATS_INTERVAL = 10  # Steps between recomputing the median genome and diversity stats
+GENOME_CLUSTERS = 5  # Largest identically wired groups reported
+
+# Checkpoint settings
+CHECKPOINT_DIR = 'checkpoints'  # Where /api/checkpoint writes named .npz snapshots
 
 # Neural network settings
 NUM_SENSORY_NEURONS = 21  # Update this to match the number of active sensors
 NUM_INTERNAL_NEURONS = 4  # This can be adjusted as needed
 NUM_ACTION_NEURONS = 16   # Update this to match the number of active actions
 DEFAULT_NUM_GENES = 50    # Increase this to allow for more complex networks
+BRAIN_CACHE_SIZE = 4096    # Compiled brains kept for reuse by identical genomes
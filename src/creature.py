@@ -1,22 +1,19 @@
 # creature.py
 
 import numpy as np
-import logging
 from .utils import generate_id
 from .config import DEFAULT_MAX_AGE
+from .brain import brain_cache
+from . import genome as genomes
+from .rng import generator
 
 class Gene:
-    def __init__(self, gene_value=None):
+    def __init__(self, gene_value=None, rng=None):
         if gene_value is None:
-            self.source_type = np.random.choice([0, 1])
-            self.source_num = np.random.randint(0, 128)  # 7 bits
-            self.sink_type = np.random.choice([0, 1])
-            self.sink_num = np.random.randint(0, 128)  # 7 bits
-            self.weight = np.random.randint(-32768, 32767)  # 16-bit signed integer
-            self.gene_value = self.encode_gene()
-        else:
-            self.gene_value = gene_value
-            self.decode_gene()
+            # One packed draw instead of a call per field
+            gene_value = int(genomes.random_genomes(1, rng)[0])
+        self.gene_value = gene_value
+        self.decode_gene()
 
     def encode_gene(self):
         gene = 0
@@ -40,13 +37,22 @@ class Gene:
         return np.power(self.weight / 8000.0, 3) / 64.0
 
     @staticmethod
-    def make_random_weight():
-        return np.random.randint(-32768, 32767)
+    def make_random_weight(rng=None):
+        return int(generator(rng).integers(-32768, 32767))
+
+    @staticmethod
+    def encode_genome(genes):
+        return np.array([gene.encode_gene() for gene in genes], dtype=np.uint32)
+
+    @staticmethod
+    def decode_genome(values):
+        return [Gene(int(value)) for value in values]
 
 class NeuralNet:
     def __init__(self):
         self.connections = []
         self.neurons = []
+        self.compiled = None
 
     class Neuron:
         def __init__(self):
@@ -77,7 +83,7 @@ class Creature:
         'MOVE_LEFT', 'MOVE_RIGHT', 'MOVE_REVERSE'
     ]
 
-    def __init__(self, x, y, generation, num_genes):
+    def __init__(self, x, y, generation, num_genes, genome=None, rng=None):
         self.id = generate_id()
         self.x = int(x)
         self.y = int(y)
@@ -85,11 +91,13 @@ class Creature:
         self.age = 0
         self.generation = generation
         self.num_genes = num_genes
-        self.genome = [Gene() for _ in range(num_genes)]
+        # Packed uint32 genes, see Gene.encode_gene for the bit layout
+        rng = generator(rng)
+        self.genome = (np.asarray(genome, dtype=np.uint32) if genome is not None
+                       else genomes.random_genomes(num_genes, rng))
         self.brain = self.create_brain()
-        self.direction = np.random.randint(0, 8)
+        self.direction = int(rng.integers(0, 8))
         self.fitness = 0.0
-        logging.info(f"Birth: Creature {self.id} born at ({self.x}, {self.y}) in generation {self.generation}")
         self.last_move_x = 0
         self.last_move_y = 0
         self.long_probe_distance = 1  # Initialize with a default value
@@ -98,91 +106,38 @@ class Creature:
 
     def create_brain(self):
         brain = NeuralNet()
-        for gene in self.genome:
+        genes = Gene.decode_genome(self.genome)
+        for gene in genes:
             brain.add_connection(gene)
         # Add neurons based on unique sink and source numbers
         unique_neurons = set()
-        for gene in self.genome:
+        for gene in genes:
             if gene.source_type == 0:
                 unique_neurons.add(gene.source_num)
             if gene.sink_type == 0:
                 unique_neurons.add(gene.sink_num)
         for _ in range(len(unique_neurons)):
             brain.add_neuron()
+        brain.compiled = brain_cache.get(self.genome)
         return brain
 
-    def mutate(self, mutation_rate):
-        for gene in self.genome:
-            if np.random.random() < mutation_rate:
-                gene.weight = Gene.make_random_weight()
-
-    def crossover(self, other):
-        new_genome = []
-        for gene1, gene2 in zip(self.genome, other.genome):
-            new_gene = Gene()
-            if np.random.random() < 0.5:
-                new_gene.source_type = gene1.source_type
-                new_gene.source_num = gene1.source_num
-                new_gene.sink_type = gene1.sink_type
-                new_gene.sink_num = gene1.sink_num
-                new_gene.weight = gene1.weight
-            else:
-                new_gene.source_type = gene2.source_type
-                new_gene.source_num = gene2.source_num
-                new_gene.sink_type = gene2.sink_type
-                new_gene.sink_num = gene2.sink_num
-                new_gene.weight = gene2.weight
-            new_genome.append(new_gene)
-        return new_genome
+    @property
+    def compiled_brain(self):
+        return self.brain.compiled
+
+    def mutate(self, mutation_rate, rng=None):
+        self.genome = genomes.mutate(self.genome, mutation_rate, rng)
+        self.brain = self.create_brain()
+
+    def crossover(self, other, rng=None):
+        return genomes.crossover(self.genome, other.genome, rng)
 
     def predict(self, inputs):
         if len(inputs) != len(self.SENSORY_NEURONS):
             raise ValueError(f"Expected {len(self.SENSORY_NEURONS)} inputs, got {len(inputs)}")
-        
-        # Reset neuron outputs
-        for neuron in self.brain.neurons:
-            neuron.output = 0.5
-            neuron.driven = False
-
-        # Process each connection
-        for gene in self.brain.connections:
-            if gene.source_type == 1:
-                if gene.source_num >= len(inputs):
-                    continue  # Skip this connection if the source_num is out of range
-                source_value = inputs[gene.source_num]
-            else:
-                if gene.source_num >= len(self.brain.neurons):
-                    continue  # Skip this connection if the source_num is out of range
-                source_value = self.brain.neurons[gene.source_num].output
-            
-            weight = gene.weight_as_float()
-            if gene.sink_type == 0:
-                if gene.sink_num < len(self.brain.neurons):
-                    self.brain.neurons[gene.sink_num].output += source_value * weight
-                    self.brain.neurons[gene.sink_num].driven = True
-            else:  # ACTION
-                # Here you would update the action neurons directly
-                pass
-
-        # Apply activation function to driven neurons
-        for neuron in self.brain.neurons:
-            if neuron.driven:
-                neuron.output = np.tanh(neuron.output)
-
-        # Collect action neuron outputs
-        action_outputs = [0.0] * len(self.ACTION_NEURONS)
-        for gene in self.brain.connections:
-            if gene.sink_type == 1 and gene.sink_num < len(action_outputs):
-                if gene.source_type == 1 and gene.source_num < len(inputs):
-                    source_value = inputs[gene.source_num]
-                elif gene.source_type == 0 and gene.source_num < len(self.brain.neurons):
-                    source_value = self.brain.neurons[gene.source_num].output
-                else:
-                    continue
-                action_outputs[gene.sink_num] += source_value * gene.weight_as_float()
-
-        # Apply activation function to action outputs
-        action_outputs = np.tanh(action_outputs)
+
+        # Weights, bounds checks and dead neurons are resolved once in the compiled brain
+        action_outputs = self.compiled_brain.predict(np.asarray(inputs, dtype=np.float64))
 
         # Update creature attributes based on action outputs
         self.long_probe_distance = int(np.clip(action_outputs[self.ACTION_NEURONS.index('SET_LONGPROBE_DIST')] * 10, 1, 10))
@@ -192,10 +147,10 @@ class Creature:
         return action_outputs
 
     def get_average_reproduction_chance(self):
-        return np.mean([gene.weight_as_float() for gene in self.genome[:len(self.genome)//2]]) * 0.5 + 0.5
+        return np.mean(genomes.weights_as_float(self.genome[:len(self.genome)//2])) * 0.5 + 0.5
 
     def get_average_energy_efficiency(self):
-        return np.mean([gene.weight_as_float() for gene in self.genome[len(self.genome)//2:]]) * 0.5 + 0.5
+        return np.mean(genomes.weights_as_float(self.genome[len(self.genome)//2:])) * 0.5 + 0.5
 
     def update_direction(self, rotate):
         self.direction = (self.direction + rotate) % 8
@@ -0,0 +1,169 @@
+# engine.py
+
+import threading
+import time
+import logging
+from collections import deque
+from .frames import encode_frame
+from .metrics import metrics
+from .config import DEFAULT_TARGET_STEP_RATE, FRAME_BUFFER_SIZE, SUBSCRIBER_KEEPALIVE
+
+class Frame:
+    # One published step. The world is kept as a render snapshot and drawn per
+    # viewport on demand; renders and stateless encodings are cached, so every
+    # subscriber asking for the same view and format shares a single encode.
+    def __init__(self, sequence, stats=None, snapshot=None, median_genome=None, is_over=False, error=None):
+        self.sequence = sequence
+        self.stats = stats
+        self.snapshot = snapshot
+        self.median_genome = median_genome
+        self.is_over = is_over
+        self.error = error
+        self.rendered = {}
+        self.encoded = {}
+
+    def render(self, viewport=None):
+        bounds = self.snapshot.bounds(viewport)
+        state = self.rendered.get(bounds)
+        if state is None:
+            state = self.rendered[bounds] = self.snapshot.render(viewport)
+        return state, bounds
+
+    def data(self, frame_format, frame_encoder=None, viewport=None):
+        if self.error is not None:
+            return {'error': self.error}
+        state, bounds = self.render(viewport)
+        if frame_format == 'delta':
+            started = time.perf_counter()
+            world_state = encode_frame(state, frame_format, frame_encoder, self.snapshot.changes(viewport))
+            metrics.observe('encoding', time.perf_counter() - started)
+        else:
+            world_state = self.encoded.get((frame_format, bounds))
+            if world_state is None:
+                started = time.perf_counter()
+                world_state = self.encoded[frame_format, bounds] = encode_frame(state, frame_format)
+                metrics.observe('encoding', time.perf_counter() - started)
+        return {
+            'stats': self.stats,
+            'world_state': world_state,
+            'median_genome': self.median_genome,
+            'isSimulationOver': self.is_over
+        }
+
+class FrameBuffer:
+    # Ring of recently published frames shared by every subscriber
+    def __init__(self, buffer_size=FRAME_BUFFER_SIZE):
+        self.buffer = deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.active = False
+        self.sequence = 0
+
+    def open(self):
+        with self.condition:
+            self.buffer.clear()
+            self.active = True
+
+    def finish(self):
+        # Subscribers return once they have the last published frame
+        with self.condition:
+            self.active = False
+            self.condition.notify_all()
+
+    def publish(self, frame):
+        with self.condition:
+            self.buffer.append(frame)
+            self.sequence = frame.sequence
+            self.condition.notify_all()
+
+    def subscribe(self, keepalive=SUBSCRIBER_KEEPALIVE):
+        # Yields frames in order while they are still buffered. A subscriber that
+        # fell behind the buffer skips to the newest frame, so it never holds up
+        # the engine. Yields None when nothing arrived within `keepalive` seconds.
+        last = None
+        while True:
+            with self.condition:
+                has_new = lambda: self.buffer and self.buffer[-1].sequence != last
+                if not self.condition.wait_for(lambda: has_new() or not self.active, keepalive):
+                    frame = None
+                elif not has_new():
+                    return  # Engine stopped and everything published was delivered
+                elif last is None or self.buffer[0].sequence > last + 1:
+                    frame = self.buffer[-1]
+                else:
+                    frame = self.buffer[last + 1 - self.buffer[0].sequence]
+            if frame is not None:
+                last = frame.sequence
+            yield frame
+
+class SimulationEngine(FrameBuffer):
+    def __init__(self, simulation, buffer_size=FRAME_BUFFER_SIZE):
+        super().__init__(buffer_size)
+        self.simulation = simulation
+        self.stop_event = threading.Event()
+        self.step_lock = threading.Lock()  # Held while the world is mid-step
+        self.thread = None
+        self.target_step_rate = DEFAULT_TARGET_STEP_RATE
+        self.steps_per_second = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, target_step_rate=DEFAULT_TARGET_STEP_RATE):
+        if self.simulation.world is None:
+            raise ValueError("Simulation not started. Call start_simulation first.")
+        self.stop()
+        self.target_step_rate = max(0.0, float(target_step_rate))
+        self.stop_event.clear()
+        self.open()
+        self.thread = threading.Thread(target=self.run, name='simulation-engine', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def run(self):
+        interval = 1.0 / self.target_step_rate if self.target_step_rate > 0 else 0.0
+        next_step = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                started = time.perf_counter()
+                try:
+                    with self.step_lock:
+                        self.simulation.run_step()
+                        frame = self.capture()
+                except Exception as e:
+                    self.logger.error(f"Error in simulation engine: {str(e)}", exc_info=True)
+                    self.publish(Frame(self.sequence + 1, error=f"Error in simulation engine: {str(e)}"))
+                    break
+                self.publish(frame)
+                if frame.is_over:
+                    break
+
+                elapsed = time.perf_counter() - started
+                self.steps_per_second = 1.0 / elapsed if elapsed > 0 else 0.0
+                if interval:
+                    # Hold the target rate; a step that overran resets the schedule instead of bursting
+                    next_step += interval
+                    delay = next_step - time.perf_counter()
+                    if delay > 0:
+                        self.stop_event.wait(delay)
+                    else:
+                        next_step = time.perf_counter()
+        finally:
+            self.finish()
+
+    def capture(self):
+        world = self.simulation.world
+        return Frame(
+            self.sequence + 1,
+            stats=world.get_stats(),
+            snapshot=world.render_snapshot(),
+            median_genome=world.get_median_genome(),
+            is_over=world.is_simulation_over(),
+        )
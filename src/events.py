@@ -0,0 +1,148 @@
+# events.py
+
+import numpy as np
+from .config import EVENT_LOG_CAPACITY, EVENT_SAMPLE_RATES
+
+# Event type codes, in the order of EVENT_TYPES
+MOVE, PHEROMONE, BIRTH, DEATH, FOOD = range(5)
+EVENT_TYPES = ('move', 'pheromone', 'birth', 'death', 'food')
+
+# `other`, `partner` and `value` carry the type-specific payload, see EVENT_MESSAGES
+EVENT_DTYPE = np.dtype([
+    ('type', np.uint8),
+    ('step', np.int64),
+    ('creature', np.int64),
+    ('other', np.int64),
+    ('partner', np.int64),
+    ('x', np.int32),
+    ('y', np.int32),
+    ('value', np.float64),
+])
+
+# Messages are only formatted when events are read back
+EVENT_MESSAGES = (
+    "Creature {creature} moved to ({x}, {y})",
+    "Creature {creature} spawned pheromone at ({x}, {y})",
+    "Creature {creature} born at ({x}, {y}) to creatures {other} and {partner}",
+    "Creature {creature} died at ({x}, {y}) with energy {value:.2f}",
+    "New food spawned at ({x}, {y}) with energy {value:.2f}",
+)
+
+def sample_stride(rate):
+    # Sampling keeps every Nth event of a type; it never draws from the simulation's RNG
+    rate = float(rate)
+    if rate <= 0:
+        return 0
+    return max(1, int(round(1 / min(rate, 1.0))))
+
+def format_event(record):
+    event = {name: record[name].item() for name in EVENT_DTYPE.names}
+    event['type'] = EVENT_TYPES[event['type']]
+    event['message'] = EVENT_MESSAGES[EVENT_TYPES.index(event['type'])].format(**event)
+    return event
+
+def read_events(path):
+    # Records written by an EventLog sink, as a structured array
+    return np.fromfile(path, dtype=EVENT_DTYPE)
+
+class EventLog:
+    # Fixed-size ring of typed event records. Recording is a stride check and
+    # one row write; formatting happens only when events are read. With a sink
+    # path, records are appended to that file in raw batches.
+    def __init__(self, capacity=EVENT_LOG_CAPACITY, rates=None, path=None):
+        self.capacity = max(1, int(capacity))
+        self.records = np.zeros(self.capacity, dtype=EVENT_DTYPE)
+        rates = {**EVENT_SAMPLE_RATES, **(rates or {})}
+        self.strides = [sample_stride(rates.get(name, 1.0)) for name in EVENT_TYPES]
+        self.seen = [0] * len(EVENT_TYPES)
+        self.count = 0  # Records written since creation; the ring holds the newest `capacity`
+        self.step = 0
+        self.sink = open(path, 'ab') if path else None
+        self.flushed = 0
+        self.flush_size = max(1, self.capacity // 2)
+        self.dropped = 0
+
+    def record(self, event_type, creature=-1, x=-1, y=-1, other=-1, partner=-1, value=0.0):
+        stride = self.strides[event_type]
+        if not stride:
+            return
+        seen = self.seen[event_type]
+        self.seen[event_type] = seen + 1
+        if seen % stride:
+            return
+        self.records[self.count % self.capacity] = (event_type, self.step, creature, other, partner, x, y, value)
+        self.count += 1
+        if self.sink is not None and self.count - self.flushed >= self.flush_size:
+            self.flush()
+
+    def record_many(self, event_type, creatures, x, y, other=-1, partner=-1, value=0.0):
+        stride = self.strides[event_type]
+        total = len(creatures)
+        if not stride or total == 0:
+            return
+        seen = self.seen[event_type]
+        self.seen[event_type] = seen + total
+        keep = np.flatnonzero((seen + np.arange(total)) % stride == 0)
+        if len(keep) == 0:
+            return
+        if len(keep) > self.capacity:
+            # Only the newest records fit in the ring
+            excess = len(keep) - self.capacity
+            self.flush()
+            self.count += excess
+            if self.sink is not None:
+                self.dropped += excess
+                self.flushed = self.count
+            keep = keep[-self.capacity:]
+
+        slots = (self.count + np.arange(len(keep))) % self.capacity
+        batch = self.records[slots]
+        batch['type'] = event_type
+        batch['step'] = self.step
+        batch['creature'] = np.asarray(creatures)[keep]
+        batch['x'] = np.asarray(x)[keep]
+        batch['y'] = np.asarray(y)[keep]
+        batch['other'] = np.broadcast_to(other, total)[keep]
+        batch['partner'] = np.broadcast_to(partner, total)[keep]
+        batch['value'] = np.broadcast_to(value, total)[keep]
+        self.records[slots] = batch
+        self.count += len(keep)
+        if self.sink is not None and self.count - self.flushed >= self.flush_size:
+            self.flush()
+
+    def ordered(self, start=0):
+        # Records still in the ring from position `start` on, oldest first
+        start = max(start, self.count - self.capacity)
+        slots = np.arange(start, self.count) % self.capacity
+        return self.records[slots]
+
+    def flush(self):
+        if self.sink is None:
+            return
+        lost = max(0, self.count - self.capacity - self.flushed)
+        self.dropped += lost
+        self.ordered(self.flushed).tofile(self.sink)
+        self.sink.flush()
+        self.flushed = self.count
+
+    def recent(self, limit=100, event_type=None):
+        records = self.ordered()
+        if event_type is not None:
+            records = records[records['type'] == EVENT_TYPES.index(event_type)]
+        return [format_event(record) for record in records[-limit:]] if limit > 0 else []
+
+    def summary(self):
+        return {
+            'recorded': self.count,
+            'buffered': min(self.count, self.capacity),
+            'capacity': self.capacity,
+            'dropped': self.dropped,
+            'seen': dict(zip(EVENT_TYPES, self.seen)),
+            'sample_strides': dict(zip(EVENT_TYPES, self.strides)),
+        }
+
+    def close(self):
+        if self.sink is not None:
+            self.flush()
+            self.sink.close()
+            self.sink = None
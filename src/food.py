@@ -0,0 +1,58 @@
+# food.py
+
+import numpy as np
+from .cells import CellStore
+
+class FoodLayer:
+    # Sparse food store: the energy of each cell with food, in a CellStore, so
+    # spawning and lookups for many positions are array operations
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.store = CellStore({'energy': np.float64})
+
+    def __len__(self):
+        return len(self.store)
+
+    def cells_of(self, x, y):
+        return np.asarray(x, dtype=np.int64) * self.height + np.asarray(y, dtype=np.int64)
+
+    def spawn(self, x, y, energy):
+        # Sets the energy of each cell, later entries winning, and returns the
+        # energy each entry replaced
+        cells = self.cells_of(x, y)
+        energy = np.asarray(energy, dtype=np.float64)
+        slots = self.store.find(cells)
+        replaced = np.where(slots >= 0, self.store.columns['energy'][slots], 0.0)
+        # An entry repeating an earlier cell of the batch replaces that entry's energy
+        order = np.argsort(cells, kind='stable')
+        repeat = np.flatnonzero(cells[order][1:] == cells[order][:-1])
+        replaced[order[repeat + 1]] = energy[order[repeat]]
+        last = np.ones(len(cells), dtype=bool)
+        last[order[repeat]] = False
+        slots = self.store.insert(cells)
+        self.store.columns['energy'][slots[last]] = energy[last]
+        return replaced
+
+    def total(self):
+        return float(np.sum(self.store['energy']))
+
+    def locations(self):
+        return int(np.count_nonzero(self.store['energy']))
+
+    def dense(self):
+        # Width x height copy of the layer; writes to it do not reach the layer
+        grid = np.zeros((self.width, self.height))
+        grid.reshape(-1)[self.store.cells[:len(self.store)]] = self.store['energy']
+        return grid
+
+    def state(self):
+        return self.store.cells[:len(self.store)].copy(), self.store['energy'].copy()
+
+    def restore(self, cells, energy):
+        self.store.restore(cells, energy=energy)
+
+    def load(self, grid):
+        grid = np.asarray(grid, dtype=np.float64)
+        cells = np.flatnonzero(grid)
+        self.restore(cells, grid.reshape(-1)[cells])
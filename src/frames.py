@@ -0,0 +1,98 @@
+# frames.py
+
+import base64
+import io
+import uuid
+import numpy as np
+from PIL import Image
+from .config import DELTA_KEYFRAME_INTERVAL
+
+def b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+def encode_frame(state, frame_format, frame_encoder=None, changes=None):
+    # `state` is the (height, width, 3) uint8 frame from World.render_world_state;
+    # `changes` is what WorldSnapshot.changes reports for it, used by deltas
+    if frame_format == 'json':
+        return state.tolist()
+    if frame_format == 'delta':
+        # Deltas depend on what this stream already sent, so the stream owns the encoder
+        if frame_encoder is None:
+            raise ValueError("Delta frames need a DeltaFrameEncoder for the stream")
+        return frame_encoder.encode(state, changes)
+    if frame_format == 'binary':
+        return state.tobytes()  # Raw row-major RGB, framed by the caller
+    if frame_format == 'png':
+        buffer = io.BytesIO()
+        Image.fromarray(state, 'RGB').save(buffer, format='PNG')
+        data = buffer.getvalue()
+    else:
+        data = state.tobytes()
+    height, width = state.shape[:2]
+    return {
+        'format': frame_format,
+        'width': width,
+        'height': height,
+        'data': b64(data),
+    }
+
+class DeltaFrameEncoder:
+    # Per-stream encoder: a full keyframe first, then only the pixels the world
+    # reports as changed since the previous frame of the same stream, so a delta
+    # costs what moved, not the frame area. A keyframe is sent again on request,
+    # every `keyframe_interval` frames, and whenever the changes do not start at
+    # this stream's previous frame (skipped frames, or changes not known).
+    def __init__(self, keyframe_interval=DELTA_KEYFRAME_INTERVAL, stream_id=None):
+        self.stream_id = stream_id or uuid.uuid4().hex
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.shape = None  # Of the previous frame sent
+        self.step = None  # World step of the previous frame sent
+        self.frame = 0
+        self.since_keyframe = 0
+        self.resync_requested = False
+
+    def request_resync(self):
+        self.resync_requested = True
+
+    def needs_keyframe(self, state, changes):
+        return (self.shape != state.shape or self.resync_requested or
+                self.since_keyframe >= self.keyframe_interval or
+                changes is None or changes[0] is None or self.step is None or self.step not in changes[:2])
+
+    def encode(self, state, changes=None):
+        # `changes` is (since, step, pixels) from WorldSnapshot.changes
+        self.frame += 1
+        height, width = state.shape[:2]
+        if self.needs_keyframe(state, changes):
+            self.resync_requested = False
+            self.since_keyframe = 0
+            message = {
+                'format': 'delta',
+                'type': 'key',
+                'stream_id': self.stream_id,
+                'frame': self.frame,
+                'width': width,
+                'height': height,
+                'data': b64(np.ascontiguousarray(state, dtype=np.uint8).tobytes()),
+            }
+        else:
+            self.since_keyframe += 1
+            # Row-major cell indices (y * width + x) and their new RGB values;
+            # nothing changed if this stream already sent the same step
+            cells = changes[2] if changes[1] != self.step else changes[2][:0]
+            colors = state.reshape(-1, 3)[cells]
+            message = {
+                'format': 'delta',
+                'type': 'delta',
+                'stream_id': self.stream_id,
+                'frame': self.frame,
+                'base': self.frame - 1,
+                'width': width,
+                'height': height,
+                'count': len(cells),
+                'cells': b64(cells.astype('<u4').tobytes()),
+                'colors': b64(colors.astype(np.uint8).tobytes()),
+            }
+        self.shape = state.shape
+        self.step = changes[1] if changes is not None else None
+        return message
@@ -0,0 +1,59 @@
+# genome.py
+
+import numpy as np
+from .rng import generator
+
+# Bit layout matches Gene.encode_gene: source_type(1) source_num(7) sink_type(1) sink_num(7) weight(16)
+TOPOLOGY_MASK = np.uint32(0xFFFF0000)
+WEIGHT_MASK = np.uint32(0x0000FFFF)
+
+def random_weights(shape, rng=None):
+    # Same range as Gene.make_random_weight, as unsigned 16-bit patterns
+    return (generator(rng).integers(-32768, 32767, shape) & 0xFFFF).astype(np.uint32)
+
+def random_genomes(shape, rng=None):
+    # Packed genes drawn with the same field ranges as Gene()
+    rng = generator(rng)
+    genes = rng.integers(0, 2, shape).astype(np.uint32) << 31
+    genes |= rng.integers(0, 128, shape).astype(np.uint32) << 24
+    genes |= rng.integers(0, 2, shape).astype(np.uint32) << 23
+    genes |= rng.integers(0, 128, shape).astype(np.uint32) << 16
+    genes |= random_weights(shape, rng)
+    return genes
+
+def decode_fields(genomes):
+    # Vectorized Gene.decode_gene over packed gene values
+    genomes = np.asarray(genomes, dtype=np.uint32)
+    source_type = (genomes >> 31) & 0x1
+    source_num = (genomes >> 24) & 0x7F
+    sink_type = (genomes >> 23) & 0x1
+    sink_num = (genomes >> 16) & 0x7F
+    weight = (genomes & WEIGHT_MASK).astype(np.uint16).view(np.int16)
+    return source_type, source_num, sink_type, sink_num, weight
+
+def weights_as_float(genomes):
+    # Vectorized Gene.weight_as_float
+    weight = decode_fields(genomes)[4]
+    return np.power(weight / 8000.0, 3) / 64.0
+
+def crossover(genomes1, genomes2, rng=None):
+    # Each locus comes from either parent with equal probability; works on one
+    # genome or on a batch of parent pairs
+    genomes1 = np.asarray(genomes1, dtype=np.uint32)
+    from_first = generator(rng).random(genomes1.shape) < 0.5
+    return np.where(from_first, genomes1, np.asarray(genomes2, dtype=np.uint32))
+
+def mutate(genomes, mutation_rate, rng=None):
+    # Replace the weight bits of each locus with probability mutation_rate
+    rng = generator(rng)
+    genomes = np.array(genomes, dtype=np.uint32)
+    mask = rng.random(genomes.shape) < mutation_rate
+    count = int(mask.sum())
+    if count:
+        genomes[mask] = (genomes[mask] & TOPOLOGY_MASK) | random_weights(count, rng)
+    return genomes
+
+def similarity(genomes1, genomes2):
+    # Fraction of loci wired identically (weights ignored)
+    same = ((np.asarray(genomes1, dtype=np.uint32) ^ np.asarray(genomes2, dtype=np.uint32)) & TOPOLOGY_MASK) == 0
+    return np.count_nonzero(same, axis=-1) / same.shape[-1]
@@ -0,0 +1,135 @@
+# metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+import numpy as np
+from .config import METRICS_WINDOW, METRICS_BUCKETS
+
+class RollingHistogram:
+    # Percentiles over the last `window` samples, plus cumulative Prometheus-style buckets
+    def __init__(self, window=METRICS_WINDOW, buckets=METRICS_BUCKETS):
+        self.samples = np.zeros(max(1, window))
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+
+    def summary(self):
+        window = self.samples[:min(self.count, len(self.samples))]
+        if len(window) == 0:
+            return {'count': 0, 'total': 0.0}
+        p50, p95, p99 = np.percentile(window, (50, 95, 99))
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': float(window.mean()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(window.max()),
+        }
+
+class PhaseTimer:
+    # Reusable context manager; one per phase, so timing a phase allocates nothing
+    __slots__ = ('histogram', 'lock', 'started')
+
+    def __init__(self, histogram, lock):
+        self.histogram = histogram
+        self.lock = lock
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            self.histogram.observe(elapsed)
+        return False
+
+class Metrics:
+    # Wall time per step phase and event counters for the running simulation.
+    # Timers are not reentrant; phases timed from several threads use observe().
+    # Updates and reads hold one lock, as the engine, renderers and request
+    # threads all record into the same histograms.
+    def __init__(self, window=METRICS_WINDOW, buckets=METRICS_BUCKETS):
+        self.window = window
+        self.buckets = buckets
+        self.phases = {}
+        self.timers = {}
+        self.counters = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def histogram(self, phase):
+        # Callers hold the lock
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = RollingHistogram(self.window, self.buckets)
+            self.timers[phase] = PhaseTimer(histogram, self.lock)
+        return histogram
+
+    def timed(self, phase):
+        timer = self.timers.get(phase)
+        if timer is None:
+            with self.lock:
+                self.histogram(phase)
+                timer = self.timers[phase]
+        return timer
+
+    def observe(self, phase, seconds):
+        with self.lock:
+            self.histogram(phase).observe(seconds)
+
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.phases.clear()
+            self.timers.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'uptime': time.time() - self.started,
+                'window': self.window,
+                'phases': {phase: histogram.summary() for phase, histogram in self.phases.items()},
+                'counters': dict(self.counters),
+            }
+
+    def prometheus(self, prefix='enki'):
+        with self.lock:
+            return self.format_prometheus(prefix)
+
+    def format_prometheus(self, prefix):
+        lines = [
+            f"# HELP {prefix}_phase_seconds Wall time spent in each simulation phase.",
+            f"# TYPE {prefix}_phase_seconds histogram",
+        ]
+        for phase, histogram in self.phases.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {histogram.total:.9g}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {histogram.count}')
+        lines.append(f"# HELP {prefix}_events_total Simulation events counted since start.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for counter, value in self.counters.items():
+            lines.append(f'{prefix}_events_total{{event="{counter}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
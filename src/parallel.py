@@ -0,0 +1,238 @@
+# parallel.py
+
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+import numpy as np
+from .sensing import STATE_COLUMNS, sense_rows
+from .brain import BrainCache, BrainBatch, pack_brains, concat_brains, take_brains
+from .population import Population
+from .metrics import metrics
+from .config import NUM_ACTION_NEURONS, BRAIN_CACHE_SIZE
+
+# Population columns the workers read, besides the sensing state
+WORKER_COLUMNS = ('id', *STATE_COLUMNS)
+
+class SharedArray:
+    # A numpy array in a named shared memory block. The creating process owns
+    # (and unlinks) the block; other processes attach by name.
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        if self.owner:
+            size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def spec(self):
+        return self.shm.name, self.shape, self.dtype.str
+
+    def close(self):
+        self.array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Arrays still view the block; the mapping goes with the last of them
+        if self.owner:
+            self.shm.unlink()
+
+class TileBrains:
+    # A tile's packed brains and their batch, kept across steps. Creatures
+    # rarely leave a tile, so a step regathers the brains of rows seen before
+    # and compiles only newcomers; an unchanged tile reuses its batch as-is.
+    def __init__(self):
+        self.cache = BrainCache()
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.genomes = None
+        self.packed = pack_brains([])
+        self.batch = BrainBatch(self.packed)
+
+    def update(self, ids, genomes):
+        if self.genomes is not None and np.array_equal(ids, self.ids) and np.array_equal(genomes, self.genomes):
+            return self.batch
+        known = np.zeros(len(ids), dtype=bool)
+        position = np.zeros(len(ids), dtype=np.int64)
+        if len(self.ids):
+            order = np.argsort(self.ids)
+            found = np.minimum(np.searchsorted(self.ids[order], ids), len(self.ids) - 1)
+            position = order[found]
+            known = (self.ids[position] == ids) & (self.genomes[position] == genomes).all(axis=1)
+        new = np.flatnonzero(~known)
+        self.cache.max_size = max(BRAIN_CACHE_SIZE, 2 * len(ids))
+        added = pack_brains([self.cache.get(genome) for genome in genomes[new]])
+        position[new] = len(self.ids) + np.arange(len(new))
+        self.packed = take_brains(concat_brains([self.packed, added]), position)
+        self.ids = ids.copy()
+        self.genomes = genomes.copy()
+        self.batch = BrainBatch(self.packed)
+        return self.batch
+
+def tile_worker(conn, bounds):
+    # Owns the creatures whose x lies in [x0, x1). Reads the whole step snapshot
+    # from shared memory, so sensing across the tile border (the halo) needs no
+    # copies, and writes outputs only to its own rows.
+    x0, x1 = bounds
+    brains = TileBrains()
+    arrays = {}
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            specs, n, width, height, step_count = message
+            try:
+                if specs is not None:
+                    for block in arrays.values():
+                        block.close()
+                    arrays = {name: SharedArray(shape, dtype, shm_name)
+                              for name, (shm_name, shape, dtype) in specs.items()}
+
+                state = {name: arrays[name].array[:n] for name in WORKER_COLUMNS}
+                state.update(
+                    genomes=arrays['genomes'].array[:n],
+                    padded_counts=arrays['padded_counts'].array,
+                    head=arrays['head'].array,
+                    padded_pheromones=arrays['padded_pheromones'].array,
+                    width=width,
+                    height=height,
+                    step_count=step_count,
+                )
+                x = state['x']
+                rows = np.flatnonzero((x >= x0) & (x < x1))
+                inputs = sense_rows(state, rows, arrays['random'].array[rows])
+                batch = brains.update(state['id'][rows], state['genomes'][rows])
+                arrays['outputs'].array[rows] = batch.predict(inputs)
+                conn.send(('ok', len(rows)))
+            except Exception:
+                conn.send(('error', traceback.format_exc()))
+    finally:
+        for block in arrays.values():
+            block.close()
+        conn.close()
+
+class TilePool:
+    # Splits sensing and brain evaluation over worker processes, one vertical
+    # strip of the world each. Every row is evaluated by exactly one tile from
+    # the same snapshot, so the outputs match a single-process step exactly and
+    # the actions are still applied in row order by the caller.
+    #
+    # The world allocates its grids and population columns through `allocate`,
+    # so they live in shared memory for good: a step only hands the workers the
+    # sensing randoms, and block names when an array was reallocated.
+    def __init__(self, width, height, workers):
+        self.width = width
+        self.height = height
+        self.workers = max(1, min(workers, width))
+        self.bounds = [(tile * width // self.workers, (tile + 1) * width // self.workers)
+                       for tile in range(self.workers)]
+        self.blocks = {}  # id of each allocated array -> its SharedArray
+        self.columns = {}
+        self.capacity = 0
+        self.sent = None  # Specs the workers are attached to
+        self.connections = []
+        self.processes = []
+
+    def allocate(self, shape, dtype):
+        block = SharedArray(np.atleast_1d(shape), dtype)
+        block.array[:] = 0
+        self.blocks[id(block.array)] = block
+        return block.array
+
+    def shared(self, array):
+        block = self.blocks.get(id(array))
+        if block is None:
+            raise ValueError("Array was not allocated by this tile pool")
+        return block
+
+    def start(self):
+        # Spawned rather than forked: the engine steps the world from a thread
+        context = multiprocessing.get_context('spawn')
+        for bounds in self.bounds:
+            parent, child = context.Pipe()
+            process = context.Process(target=tile_worker, args=(child, bounds),
+                                      name=f'tile-{bounds[0]}-{bounds[1]}', daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def reserve(self, rows):
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, 2 * self.capacity, Population.MIN_CAPACITY)
+        for block in self.columns.values():
+            block.close()
+        self.columns = {'random': SharedArray((capacity,), np.float64),
+                        'outputs': SharedArray((capacity, NUM_ACTION_NEURONS), np.float64)}
+        self.capacity = capacity
+
+    def evaluate(self, world):
+        # Brain outputs for every row of the world's population
+        if not self.processes:
+            self.start()
+        pop = world.population
+        n = len(pop)
+        self.reserve(n)
+        self.columns['random'].array[:n] = world.rng.stream('sensing').random(n)  # Drawn here so the sequence matches serial sensing
+        world.pheromone_field.materialize()
+        metrics.count('neighbor_queries', n)  # Counted here, as workers keep metrics of their own
+
+        shared = {name: self.shared(pop.data[name]) for name in WORKER_COLUMNS}
+        shared.update(genomes=self.shared(pop.genome_data),
+                      padded_counts=self.shared(world.occupancy.padded),
+                      head=self.shared(world.occupancy.head),
+                      padded_pheromones=self.shared(world.pheromone_field.padded),
+                      **self.columns)
+        specs = {name: block.spec for name, block in shared.items()}
+        if specs != self.sent:
+            self.release(world)
+            self.sent = specs
+        else:
+            specs = None
+        for conn in self.connections:
+            conn.send((specs, n, self.width, self.height, world.step_count))
+
+        errors = []
+        evaluated = 0
+        for conn in self.connections:
+            status, value = conn.recv()
+            if status == 'ok':
+                evaluated += value
+            else:
+                errors.append(value)
+        if errors:
+            raise RuntimeError(f"Tile worker failed:\n{errors[0]}")
+        if evaluated != n:
+            raise RuntimeError(f"Tiles evaluated {evaluated} of {n} creatures")
+        return self.columns['outputs'].array[:n].copy()
+
+    def release(self, world):
+        # Frees blocks the world has replaced by growing its columns
+        in_use = {id(array) for array in (*world.population.data.values(), world.population.genome_data,
+                                          world.occupancy.padded, world.occupancy.head, world.pheromone_field.padded)}
+        for key in [key for key in self.blocks if key not in in_use]:
+            self.blocks.pop(key).close()
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.connections:
+            conn.close()
+        for block in [*self.columns.values(), *self.blocks.values()]:
+            block.close()
+        self.connections = []
+        self.processes = []
+        self.columns = {}
+        self.blocks = {}
+        self.capacity = 0
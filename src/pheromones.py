@@ -0,0 +1,83 @@
+# pheromones.py
+
+import numpy as np
+from .cells import CellStore
+from .config import PHEROMONE_DECAY, PHEROMONE_EPSILON
+
+class PheromoneField:
+    # Sparse pheromone layer. Each active cell keeps its deposit value and the
+    # tick it was laid at, and reads as value * decay ** (now - tick), so decaying
+    # the field is one counter increment. The dense grid is only brought up to
+    # date when read, by writing the active cells: every other cell is already
+    # zero there. Cells that have faded below `epsilon` are evicted at that point.
+    def __init__(self, width, height, decay=PHEROMONE_DECAY, epsilon=PHEROMONE_EPSILON, on_evict=None,
+                 allocate=np.zeros):
+        self.width = width
+        self.height = height
+        self.decay = decay
+        self.epsilon = epsilon
+        self.on_evict = on_evict  # Called with (cells, total value) of each eviction
+        self.now = 0
+        self.store = CellStore({'values': np.float64, 'ticks': np.int64})
+        # One-cell zero border, so neighborhood reads need no bounds checks or np.pad
+        self.padded = allocate((width + 2, height + 2), np.float64)
+        self.grid = self.padded[1:-1, 1:-1]
+        self.synced = True  # Whether the grid holds the values at `now`
+
+    def __len__(self):
+        return len(self.store)
+
+    def deposit(self, x, y, value):
+        self.deposit_many([x], [y], value)
+
+    def deposit_many(self, x, y, value):
+        # Same as deposit for each (x, y); the cells must be distinct
+        x = np.asarray(x, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+        slots = self.store.insert(x * self.height + y)
+        self.store.columns['values'][slots] = value
+        self.store.columns['ticks'][slots] = self.now
+        if self.synced:
+            self.grid[x, y] = value
+
+    def tick(self):
+        self.now += 1
+        self.synced = False
+
+    def materialize(self):
+        if self.synced:
+            return self.grid
+        cells, current = self.store.cells[:len(self.store)], self.current()
+        keep = current >= self.epsilon
+        self.grid[cells // self.height, cells % self.height] = np.where(keep, current, 0.0)
+        if not keep.all():
+            if self.on_evict is not None:
+                faded = current[~keep]
+                self.on_evict(len(faded), float(faded.sum()))
+            self.store.compact(keep)
+        self.synced = True
+        return self.grid
+
+    def current(self):
+        return self.store['values'] * np.power(self.decay, self.now - self.store['ticks'])
+
+    def levels(self):
+        # Cells still above `epsilon` and their values at `now`, without touching the grid
+        current = self.current()
+        keep = current >= self.epsilon
+        return self.store.cells[:len(self.store)][keep], current[keep]
+
+    def state(self):
+        return self.store.cells[:len(self.store)].copy(), self.store['values'].copy(), self.store['ticks'].copy()
+
+    def restore(self, cells, values, ticks, now):
+        self.now = int(now)
+        self.padded[:] = 0
+        self.store.restore(cells, values=values, ticks=ticks)
+        self.synced = False
+
+    def load(self, grid):
+        # Dense values become fresh deposits at the current tick
+        grid = np.asarray(grid, dtype=np.float64)
+        cells = np.flatnonzero(grid)
+        self.restore(cells, grid.reshape(-1)[cells], np.full(len(cells), self.now), self.now)
@@ -0,0 +1,244 @@
+# population.py
+
+import numpy as np
+from .creature import Creature
+from .brain import brain_cache, pack_brains, concat_brains, take_brains, unpack_brains, BrainBatch
+from .genome import weights_as_float
+from .rng import generator
+
+class Population:
+    # Per-creature state, one contiguous array per field
+    COLUMNS = {
+        'id': np.int64,
+        'x': np.int32,
+        'y': np.int32,
+        'energy': np.float64,
+        'age': np.int32,
+        'direction': np.int32,
+        'generation': np.int32,
+        'oscillator_period': np.int32,
+        'long_probe_distance': np.int32,
+        'responsiveness': np.float64,
+        'fitness': np.float64,
+        'last_move_x': np.int32,
+        'last_move_y': np.int32,
+    }
+    MIN_CAPACITY = 64
+
+    def __init__(self, num_genes, capacity=MIN_CAPACITY, allocate=np.zeros):
+        # `allocate(shape, dtype)` returns zeroed column storage, such as shared memory
+        self.num_genes = num_genes
+        self.size = 0
+        self.next_id = 0
+        self.allocate = allocate
+        capacity = max(capacity, self.MIN_CAPACITY)
+        self.data = {name: allocate(capacity, dtype) for name, dtype in self.COLUMNS.items()}
+        self.genome_data = allocate((capacity, num_genes), np.uint32)
+        # Compiled brains of the rows, packed in row order (see brain.pack_brains)
+        # and changed only when rows are spawned, selected or rebrained. Brains
+        # set one row at a time wait in `changed_brains` and are packed in on
+        # the next read, so a step's single-row changes cost one repack.
+        self.packed_brains = pack_brains([])
+        self.changed_brains = {}  # Row -> brain
+        self.batch = None
+
+    def __len__(self):
+        return self.size
+
+    def __getattr__(self, name):
+        # Columns read as live views trimmed to the current size
+        columns = self.__dict__.get('data')
+        if columns is not None and name in columns:
+            return columns[name][:self.size]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in self.COLUMNS and 'data' in self.__dict__:
+            self.data[name][:self.size] = value
+        else:
+            super().__setattr__(name, value)
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(f"Creature index {index} out of range for population of {self.size}")
+        return CreatureView(self, index)
+
+    def __iter__(self):
+        # Rows appended while iterating are not visited
+        for index in range(self.size):
+            yield CreatureView(self, index)
+
+    @property
+    def capacity(self):
+        return len(self.genome_data)
+
+    @property
+    def genomes(self):
+        return self.genome_data[:self.size]
+
+    @property
+    def brains(self):
+        # Per-row CompiledBrain views, for code working one creature at a time
+        return unpack_brains(self.brain_arrays)
+
+    @property
+    def brain_arrays(self):
+        if self.changed_brains:
+            rows, brains = zip(*sorted(self.changed_brains.items()))
+            self.changed_brains = {}
+            # Each changed row takes its new brain from past the end of the old ones
+            indices = np.arange(len(self.packed_brains['neurons']))
+            indices[list(rows)] = len(indices) + np.arange(len(rows))
+            self.set_brain_arrays(take_brains(concat_brains([self.packed_brains, pack_brains(brains)]), indices))
+        return self.packed_brains
+
+    def brain_batch(self):
+        if self.batch is None:
+            self.batch = BrainBatch(self.brain_arrays)
+        return self.batch
+
+    def set_brain_arrays(self, packed):
+        self.packed_brains = packed
+        self.changed_brains = {}
+        self.batch = None
+
+    def add_brains(self, brains):
+        self.set_brain_arrays(concat_brains([self.brain_arrays, pack_brains(brains)]))
+
+    def set_brain(self, index, brain):
+        self.changed_brains[index] = brain
+        self.batch = None
+
+    def reproduction_chances(self):
+        # Creature.get_average_reproduction_chance for every row
+        return np.mean(weights_as_float(self.genomes[:, :self.num_genes // 2]), axis=1) * 0.5 + 0.5
+
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        for name, column in self.data.items():
+            grown = self.allocate(capacity, column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.data[name] = grown
+        genomes = self.allocate((capacity, self.num_genes), np.uint32)
+        genomes[:self.size] = self.genomes
+        self.genome_data = genomes
+
+    def spawn(self, x, y, generation, genomes, direction=None, rng=None):
+        count = len(genomes)
+        start = self.size
+        self.reserve(start + count)
+        rows = slice(start, start + count)
+
+        self.data['id'][rows] = np.arange(self.next_id, self.next_id + count)
+        self.next_id += count
+        self.data['x'][rows] = x
+        self.data['y'][rows] = y
+        self.data['energy'][rows] = float(min(200, Creature.MAX_ENERGY))
+        self.data['age'][rows] = 0
+        self.data['direction'][rows] = generator(rng).integers(0, 8, count) if direction is None else direction
+        self.data['generation'][rows] = generation
+        self.data['oscillator_period'][rows] = 1
+        self.data['long_probe_distance'][rows] = 1
+        self.data['responsiveness'][rows] = 0.5
+        self.data['fitness'][rows] = 0.0
+        self.data['last_move_x'][rows] = 0
+        self.data['last_move_y'][rows] = 0
+        self.genome_data[rows] = genomes
+        self.add_brains([brain_cache.get(genome) for genome in self.genome_data[rows]])
+
+        self.size += count
+        return np.arange(start, start + count)
+
+    def append(self, creature):
+        # Adopt a standalone Creature; returns its row
+        start = self.size
+        self.extend([creature])
+        return start
+
+    def extend(self, creatures):
+        start = self.size
+        count = len(creatures)
+        if count == 0:
+            return np.arange(start, start)
+        self.reserve(start + count)
+        rows = slice(start, start + count)
+        for name in self.COLUMNS:
+            if name != 'id':
+                self.data[name][rows] = [getattr(c, name) for c in creatures]
+        self.data['id'][rows] = np.arange(self.next_id, self.next_id + count)
+        self.next_id += count
+        self.genome_data[rows] = [c.genome for c in creatures]
+        self.add_brains([c.compiled_brain for c in creatures])
+        self.size += count
+        return np.arange(start, start + count)
+
+    def select(self, indices):
+        # Keep the given rows, in the given order
+        indices = np.asarray(indices, dtype=np.int64)
+        count = len(indices)
+        for column in self.data.values():
+            column[:count] = column[indices]
+        self.genome_data[:count] = self.genome_data[indices]
+        self.set_brain_arrays(take_brains(self.brain_arrays, indices))
+        self.size = count
+
+    def compact(self, mask):
+        # Keep rows where mask is true, preserving order
+        self.select(np.flatnonzero(mask))
+
+def column_property(name):
+    def getter(self):
+        return self.population.data[name][self.index].item()
+
+    def setter(self, value):
+        self.population.data[name][self.index] = value
+
+    return property(getter, setter)
+
+class CreatureView(Creature):
+    # A row of a Population behaving like a Creature. Views are only valid until
+    # the population is compacted or reordered.
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+
+    def __eq__(self, other):
+        return (isinstance(other, CreatureView) and other.population is self.population
+                and other.index == self.index)
+
+    def __hash__(self):
+        return hash((id(self.population), self.index))
+
+    @property
+    def num_genes(self):
+        return self.population.num_genes
+
+    @property
+    def genome(self):
+        # A copy, so edits must be assigned back to recompile the brain
+        return self.population.genome_data[self.index].copy()
+
+    @genome.setter
+    def genome(self, genome):
+        self.population.genome_data[self.index] = genome
+        self.population.set_brain(self.index, brain_cache.get(self.population.genome_data[self.index]))
+
+    @property
+    def compiled_brain(self):
+        changed = self.population.changed_brains.get(self.index)
+        if changed is not None:
+            return changed
+        return unpack_brains(take_brains(self.population.packed_brains, [self.index]))[0]
+
+    @property
+    def brain(self):
+        return self.create_brain()
+
+    @brain.setter
+    def brain(self, brain):
+        self.population.set_brain(self.index, brain.compiled)
+
+for _name in Population.COLUMNS:
+    setattr(CreatureView, _name, column_property(_name))
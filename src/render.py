@@ -0,0 +1,139 @@
+# render.py
+
+import time
+import numpy as np
+from .metrics import metrics
+from .config import POOLING_MODES, DEFAULT_POOLING
+
+def parse_ints(text, count, name):
+    try:
+        values = [int(value) for value in text.split(',')]
+    except ValueError:
+        values = []
+    if len(values) != count:
+        raise ValueError(f"Invalid {name} '{text}', expected {count} comma-separated integers")
+    return values
+
+class Viewport:
+    # The region [x, x + width) by [y, y + height) of the world, drawn to fit
+    # within `resolution` pixels with its aspect ratio kept. Without a size the
+    # region runs to the world edge; without a resolution each cell is one
+    # pixel. Cells sharing a pixel are combined by `pooling`: 'max' keeps
+    # anything present visible however far out the view is, 'mean' shows density.
+    def __init__(self, x=0, y=0, width=None, height=None, resolution=None, pooling=DEFAULT_POOLING):
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"Unknown pooling '{pooling}', expected one of {list(POOLING_MODES)}")
+        if x < 0 or y < 0 or (width is not None and width < 1) or (height is not None and height < 1):
+            raise ValueError("Viewport needs a non-negative origin and a positive size")
+        if resolution is not None and min(resolution) < 1:
+            raise ValueError("Resolution must be positive")
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.resolution = resolution
+        self.pooling = pooling
+
+    @classmethod
+    def parse(cls, region=None, resolution=None, pooling=None):
+        # From query strings: region "x,y,width,height" and resolution "width,height"
+        if region is None and resolution is None and pooling is None:
+            return None
+        x, y, width, height = parse_ints(region, 4, 'viewport') if region else (0, 0, None, None)
+        resolution = parse_ints(resolution, 2, 'resolution') if resolution else None
+        return cls(x, y, width, height, resolution, pooling or DEFAULT_POOLING)
+
+    def bounds(self, world_width, world_height):
+        # (x0, y0, x1, y1, pixel width, pixel height, pooling) clipped to the
+        # world. Views that give the same bounds render the same frame.
+        x0 = min(self.x, world_width - 1)
+        y0 = min(self.y, world_height - 1)
+        x1 = world_width if self.width is None else min(x0 + self.width, world_width)
+        y1 = world_height if self.height is None else min(y0 + self.height, world_height)
+        columns, rows = x1 - x0, y1 - y0
+        if self.resolution is None:
+            return x0, y0, x1, y1, columns, rows, 'max'
+        scale = min(1.0, self.resolution[0] / columns, self.resolution[1] / rows)
+        pixel_width = min(columns, self.resolution[0], max(1, round(columns * scale)))
+        pixel_height = min(rows, self.resolution[1], max(1, round(rows * scale)))
+        # One cell per pixel renders the same either way
+        pooling = self.pooling if (pixel_width, pixel_height) != (columns, rows) else 'max'
+        return x0, y0, x1, y1, pixel_width, pixel_height, pooling
+
+class WorldSnapshot:
+    # What a frame needs to be drawn at any viewport: creature positions and
+    # the active food and pheromone cells (flat x * height + y) with their
+    # values. Its size follows the creatures and active cells, not the world
+    # area, and rendering touches only those plus the output pixels.
+    # `changed_cells` are the cells that may look different from the frame of
+    # step `since`, or None when the world cannot tell.
+    def __init__(self, width, height, x, y, food_cells, food_energy, pheromone_cells, pheromone_values,
+                 step=None, since=None, changed_cells=None):
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+        self.food_cells = food_cells
+        self.food_energy = food_energy
+        self.pheromone_cells = pheromone_cells
+        self.pheromone_values = pheromone_values
+        self.step = step
+        self.since = since
+        self.changed_cells = changed_cells
+
+    def bounds(self, viewport=None):
+        return (viewport or Viewport()).bounds(self.width, self.height)
+
+    def pixels(self, cells, bounds):
+        # Whether each flat cell is inside `bounds`, and the row-major pixel of those that are
+        x0, y0, x1, y1, pixel_width, pixel_height, _ = bounds
+        cells = np.asarray(cells, dtype=np.int64)
+        x, y = cells // self.height, cells % self.height
+        inside = (x >= x0) & (x < x1) & (y >= y0) & (y < y1)
+        return inside, (((y[inside] - y0) * pixel_height // (y1 - y0)) * pixel_width +
+                        (x[inside] - x0) * pixel_width // (x1 - x0))
+
+    def changes(self, viewport=None):
+        # (since, step, pixels): the pixels of the view that may differ from the
+        # frame of step `since`; since and pixels are None when not known
+        if self.changed_cells is None or self.since is None:
+            return None, self.step, None
+        pixel = self.pixels(self.changed_cells, self.bounds(viewport))[1]
+        return self.since, self.step, np.unique(pixel)
+
+    def render(self, viewport=None):
+        # (pixel height, pixel width, 3) uint8 frame: creatures red, food green, pheromones blue
+        started = time.perf_counter()
+        bounds = self.bounds(viewport)
+        x0, y0, x1, y1, pixel_width, pixel_height, pooling = bounds
+        columns, rows = x1 - x0, y1 - y0
+        size = pixel_width * pixel_height
+        # Cells per pixel, for mean pooling
+        area = np.outer(np.bincount(np.arange(rows) * pixel_height // rows, minlength=pixel_height),
+                        np.bincount(np.arange(columns) * pixel_width // columns, minlength=pixel_width)).reshape(-1)
+
+        def pool(pixel, values):
+            if pooling == 'max':
+                pooled = np.zeros(size)
+                np.maximum.at(pooled, pixel, values)
+                return pooled
+            return np.bincount(pixel, weights=values, minlength=size) / area
+
+        state = np.zeros((pixel_height, pixel_width, 3), dtype=np.uint8)
+        channels = state.reshape(size, 3)
+
+        # Creatures (red); stacked creatures count as one occupied cell
+        occupied = np.unique(self.x.astype(np.int64) * self.height + self.y)
+        inside, pixel = self.pixels(occupied, bounds)
+        channels[:, 0] = pool(pixel, np.full(len(pixel), 255.0)).astype(np.uint8)
+
+        # Food (green)
+        inside, pixel = self.pixels(self.food_cells, bounds)
+        channels[:, 1] = pool(pixel, np.minimum(self.food_energy[inside], 255)).astype(np.uint8)
+
+        # Pheromones (blue)
+        inside, pixel = self.pixels(self.pheromone_cells, bounds)
+        channels[:, 2] = pool(pixel, np.minimum(self.pheromone_values[inside] * 255, 255)).astype(np.uint8)
+
+        metrics.observe('rendering', time.perf_counter() - started)
+        return state
@@ -0,0 +1,50 @@
+# rng.py
+
+import numpy as np
+from .config import RNG_BLOCK_SIZE
+
+# Each phase draws from its own stream, so how much one phase draws never
+# shifts the numbers another phase sees
+PHASES = ('init', 'sensing', 'actions', 'mating', 'births', 'reproduction', 'food', 'external')
+
+def generator(rng=None):
+    # For callers outside a World, such as standalone Creature objects
+    return np.random.default_rng() if rng is None else rng
+
+class RandomStreams:
+    # Per-World randomness. The generator for a phase of a step is derived from
+    # the world seed, the step and the phase alone, so a run is reproducible
+    # from its seed and a restored checkpoint continues with the same numbers.
+    # Scalar draws come from blocks drawn in bulk.
+    def __init__(self, seed=None, block_size=RNG_BLOCK_SIZE):
+        self.seed = int(np.random.SeedSequence().entropy if seed is None else seed)
+        self.block_size = max(1, int(block_size))
+        self.step = 0
+        self.generators = {}
+        self.blocks = {}
+
+    def begin_step(self, step):
+        if step != self.step:
+            self.step = step
+            self.generators.clear()
+            self.blocks.clear()
+
+    def stream(self, phase):
+        rng = self.generators.get(phase)
+        if rng is None:
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(self.step, PHASES.index(phase)))
+            rng = self.generators[phase] = np.random.Generator(np.random.PCG64(sequence))
+        return rng
+
+    def random(self, phase):
+        # One uniform float in [0, 1) from the phase's pre-drawn block
+        block = self.blocks.get(phase)
+        if block is None or block[1] == len(block[0]):
+            block = self.blocks[phase] = [self.stream(phase).random(self.block_size), 0]
+        values, position = block
+        block[1] = position + 1
+        return float(values[position])
+
+    def integers(self, phase, low, high):
+        # One integer in [low, high) from the phase's pre-drawn block
+        return low + min(int(self.random(phase) * (high - low)), high - low - 1)
@@ -0,0 +1,147 @@
+# runner.py
+
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+import numpy as np
+from .simulation import Simulation
+from .metrics import metrics
+
+STAT_COLUMNS = [
+    'step_count', 'generation', 'population', 'total_food', 'food_locations',
+    'total_pheromone', 'pheromone_locations', 'avg_creature_age', 'oldest_creature_age'
+]
+
+class StatsWriter:
+    # CSV rows are streamed as they arrive; .npz output is written column-wise at close
+    def __init__(self, path):
+        self.path = path
+        self.columnar = path is not None and path.endswith('.npz')
+        self.rows = []
+        self.file = None
+        self.writer = None
+        if path is not None and not self.columnar:
+            self.file = open(path, 'w', newline='')
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(STAT_COLUMNS)
+
+    def record(self, stats):
+        row = [stats[column] for column in STAT_COLUMNS]
+        if self.writer is not None:
+            self.writer.writerow(row)
+            self.file.flush()
+        else:
+            self.rows.append(row)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        elif self.columnar:
+            columns = list(zip(*self.rows)) if self.rows else [[] for _ in STAT_COLUMNS]
+            np.savez_compressed(self.path, **{name: np.asarray(values) for name, values in zip(STAT_COLUMNS, columns)})
+
+def run_headless(params, steps=None, generations=None, stats_every=100, writer=None):
+    # Steps the world without rendering frames. Stops after `steps` updates, once
+    # `generations` generations have passed, or when the population dies out.
+    if steps is None and generations is None:
+        raise ValueError("Give a number of steps or generations to run")
+    metrics.reset()
+    simulation = Simulation()
+    simulation.start_simulation(params)
+    world = simulation.world
+
+    steps_run = 0
+    started = time.perf_counter()
+    try:
+        while not world.is_simulation_over():
+            if steps is not None and steps_run >= steps:
+                break
+            if generations is not None and world.generation >= generations:
+                break
+            simulation.run_step()
+            steps_run += 1
+            if writer is not None and steps_run % stats_every == 0:
+                writer.record(world.get_stats())
+    finally:
+        world.close()  # Stops tile workers, if any
+    elapsed = time.perf_counter() - started
+
+    if writer is not None and steps_run % stats_every != 0:
+        writer.record(world.get_stats())
+    return {
+        'steps': steps_run,
+        'seed': world.params['seed'],
+        'elapsed': elapsed,
+        'steps_per_second': steps_run / elapsed if elapsed > 0 else 0.0,
+        'final_stats': world.get_stats(),
+        'metrics': metrics.snapshot(),
+    }
+
+def print_metrics(snapshot):
+    phases = snapshot['phases']
+    step_total = phases.get('step', {}).get('total', 0.0)
+    print(f"{'phase':<16}{'calls':>8}{'total s':>10}{'share':>8}{'mean ms':>10}{'p95 ms':>10}")
+    for phase, summary in sorted(phases.items(), key=lambda item: -item[1].get('total', 0.0)):
+        if not summary['count']:
+            continue
+        share = summary['total'] / step_total * 100 if step_total and phase != 'step' else 100.0
+        print(f"{phase:<16}{summary['count']:>8}{summary['total']:>10.3f}{share:>7.1f}%"
+              f"{summary['mean'] * 1000:>10.3f}{summary['p95'] * 1000:>10.3f}")
+    for counter, value in sorted(snapshot['counters'].items()):
+        print(f"{counter:<16}{value:>8}")
+
+def parse_param(text):
+    key, _, value = text.partition('=')
+    if not key or not value:
+        raise argparse.ArgumentTypeError(f"Expected key=value, got '{text}'")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the Enki simulation headless, without frame rendering.")
+    limit = parser.add_mutually_exclusive_group(required=True)
+    limit.add_argument('--steps', type=int, help="number of world updates to run")
+    limit.add_argument('--generations', type=int, help="run until this many generations have passed")
+    parser.add_argument('--width', type=int)
+    parser.add_argument('--height', type=int)
+    parser.add_argument('--population', type=int, dest='initial_population')
+    parser.add_argument('--seed', type=int, help="seed for a reproducible run; drawn at random if omitted")
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        help="extra World parameter as key=value, may be repeated")
+    parser.add_argument('--stats-every', type=int, default=100, help="record stats every N updates")
+    parser.add_argument('--output', help="stats file, .csv or columnar .npz")
+    parser.add_argument('--metrics', action='store_true', help="print time spent per step phase")
+    parser.add_argument('--log-level', default='WARNING')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    params = dict(args.param)
+    for key in ('width', 'height', 'initial_population', 'seed'):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+
+    writer = StatsWriter(args.output) if args.output else None
+    try:
+        result = run_headless(params, args.steps, args.generations, max(1, args.stats_every), writer)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    stats = result['final_stats']
+    print(f"Ran {result['steps']} steps in {result['elapsed']:.2f}s "
+          f"({result['steps_per_second']:.1f} steps/sec); "
+          f"population {stats['population']}, generation {stats['generation']}; seed {result['seed']}")
+    if args.metrics:
+        print_metrics(result['metrics'])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
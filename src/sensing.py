@@ -0,0 +1,154 @@
+# sensing.py
+
+import numpy as np
+from .config import NUM_SENSORY_NEURONS
+from .creature import Creature
+from .genome import similarity
+from .metrics import metrics
+
+# Same ordering as World.get_direction_vector
+DIRECTION_VECTORS = np.array([
+    (0, 1),   # North
+    (1, 1),   # Northeast
+    (1, 0),   # East
+    (1, -1),  # Southeast
+    (0, -1),  # South
+    (-1, -1), # Southwest
+    (-1, 0),  # West
+    (-1, 1)   # Northwest
+], dtype=np.int64)
+
+def box_sum(padded, x, y, dx_range, dy_range):
+    # `padded` carries a one-cell zero border, so out-of-grid cells add nothing
+    total = np.zeros(len(x), dtype=padded.dtype)
+    for dx in dx_range:
+        for dy in dy_range:
+            total += padded[x + 1 + dx, y + 1 + dy]
+    return total
+
+# Everything sensing reads, so tile workers can sense from shared copies
+STATE_COLUMNS = ('x', 'y', 'direction', 'age', 'oscillator_period', 'long_probe_distance',
+                 'last_move_x', 'last_move_y')
+
+def population_state(world):
+    pop = world.population
+    state = {name: getattr(pop, name) for name in STATE_COLUMNS}
+    world.pheromone_field.materialize()
+    state.update(
+        genomes=pop.genomes,
+        padded_counts=world.occupancy.padded,
+        head=world.occupancy.head,
+        padded_pheromones=world.pheromone_field.padded,
+        width=world.width,
+        height=world.height,
+        step_count=world.step_count,
+    )
+    return state
+
+def sense_population(world):
+    n = len(world.population)
+    if n == 0:
+        return np.zeros((0, NUM_SENSORY_NEURONS))
+    return sense_rows(population_state(world), np.arange(n), world.rng.stream('sensing').random(n))
+
+def sense_rows(state, rows, random_values):
+    # Sensor inputs for the given rows; `random_values` fills the RANDOM sensor
+    n = len(rows)
+    inputs = np.zeros((n, NUM_SENSORY_NEURONS))
+    if n == 0:
+        return inputs
+    metrics.count('neighbor_queries', n)  # One neighborhood read per sensed row
+
+    width, height = state['width'], state['height']
+    x = state['x'][rows].astype(np.int64)
+    y = state['y'][rows].astype(np.int64)
+    direction = state['direction'][rows]
+    age = state['age'][rows]
+    osc_period = state['oscillator_period'][rows]
+    probe = state['long_probe_distance'][rows].astype(np.int64)
+    genomes = state['genomes']
+
+    # Both grids carry a one-cell zero border, kept up to date by their owners
+    padded_counts = state['padded_counts']
+    padded_pheromones = state['padded_pheromones']
+    counts = padded_counts[1:-1, 1:-1]
+    pheromones = padded_pheromones[1:-1, 1:-1]
+
+    dx, dy = DIRECTION_VECTORS[direction, 0], DIRECTION_VECTORS[direction, 1]
+    fwd_x, fwd_y = (x + dx) % width, (y + dy) % height
+    rev_x, rev_y = (x - dx) % width, (y - dy) % height
+    fwd_count = counts[fwd_x, fwd_y]
+
+    # LOC_X, LOC_Y
+    inputs[:, 0] = x / width
+    inputs[:, 1] = y / height
+
+    # BOUNDARY_DIST_X, BOUNDARY_DIST, BOUNDARY_DIST_Y
+    border_x = np.minimum(x, width - 1 - x) / (width / 2)
+    border_y = np.minimum(y, height - 1 - y) / (height / 2)
+    inputs[:, 2] = border_x
+    inputs[:, 3] = np.minimum(border_x, border_y)
+    inputs[:, 4] = border_y
+
+    # GENETIC_SIM_FWD, only for creatures facing an occupied cell
+    facing = np.flatnonzero(fwd_count)
+    others = state['head'][fwd_x[facing], fwd_y[facing]]
+    inputs[facing, 5] = similarity(genomes[rows[facing]], genomes[others])
+
+    # LAST_MOVE_DIR_X, LAST_MOVE_DIR_Y
+    inputs[:, 6] = state['last_move_x'][rows]
+    inputs[:, 7] = state['last_move_y'][rows]
+
+    # LONGPROBE_POP_FWD, LONGPROBE_BAR_FWD: walk all probes together, one cell per iteration
+    probe_count = np.zeros(n)
+    first_hit = np.zeros(n, dtype=np.int64)
+    for i in range(1, int(probe.max()) + 1):
+        active = probe >= i
+        hits = counts[(x + (i + 1) * dx) % width, (y + (i + 1) * dy) % height] * active
+        probe_count += hits
+        first_hit[(first_hit == 0) & (hits > 0)] = i
+    inputs[:, 8] = probe_count / (probe * 5)
+    inputs[:, 9] = np.where(first_hit > 0, first_hit / probe, 1.0)
+
+    # POPULATION
+    inputs[:, 10] = box_sum(padded_counts, x, y, (-1, 0, 1), (-1, 0, 1)) / 9
+
+    # POPULATION_FWD
+    inputs[:, 11] = (fwd_count - counts[rev_x, rev_y] + 1) / 2
+
+    # POPULATION_LR
+    left_count = box_sum(padded_counts, x, y, (-1,), (-1, 0, 1))
+    right_count = box_sum(padded_counts, x, y, (1,), (-1, 0, 1))
+    inputs[:, 12] = (right_count - left_count + 3) / 6
+
+    # OSC1
+    inputs[:, 13] = np.sin(2 * np.pi * state['step_count'] / osc_period)
+
+    # AGE
+    inputs[:, 14] = age / Creature.MAX_AGE
+
+    # BARRIER_FWD
+    inputs[:, 15] = (fwd_count > 0).astype(np.float64)
+
+    # BARRIER_LR
+    left_blocked = (x == 0) | (padded_counts[x, y + 1] > 0)
+    right_blocked = (x == width - 1) | (padded_counts[x + 2, y + 1] > 0)
+    inputs[:, 16] = (left_blocked.astype(np.float64) + right_blocked) / 2
+
+    # RANDOM
+    inputs[:, 17] = random_values
+
+    # SIGNAL0: mean over the neighborhood cells that lie inside the grid
+    cells = ((np.minimum(width, x + 2) - np.maximum(0, x - 1)) *
+             (np.minimum(height, y + 2) - np.maximum(0, y - 1)))
+    inputs[:, 18] = box_sum(padded_pheromones, x, y, (-1, 0, 1), (-1, 0, 1)) / cells
+
+    # SIGNAL0_FWD
+    inputs[:, 19] = (pheromones[x, np.minimum(height - 1, y + 1)] - pheromones[x, y] + 1) / 2
+
+    # SIGNAL0_LR
+    left = pheromones[np.maximum(0, x - 1), y]
+    right = pheromones[np.minimum(width - 1, x + 1), y]
+    inputs[:, 20] = (right - left + 1) / 2
+
+    return inputs
@@ -0,0 +1,365 @@
+# sessions.py
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from .simulation import Simulation
+from .engine import FrameBuffer, SimulationEngine
+from .checkpoint import checkpoint_path
+from .metrics import metrics
+from .config import (MAX_SESSIONS, SESSION_IDLE_TIMEOUT, SESSION_REAP_INTERVAL, SESSION_COMMAND_TIMEOUT,
+                     DEFAULT_TARGET_STEP_RATE, CHECKPOINT_DIR)
+
+class SessionLimitError(RuntimeError):
+    pass
+
+class ForwardingEngine(SimulationEngine):
+    # Sends the frames it publishes on to the parent process while the session
+    # has viewers; unwatched frames are never pickled
+    def __init__(self, simulation, send):
+        super().__init__(simulation)
+        self.send = send
+        self.forwarding = False
+
+    def publish(self, frame):
+        super().publish(frame)
+        if self.forwarding:
+            self.send(('frame', frame))
+
+# Commands a session worker runs for the parent, each given the worker's
+# simulation and engine followed by the request arguments
+
+def start(simulation, engine, params):
+    # The engine is the only thing that steps the world, so swap worlds while it is stopped
+    engine.stop()
+    simulation.start_simulation(params)
+    engine.start(params.get('target_step_rate', DEFAULT_TARGET_STEP_RATE))
+    return simulation.params
+
+def save(simulation, engine, name):
+    if simulation.world is None:
+        raise ValueError("Simulation not started")
+    # Hold the engine between steps so the snapshot is consistent
+    with engine.step_lock:
+        path = checkpoint_path(name or f"step-{simulation.world.step_count}")
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        started = time.perf_counter()
+        simulation.save_checkpoint(path)
+        elapsed = time.perf_counter() - started
+    return {'name': os.path.basename(path), 'bytes': os.path.getsize(path), 'seconds': elapsed}
+
+def restore(simulation, engine, path, param_overrides):
+    engine.stop()
+    try:
+        started = time.perf_counter()
+        simulation.restore_checkpoint(path, param_overrides)
+        elapsed = time.perf_counter() - started
+    finally:
+        # A failed restore leaves the previous world, which keeps running
+        if simulation.world is not None:
+            engine.start(simulation.params.get('target_step_rate', DEFAULT_TARGET_STEP_RATE))
+    return {'params': simulation.params, 'stats': simulation.world.get_stats(), 'seconds': elapsed}
+
+def recent_events(simulation, engine, limit, event_type):
+    if simulation.world is None:
+        raise ValueError("Simulation not started")
+    events = simulation.world.events
+    if events is None:
+        return None
+    with engine.step_lock:
+        return {'events': events.recent(limit, event_type), 'summary': events.summary()}
+
+def genome_stats(simulation, engine):
+    if simulation.world is None:
+        raise ValueError("Simulation not started")
+    with engine.step_lock:
+        return simulation.world.get_genome_stats()
+
+def watch(simulation, engine, watched):
+    engine.forwarding = watched
+
+def report(simulation, engine, prometheus):
+    if prometheus:
+        return metrics.prometheus()
+    snapshot = metrics.snapshot()
+    snapshot['engine'] = {'running': engine.running, 'steps_per_second': engine.steps_per_second}
+    return snapshot
+
+COMMANDS = {
+    'start': start,
+    'checkpoint': save,
+    'restore': restore,
+    'events': recent_events,
+    'genomes': genome_stats,
+    'metrics': report,
+    'watch': watch,
+}
+
+def session_worker(conn, session_id):
+    # Hosts one session in a process of its own: a Simulation, the engine
+    # thread stepping it and its own step metrics. Requests arrive as
+    # (request id, command, args) and are answered in turn; frames are sent
+    # on the same pipe as the engine publishes them.
+    logger = logging.getLogger(__name__)
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    simulation = Simulation()
+    engine = ForwardingEngine(simulation, send)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            request_id, command, args = message
+            try:
+                send(('reply', request_id, COMMANDS[command](simulation, engine, *args)))
+            except Exception as e:
+                if not isinstance(e, ValueError):
+                    logger.error(f"Session {session_id} failed to run '{command}': {str(e)}", exc_info=True)
+                send(('error', request_id, (isinstance(e, ValueError), str(e))))
+    finally:
+        engine.stop()
+        if simulation.world is not None:
+            simulation.world.close()
+        conn.close()
+
+class Session:
+    # Parent-side handle of one session worker. A reader thread moves the
+    # worker's frames into a local FrameBuffer, so viewers are served from this
+    # process and a slow viewer only skips frames, never holding up the worker.
+    def __init__(self, session_id, context):
+        self.id = session_id
+        self.params = {}
+        self.frames = FrameBuffer()
+        self.frames.open()
+        self.replies = queue.Queue()
+        self.call_lock = threading.Lock()  # One request in flight at a time
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.viewers = 0
+        self.watched = False  # Whether the worker forwards frames
+        self.watch_lock = threading.Lock()
+        self.last_active = time.monotonic()
+
+        parent, child = context.Pipe()
+        # Not a daemon, so the session's world may start its own tile workers
+        self.process = context.Process(target=session_worker, args=(child, session_id),
+                                       name=f'session-{session_id}')
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.reader = threading.Thread(target=self.read, name=f'session-{session_id}-reader', daemon=True)
+        self.reader.start()
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def idle_for(self):
+        return 0.0 if self.viewers else time.monotonic() - self.last_active
+
+    def read(self):
+        try:
+            while True:
+                message = self.conn.recv()
+                if message[0] == 'frame':
+                    self.frames.publish(message[1])
+                else:
+                    self.replies.put(message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.frames.finish()
+            self.replies.put(None)
+
+    def call(self, command, *args, timeout=SESSION_COMMAND_TIMEOUT):
+        self.touch()
+        with self.call_lock:
+            self.requests += 1
+            request_id = self.requests
+            try:
+                self.conn.send((request_id, command, args))
+            except (BrokenPipeError, OSError):
+                raise RuntimeError(f"Session {self.id} has stopped")
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    reply = self.replies.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise TimeoutError(f"Session {self.id} did not answer '{command}' within {timeout} seconds")
+                if reply is None:
+                    self.replies.put(None)  # Left for any later call
+                    raise RuntimeError(f"Session {self.id} has stopped")
+                status, reply_id, value = reply
+                if reply_id != request_id:
+                    continue  # Late answer to a request that timed out
+                if status == 'reply':
+                    return value
+                is_value_error, message = value
+                raise (ValueError if is_value_error else RuntimeError)(message)
+
+    def subscribe(self):
+        # Frames for one viewer; a session is not idle while it has viewers
+        self.add_viewers(1)
+        try:
+            yield from self.frames.subscribe()
+        finally:
+            self.add_viewers(-1)
+            self.touch()
+
+    def add_viewers(self, change):
+        # The worker forwards frames only while someone is watching
+        with self.watch_lock:
+            with self.lock:
+                self.viewers += change
+                watched = self.viewers > 0
+            if watched != self.watched:
+                try:
+                    self.call('watch', watched)
+                    self.watched = watched
+                except (RuntimeError, TimeoutError):
+                    pass  # A stopped worker sends nothing either way
+
+    def describe(self):
+        return {
+            'session_id': self.id,
+            'alive': self.alive,
+            'viewers': self.viewers,
+            'idle_seconds': self.idle_for(),
+            'params': self.params,
+        }
+
+    def close(self):
+        if self.call_lock.acquire(timeout=5):
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            finally:
+                self.call_lock.release()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        self.frames.finish()
+
+class SessionManager:
+    # At most `max_sessions` sessions by id, the newest being the default one
+    # for requests that name none. Sessions idle for longer than `idle_timeout`
+    # (no requests and no viewers) or whose worker died are closed by a reaper
+    # thread, and before a new session is created.
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_timeout=SESSION_IDLE_TIMEOUT,
+                 reap_interval=SESSION_REAP_INTERVAL):
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.sessions = {}  # In creation order
+        self.starting = 0  # Sessions whose workers are being spawned, counted against the limit
+        self.lock = threading.Lock()
+        # Spawned rather than forked: the server and the engines run threads
+        self.context = multiprocessing.get_context('spawn')
+        self.stop_event = threading.Event()
+        self.reaper = None
+        self.logger = logging.getLogger(__name__)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id=None):
+        with self.lock:
+            if session_id is None:
+                session = next(reversed(self.sessions.values()), None)
+            else:
+                session = self.sessions.get(session_id)
+        if session is not None:
+            session.touch()
+        return session
+
+    def describe(self):
+        with self.lock:
+            return [session.describe() for session in self.sessions.values()]
+
+    def start(self, params, session=None):
+        # Starts a world in the given session's worker, replacing its current
+        # world, or in a new session
+        created = session is None
+        if created:
+            session = self.create()
+        try:
+            session.params = session.call('start', params)
+        except Exception:
+            if created:
+                self.close(session.id)
+            raise
+        return session
+
+    def create(self):
+        self.evict_idle()
+        with self.lock:
+            if len(self.sessions) + self.starting >= self.max_sessions:
+                raise SessionLimitError(f"All {self.max_sessions} sessions are in use")
+            self.starting += 1
+        # Spawning takes a while, so the worker starts outside the lock and the
+        # session is only registered once it runs
+        session = None
+        try:
+            session = Session(uuid.uuid4().hex, self.context)
+        finally:
+            with self.lock:
+                self.starting -= 1
+                if session is not None:
+                    self.sessions[session.id] = session
+                    if self.reaper is None:
+                        self.reaper = threading.Thread(target=self.reap, name='session-reaper', daemon=True)
+                        self.reaper.start()
+        return session
+
+    def close(self, session_id):
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def evict_idle(self):
+        with self.lock:
+            evicted = [session.id for session in self.sessions.values()
+                       if not session.alive or session.idle_for() > self.idle_timeout]
+        for session_id in evicted:
+            self.logger.info(f"Evicting session {session_id}")
+            self.close(session_id)
+        return evicted
+
+    def reap(self):
+        while not self.stop_event.wait(self.reap_interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                self.logger.error(f"Failed to evict idle sessions: {str(e)}", exc_info=True)
+
+    def close_all(self):
+        self.stop_event.set()
+        with self.lock:
+            session_ids = list(self.sessions)
+        for session_id in session_ids:
+            self.close(session_id)
+
+sessions = SessionManager()
+atexit.register(sessions.close_all)
@@ -1,8 +1,10 @@
 # simulation.py
 
 from .world import World
+from .checkpoint import save_world, load_world
+from .metrics import metrics
 from .config import WORLD_WIDTH, WORLD_HEIGHT, INITIAL_POPULATION, DEFAULT_MIN_REPRODUCTION_ENERGY, DEFAULT_MAX_AGE, DEFAULT_ENERGY_GAIN_FROM_KILLING, DEFAULT_REPRODUCTION_ENERGY_COST, DEFAULT_MOVE_ENERGY_COST, DEFAULT_IDLE_ENERGY_COST, DEFAULT_PHEROMONE_ENERGY_COST, DEFAULT_LONG_PROBE_ENERGY_COST, DEFAULT_NUM_GENES
-from .utils import logging_decorator
+from .config import DEFAULT_FRAME_FORMAT
 
 class Simulation:
     def __init__(self):
@@ -10,20 +12,33 @@ class Simulation:
         self.params = {}
 
     def start_simulation(self, params):
+        if self.world is not None:
+            self.world.close()
         self.params = params
         width = params.get('width', WORLD_WIDTH)
         height = params.get('height', WORLD_HEIGHT)
         initial_population = params.get('initial_population', INITIAL_POPULATION)
         self.world = World(width, height, initial_population, params)
 
-    def run_step(self):
+    def save_checkpoint(self, file):
         if self.world is None:
             raise ValueError("Simulation not started. Call start_simulation first.")
-        self.world.update()
+        save_world(self.world, file, self.params)
+
+    def restore_checkpoint(self, file, param_overrides=None):
+        world, self.params = load_world(file, param_overrides)
+        if self.world is not None:
+            self.world.close()
+        self.world = world
 
-    def get_simulation_data(self):
+    def run_step(self):
         if self.world is None:
             raise ValueError("Simulation not started. Call start_simulation first.")
-        return self.world.simulation_data()
+        with metrics.timed('step'):
+            self.world.update()
+        metrics.count('steps')
 
-simulation = Simulation()
+    def get_simulation_data(self, frame_format=DEFAULT_FRAME_FORMAT, frame_encoder=None):
+        if self.world is None:
+            raise ValueError("Simulation not started. Call start_simulation first.")
+        return self.world.simulation_data(frame_format, frame_encoder)
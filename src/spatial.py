@@ -0,0 +1,182 @@
+# spatial.py
+
+import numpy as np
+from .metrics import metrics
+
+class OccupancyGrid:
+    # Per-cell creature counts plus an intrusive linked list of population rows
+    # per cell: `head` holds the lowest row in a cell, `next` chains the rest in
+    # ascending order. `counts` is a view into `padded`, which keeps a one-cell
+    # zero border for neighborhood sums. Every row remembers its cell, so
+    # updates only touch the cells rows leave or enter, never the whole grid.
+    def __init__(self, width, height, allocate=np.zeros):
+        self.width = width
+        self.height = height
+        self.padded = allocate((width + 2, height + 2), np.int32)
+        self.counts = self.padded[1:-1, 1:-1]
+        self.head = allocate((width, height), np.int64)
+        self.head[:] = -1
+        self.next = np.full(64, -1, dtype=np.int64)
+        self.cell = np.full(64, -1, dtype=np.int64)  # Flat cell (x * height + y) of each row, -1 if none
+        self.rows = 0  # Rows at or above this are not linked
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def reserve(self, rows):
+        if rows > len(self.next):
+            capacity = max(rows, 2 * len(self.next))
+            for name in ('next', 'cell'):
+                column = getattr(self, name)
+                grown = np.full(capacity, -1, dtype=np.int64)
+                grown[:len(column)] = column
+                setattr(self, name, grown)
+
+    def padded_index(self, cells):
+        # Flat index into `padded` of flat cells
+        return (cells // self.height + 1) * (self.height + 2) + cells % self.height + 1
+
+    def cells_of(self, x, y):
+        return np.asarray(x, dtype=np.int64) * self.height + np.asarray(y, dtype=np.int64)
+
+    def link(self, rows):
+        # Links ascending `rows` into their cells, whose lists must be empty
+        if len(rows) == 0:
+            return
+        cells = self.cell[rows]
+        order = np.argsort(cells, kind='stable')
+        rows, cells = rows[order], cells[order]
+        same_cell = cells[1:] == cells[:-1]
+        self.next[rows] = -1
+        self.next[rows[:-1][same_cell]] = rows[1:][same_cell]
+        group_start = np.concatenate(([True], ~same_cell))
+        self.head.reshape(-1)[cells[group_start]] = rows[group_start]
+
+    def relink(self, cells):
+        # Rebuilds the lists of the given flat cells from the rows' cells
+        self.head.reshape(-1)[cells] = -1
+        self.link(np.flatnonzero(np.isin(self.cell[:self.rows], cells)))
+
+    def add_many(self, rows, x, y):
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        self.reserve(int(rows.max()) + 1)
+        cells = self.cells_of(x, y)
+        self.cell[rows] = cells
+        self.rows = max(self.rows, int(rows.max()) + 1)
+        np.add.at(self.padded.reshape(-1), self.padded_index(cells), 1)
+        self.relink(np.unique(cells))
+
+    def move_many(self, rows, x, y):
+        # Moves linked rows to (x, y), relinking only the cells they leave or enter
+        rows = np.asarray(rows, dtype=np.int64)
+        new = self.cells_of(x, y)
+        old = self.cell[rows]
+        moved = old != new
+        if not moved.any():
+            return
+        rows, old, new = rows[moved], old[moved], new[moved]
+        flat = self.padded.reshape(-1)
+        np.subtract.at(flat, self.padded_index(old), 1)
+        np.add.at(flat, self.padded_index(new), 1)
+        self.cell[rows] = new
+        self.relink(np.unique(np.concatenate((old, new))))
+
+    def rebuild(self, x, y):
+        # Bulk rebuild from position arrays after rows were compacted or reordered.
+        # Only the cells occupied before are cleared.
+        n = len(x)
+        self.reserve(n)
+        old = self.cell[:self.rows]
+        old = old[old >= 0]
+        self.padded.reshape(-1)[self.padded_index(old)] = 0
+        self.head.reshape(-1)[old] = -1
+        self.cell[:self.rows] = -1
+        cells = self.cells_of(x, y)
+        self.cell[:n] = cells
+        self.rows = n
+        np.add.at(self.padded.reshape(-1), self.padded_index(cells), 1)
+        self.link(np.arange(n))
+
+    def count_at(self, x, y):
+        # Positions off the grid are never occupied
+        if not self.in_bounds(x, y):
+            return 0
+        return int(self.counts[x, y])
+
+    def first_at(self, x, y):
+        # A row occupying the cell, or -1
+        return int(self.head[x, y])
+
+    def rows_at(self, x, y):
+        row = int(self.head[x, y])
+        while row != -1:
+            yield row
+            row = int(self.next[row])
+
+    def count_in_box(self, x0, x1, y0, y1):
+        # Inclusive box, clipped to the grid
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width - 1, x1), min(self.height - 1, y1)
+        if x0 > x1 or y0 > y1:
+            return 0
+        return int(self.counts[x0:x1 + 1, y0:y1 + 1].sum())
+
+    def rows_in_box(self, x0, x1, y0, y1):
+        # Rows in an inclusive box clipped to the grid, in ascending row order
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width - 1, x1), min(self.height - 1, y1)
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.int64)
+        cells = np.argwhere(self.counts[x0:x1 + 1, y0:y1 + 1])
+        rows = [row for cx, cy in (cells + (x0, y0)).tolist() for row in self.rows_at(cx, cy)]
+        return np.sort(np.array(rows, dtype=np.int64))
+
+class BucketIndex:
+    # Rows bucketed into square cells of `cell_size`, stored CSR-style (rows sorted
+    # by bucket, then by row), for answering many box queries in one pass
+    def __init__(self, x, y, width, height, cell_size):
+        self.cell_size = max(1, int(cell_size))
+        self.buckets_x = -(-width // self.cell_size)
+        self.buckets_y = -(-height // self.cell_size)
+        bucket = (np.asarray(x, dtype=np.int64) // self.cell_size * self.buckets_y +
+                  np.asarray(y, dtype=np.int64) // self.cell_size)
+        self.order = np.argsort(bucket, kind='stable')
+        counts = np.bincount(bucket, minlength=self.buckets_x * self.buckets_y)
+        self.starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    def box_pairs(self, qx, qy, radius, max_pairs):
+        # Yields (query, row) pairs covering every row within `radius` cells of each
+        # query along both axes. Buckets are coarse, so callers apply the exact
+        # distance test. Queries are chunked to keep each batch near `max_pairs`.
+        if len(qx) == 0:
+            return
+        metrics.count('neighbor_queries', len(qx))
+        qx = np.asarray(qx, dtype=np.int64) // self.cell_size
+        qy = np.asarray(qy, dtype=np.int64) // self.cell_size
+        reach = -(-int(radius) // self.cell_size)
+        offsets = np.arange(-reach, reach + 1)
+        bx = qx[:, None, None] + offsets[None, :, None]
+        by = qy[:, None, None] + offsets[None, None, :]
+        valid = (bx >= 0) & (bx < self.buckets_x) & (by >= 0) & (by < self.buckets_y)
+        bucket = np.where(valid, bx * self.buckets_y + by, 0).reshape(len(qx), -1)
+        valid = valid.reshape(len(qx), -1)
+        begin = self.starts[bucket]
+        lengths = np.where(valid, self.starts[bucket + 1] - begin, 0)
+
+        totals = np.cumsum(lengths.sum(axis=1))
+        if len(totals) == 0 or totals[-1] == 0:
+            return
+        bounds = np.searchsorted(totals, np.arange(max_pairs, totals[-1], max_pairs), side='right')
+        bounds = np.unique(np.concatenate(([0], bounds, [len(qx)])))
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            seg_lengths = lengths[a:b].reshape(-1)
+            seg_begin = begin[a:b].reshape(-1)
+            total = int(seg_lengths.sum())
+            if total == 0:
+                continue
+            query = np.repeat(np.repeat(np.arange(a, b), lengths.shape[1]), seg_lengths)
+            seg_offsets = np.cumsum(seg_lengths) - seg_lengths
+            position = np.arange(total) - np.repeat(seg_offsets, seg_lengths) + np.repeat(seg_begin, seg_lengths)
+            yield query, self.order[position]
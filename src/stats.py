@@ -0,0 +1,90 @@
+# stats.py
+
+import numpy as np
+
+class WorldStats:
+    # Running totals behind World.get_stats, updated as the world changes so that
+    # reading them never touches the grids. Ages are kept as birth ticks: every
+    # aging step bumps `ticks`, and a creature's age is ticks - its birth tick.
+    # Changes made behind the World's back are picked up by the next resync.
+    def __init__(self):
+        self.total_pheromone = 0.0
+        self.pheromone_locations = 0
+        self.total_food = 0.0
+        self.food_locations = 0
+        self.ticks = 0
+        self.population = 0
+        self.birth_tick_sum = 0
+        self.birth_ticks = {}  # Birth tick -> live creatures born then
+        self.oldest_tick = None
+
+    def resync(self, world):
+        self.total_pheromone = float(np.sum(world.pheromones))
+        self.pheromone_locations = int(np.count_nonzero(world.pheromones))
+        self.total_food = world.food_layer.total()
+        self.food_locations = world.food_layer.locations()
+        self.population = 0
+        self.birth_tick_sum = 0
+        self.birth_ticks = {}
+        self.oldest_tick = None
+        self.add_creatures(world.population.age)
+
+    def pheromone_set(self, old, new):
+        # Scalars or matching arrays of replaced and new cell values
+        self.total_pheromone += float(np.sum(new) - np.sum(old))
+        self.pheromone_locations += int(np.count_nonzero(new)) - int(np.count_nonzero(old))
+
+    def pheromones_decayed(self, factor):
+        self.total_pheromone *= factor
+
+    def pheromones_evicted(self, cells, total):
+        self.total_pheromone -= total
+        self.pheromone_locations -= cells
+
+    def food_set(self, old, new):
+        # Scalars or matching arrays of replaced and new cell energies
+        self.total_food += float(np.sum(new) - np.sum(old))
+        self.food_locations += int(np.count_nonzero(new)) - int(np.count_nonzero(old))
+
+    def aged(self):
+        self.ticks += 1
+
+    def add_creatures(self, ages):
+        ticks = self.ticks - np.asarray(ages, dtype=np.int64)
+        if len(ticks) == 0:
+            return
+        unique, counts = np.unique(ticks, return_counts=True)
+        for tick, count in zip(unique.tolist(), counts.tolist()):
+            self.birth_ticks[tick] = self.birth_ticks.get(tick, 0) + count
+        self.population += len(ticks)
+        self.birth_tick_sum += int(ticks.sum())
+        if self.oldest_tick is None or unique[0] < self.oldest_tick:
+            self.oldest_tick = int(unique[0])
+
+    def remove_creatures(self, ages):
+        ticks = self.ticks - np.asarray(ages, dtype=np.int64)
+        if len(ticks) == 0:
+            return
+        unique, counts = np.unique(ticks, return_counts=True)
+        for tick, count in zip(unique.tolist(), counts.tolist()):
+            remaining = self.birth_ticks.get(tick, 0) - count
+            if remaining > 0:
+                self.birth_ticks[tick] = remaining
+            else:
+                self.birth_ticks.pop(tick, None)
+        self.population -= len(ticks)
+        self.birth_tick_sum -= int(ticks.sum())
+        if self.oldest_tick not in self.birth_ticks:
+            # Only scans the distinct birth ticks still alive, a few hundred at most
+            self.oldest_tick = min(self.birth_ticks) if self.birth_ticks else None
+
+    def summary(self):
+        population = self.population
+        return {
+            'total_pheromone': float(self.total_pheromone),
+            'pheromone_locations': self.pheromone_locations,
+            'total_food': float(self.total_food),
+            'food_locations': self.food_locations,
+            'avg_creature_age': (population * self.ticks - self.birth_tick_sum) / population if population else 0,
+            'oldest_creature_age': self.ticks - self.oldest_tick if population else 0,
+        }
@@ -0,0 +1,209 @@
+# sweep.py
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .runner import run_headless, parse_param
+
+class SummaryCollector:
+    # Receives the periodic stats of one run and keeps only summary metrics
+    def __init__(self):
+        self.samples = 0
+        self.peak_population = 0
+        self.population_total = 0
+
+    def record(self, stats):
+        self.samples += 1
+        self.peak_population = max(self.peak_population, stats['population'])
+        self.population_total += stats['population']
+
+def grid_points(grid):
+    keys = sorted(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+def sample_points(ranges, samples, seed=0):
+    # Uniform draws; a range whose bounds are both ints is sampled as integers
+    rng = np.random.default_rng(seed)
+    keys = sorted(ranges)
+    for _ in range(samples):
+        point = {}
+        for key in keys:
+            low, high = ranges[key]
+            if isinstance(low, int) and isinstance(high, int):
+                point[key] = int(rng.integers(low, high + 1))
+            else:
+                point[key] = float(rng.uniform(low, high))
+        yield point
+
+def run_key(params, seed, steps, generations):
+    spec = json.dumps({'params': params, 'seed': seed, 'steps': steps, 'generations': generations}, sort_keys=True)
+    return hashlib.sha1(spec.encode('utf-8')).hexdigest()[:12]
+
+def plan_runs(base, points, seeds, steps=None, generations=None):
+    runs = []
+    for point in points:
+        params = {**base, **point}
+        for seed in seeds:
+            runs.append({
+                'run_id': run_key(params, seed, steps, generations),
+                'params': params,
+                'seed': seed,
+                'steps': steps,
+                'generations': generations,
+            })
+    return runs
+
+def execute_run(run, stats_every=50):
+    # Runs in a worker process, so each run gets its own World, seeded from the run
+    logging.getLogger().setLevel(logging.WARNING)
+    collector = SummaryCollector()
+    result = run_headless({**run['params'], 'seed': run['seed']}, run['steps'], run['generations'], stats_every, collector)
+    final = result['final_stats']
+    return {
+        'run_id': run['run_id'],
+        'seed': run['seed'],
+        'params': run['params'],
+        'steps': result['steps'],
+        'elapsed': result['elapsed'],
+        'steps_per_second': result['steps_per_second'],
+        'final_population': final['population'],
+        'final_generation': final['generation'],
+        'peak_population': max(collector.peak_population, final['population']),
+        'mean_population': collector.population_total / collector.samples if collector.samples else final['population'],
+        'total_food': final['total_food'],
+        'avg_creature_age': final['avg_creature_age'],
+        'extinct': final['population'] == 0,
+    }
+
+def load_results(path):
+    results = []
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        results.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by a crash
+    return results
+
+def run_sweep(runs, results_path=None, workers=None, stats_every=50, on_result=None):
+    # Completed runs are appended to `results_path` one JSON line at a time, and
+    # any run_id already in that file is skipped, so a crashed sweep resumes.
+    results = load_results(results_path)
+    done = {result['run_id'] for result in results}
+    pending = [run for run in runs if run['run_id'] not in done]
+    wanted = {run['run_id'] for run in runs}
+    results = [result for result in results if result['run_id'] in wanted]
+
+    out = open(results_path, 'a') if results_path else None
+    if out is not None and out.tell() > 0:
+        with open(results_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                out.write('\n')  # End a line cut short by a crash, so the next result starts its own
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(execute_run, run, stats_every): run for run in pending}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Sweep run {futures[future]['run_id']} failed: {str(e)}")
+                    continue
+                results.append(result)
+                if out is not None:
+                    out.write(json.dumps(result) + '\n')
+                    out.flush()
+                if on_result is not None:
+                    on_result(result, len(results), len(runs))
+    finally:
+        if out is not None:
+            out.close()
+    return results
+
+def write_table(results, path):
+    param_keys = sorted({key for result in results for key in result['params']})
+    metric_keys = [key for key in (results[0] if results else {}) if key not in ('run_id', 'seed', 'params')]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['run_id', 'seed'] + param_keys + metric_keys)
+        for result in sorted(results, key=lambda r: (json.dumps(r['params'], sort_keys=True), r['seed'])):
+            writer.writerow([result['run_id'], result['seed']] +
+                            [result['params'].get(key) for key in param_keys] +
+                            [result.get(key) for key in metric_keys])
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def parse_values(text):
+    # key=v1,v2,... for grids, key=low:high for sampled ranges
+    key, values = parse_param(text)
+    if not isinstance(values, str):
+        return key, [values]
+    if ':' in values:
+        low, high = (parse_value(part) for part in values.split(':', 1))
+        if isinstance(low, str) or isinstance(high, str):
+            raise argparse.ArgumentTypeError(f"Expected numeric key=low:high, got '{text}'")
+        return key, (low, high)
+    return key, [parse_value(part) for part in values.split(',')]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Sweep World parameters across all cores.")
+    limit = parser.add_mutually_exclusive_group(required=True)
+    limit.add_argument('--steps', type=int)
+    limit.add_argument('--generations', type=int)
+    parser.add_argument('--grid', type=parse_values, action='append', default=[],
+                        help="grid axis as key=v1,v2,...; may be repeated")
+    parser.add_argument('--sample', type=parse_values, action='append', default=[],
+                        help="sampled range as key=low:high; may be repeated")
+    parser.add_argument('--samples', type=int, default=10, help="random points drawn from --sample ranges")
+    parser.add_argument('--sample-seed', type=int, default=0)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        help="fixed parameter for every run as key=value")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes, defaults to all cores")
+    parser.add_argument('--results', default='sweep_results.jsonl', help="append-only results log, used to resume")
+    parser.add_argument('--table', default='sweep_results.csv', help="aggregated results table")
+    parser.add_argument('--stats-every', type=int, default=50)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    grid = dict(args.grid)
+    ranges = dict(args.sample)
+    if grid and ranges:
+        # Every sampled point is combined with every grid point
+        points = [{**g, **s} for g in grid_points(grid) for s in sample_points(ranges, args.samples, args.sample_seed)]
+    elif ranges:
+        points = list(sample_points(ranges, args.samples, args.sample_seed))
+    else:
+        points = list(grid_points(grid))
+
+    runs = plan_runs(dict(args.param), points, args.seeds, args.steps, args.generations)
+
+    def report(result, completed, total):
+        print(f"[{completed}/{total}] {result['run_id']} seed={result['seed']} "
+              f"population={result['final_population']} {result['steps_per_second']:.1f} steps/sec", flush=True)
+
+    results = run_sweep(runs, args.results, args.workers, max(1, args.stats_every), report)
+    write_table(results, args.table)
+    print(f"{len(results)}/{len(runs)} runs complete; table written to {args.table}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# helpers.py
+
+import logging
+import unittest
+import numpy as np
+from src.world import World
+
+class WorldTestCase(unittest.TestCase):
+    # Silences the simulation's logging and closes every world a test makes
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def make_world(self, width, height, population, steps=0, **params):
+        # A world with `params`, stepped `steps` times
+        world = World(width, height, population, params)
+        self.addCleanup(world.close)
+        for _ in range(steps):
+            world.update()
+        return world
+
+    def known_world(self, width, height, creatures=(), food=None, pheromones=None, **params):
+        # A world holding exactly the creatures at the given (x, y) cells and the
+        # given dense food and pheromone grids
+        world = World.from_state(width, height, params)
+        self.addCleanup(world.close)
+        if creatures:
+            x, y = np.array(creatures).T
+            genomes = np.zeros((len(x), world.params['num_genes']), dtype=np.uint32)
+            world.population.spawn(x, y, 0, genomes, direction=0)
+            world.occupancy.rebuild(world.population.x, world.population.y)
+        if food is not None:
+            world.food = food
+        if pheromones is not None:
+            world.pheromones = pheromones
+        world.stats.resync(world)
+        return world
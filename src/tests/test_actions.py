@@ -0,0 +1,81 @@
+# test_actions.py
+
+import unittest
+import numpy as np
+from src.creature import Creature
+from src.population import Population
+from src.stats import WorldStats
+from src.actions import MOVE_RANDOM
+from src.tests.helpers import WorldTestCase
+
+A = Creature.ACTION_NEURONS.index
+
+def reference_actions(world, outputs):
+    # The per-creature action loop the kernel replaced, without random moves
+    pop = world.population
+    pheromones = world.pheromones.copy()
+    requests = []
+    for row in range(len(pop)):
+        c, o = pop[row], outputs[row]
+        c.long_probe_distance = int(np.clip(o[A('SET_LONGPROBE_DIST')] * 5, 1, 5))
+        c.oscillator_period = int(np.clip(o[A('SET_OSCILLATOR_PERIOD')] * 10, 1, 10))
+        if o[A('SET_OSCILLATOR_PERIOD')] > 0.5:
+            requests.append(row)
+        if o[A('EMIT_SIGNAL0')] > 0.5:
+            pheromones[c.x, c.y] = 1.0
+            c.energy -= world.params['pheromone_energy_cost']
+        old_x, old_y = c.x, c.y
+        if o[A('MOVE_FORWARD')] > 0.5:
+            c.x, c.y = world.get_forward_position(c)
+        else:
+            dx, dy = int(np.clip(o[A('MOVE_X')] * 3, -1, 1)), int(np.clip(o[A('MOVE_Y')] * 3, -1, 1))
+            c.x, c.y = (c.x + dx) % world.width, (c.y + dy) % world.height
+        if o[A('MOVE_RL')] != 0:
+            c.direction = (c.direction + (1 if o[A('MOVE_RL')] > 0 else -1)) % 8
+        moved = (c.x, c.y) != (old_x, old_y)
+        c.energy -= world.params['move_energy_cost'] if moved else world.params['idle_energy_cost']
+        c.last_move_x, c.last_move_y = c.x - old_x, c.y - old_y
+        c.responsiveness = np.clip(o[A('SET_RESPONSIVENESS')], 0, 1)
+        c.age += 1
+        c.energy = min(c.energy, Creature.MAX_ENERGY)
+    return pheromones, requests
+
+class ActionsTest(WorldTestCase):
+    def test_kernel_matches_per_creature_loop(self):
+        world = self.make_world(50, 40, 1500, steps=3, seed=2)
+        pop = world.population
+        outputs = np.random.default_rng(2).uniform(-1, 1, (len(pop), len(Creature.ACTION_NEURONS)))
+        outputs[:, MOVE_RANDOM] = np.minimum(outputs[:, MOVE_RANDOM], 0.5)
+
+        before = {name: getattr(pop, name).copy() for name in Population.COLUMNS}
+        pheromones, requests = reference_actions(world, outputs)
+        expected = {name: getattr(pop, name).copy() for name in Population.COLUMNS}
+        for name in Population.COLUMNS:
+            setattr(pop, name, before[name])
+        world.occupancy.rebuild(pop.x, pop.y)
+
+        world.apply_actions(np.arange(len(pop)), outputs)
+        for name in Population.COLUMNS:
+            np.testing.assert_array_equal(getattr(pop, name), expected[name], err_msg=name)
+        np.testing.assert_array_equal(world.pheromones, pheromones)
+        self.assertEqual(world.mating_requests, requests)
+        counts = np.bincount(pop.x.astype(np.int64) * 40 + pop.y, minlength=50 * 40).reshape(50, 40)
+        np.testing.assert_array_equal(world.occupancy.counts, counts)
+
+    def test_single_creature_path_keeps_stats_and_mating(self):
+        world = self.make_world(20, 20, 200, steps=1, seed=4, min_reproduction_energy=0)
+        outputs = np.random.default_rng(4).uniform(-1, 1, (50, len(Creature.ACTION_NEURONS)))
+        outputs[:, A('SET_OSCILLATOR_PERIOD')] = 0.9  # Every creature asks to mate
+        size = len(world.population)
+        for row in range(50):
+            world.process_creature_actions(world.population[row], outputs[row])
+        self.assertEqual(world.mating_requests, [])
+        self.assertGreater(len(world.population), size)
+        reference = WorldStats()
+        reference.ticks = world.stats.ticks
+        reference.resync(world)
+        self.assertEqual(world.stats.summary(), reference.summary())
+        self.assertEqual(world.stats.population, len(world.population))
+
+if __name__ == '__main__':
+    unittest.main()
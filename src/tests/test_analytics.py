@@ -0,0 +1,27 @@
+# test_analytics.py
+
+import unittest
+import numpy as np
+from src.analytics import field_medians, median_genes
+from src.creature import Gene
+from src.genome import random_genomes, decode_fields
+
+class MedianGenomeTest(unittest.TestCase):
+    def test_field_medians_match_numpy_medians(self):
+        rng = np.random.default_rng(6)
+        for count in (1, 2, 7, 40, 301):
+            genomes = random_genomes((count, 9), rng)
+            # Few distinct values at some loci, so ranks land inside repeated runs
+            genomes[:, :3] = genomes[rng.integers(0, min(3, count), count), :3]
+            for field, medians in zip(decode_fields(genomes), field_medians(genomes)):
+                expected = [int(np.median(column)) for column in field.astype(np.int64).T]
+                np.testing.assert_array_equal(medians, expected)
+
+    def test_median_genes_encode_their_fields(self):
+        genomes = random_genomes((25, 6), np.random.default_rng(8))
+        for record in median_genes(genomes):
+            gene = Gene(record['gene_value'])
+            self.assertEqual(record, {name: getattr(gene, name) for name in record})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# test_brain.py
+
+import unittest
+import numpy as np
+from src.creature import Creature, Gene
+from src.brain import BrainBatch, brain_cache, pack_brains, take_brains, concat_brains
+from src.config import NUM_SENSORY_NEURONS, NUM_ACTION_NEURONS
+from src.genome import random_genomes
+from src.tests.helpers import WorldTestCase
+
+def reference_predict(creature, inputs):
+    # Creature.predict before brains were compiled: every connection in genome
+    # order, internal neurons read mid-pass, then action neurons
+    neurons = [[0.5, False] for _ in creature.brain.neurons]
+    for gene in creature.brain.connections:
+        if gene.source_type == 1:
+            if gene.source_num >= len(inputs):
+                continue
+            source_value = inputs[gene.source_num]
+        else:
+            if gene.source_num >= len(neurons):
+                continue
+            source_value = neurons[gene.source_num][0]
+        if gene.sink_type == 0 and gene.sink_num < len(neurons):
+            neurons[gene.sink_num][0] += source_value * gene.weight_as_float()
+            neurons[gene.sink_num][1] = True
+    for neuron in neurons:
+        if neuron[1]:
+            neuron[0] = np.tanh(neuron[0])
+
+    actions = [0.0] * NUM_ACTION_NEURONS
+    for gene in creature.brain.connections:
+        if gene.sink_type == 1 and gene.sink_num < len(actions):
+            if gene.source_type == 1 and gene.source_num < len(inputs):
+                source_value = inputs[gene.source_num]
+            elif gene.source_type == 0 and gene.source_num < len(neurons):
+                source_value = neurons[gene.source_num][0]
+            else:
+                continue
+            actions[gene.sink_num] += source_value * gene.weight_as_float()
+    return np.tanh(actions)
+
+def gene(source_type, source_num, sink_type, sink_num, weight):
+    g = Gene(0)
+    g.source_type, g.source_num, g.sink_type, g.sink_num, g.weight = source_type, source_num, sink_type, sink_num, weight
+    return g.encode_gene()
+
+class BrainTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rng = np.random.default_rng(3)
+
+    def assert_folding_matches(self, creatures):
+        inputs = self.rng.uniform(-1, 1, (len(creatures), NUM_SENSORY_NEURONS))
+        expected = np.array([reference_predict(c, row) for c, row in zip(creatures, inputs)])
+        compiled = np.array([c.compiled_brain.predict(row) for c, row in zip(creatures, inputs)])
+        batched = BrainBatch.from_brains([c.compiled_brain for c in creatures]).predict(inputs)
+        np.testing.assert_allclose(compiled, expected, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(batched, expected, rtol=1e-12, atol=1e-12)
+
+    def test_folded_brains_match_connection_order_semantics(self):
+        creatures = [Creature(0, 0, 0, num_genes, rng=self.rng) for num_genes in (4, 16, 50) for _ in range(100)]
+        self.assert_folding_matches(creatures)
+
+    def test_internal_chains_and_self_links(self):
+        # Internal neurons feeding themselves and each other, read before and after being driven
+        genome = [gene(1, 3, 0, 0, 20000), gene(0, 0, 0, 0, 15000), gene(0, 0, 0, 1, -20000),
+                  gene(1, 2, 0, 1, 9000), gene(0, 1, 1, 4, 30000), gene(0, 0, 1, 2, -25000),
+                  gene(1, 5, 1, 2, 12000), gene(0, 2, 1, 0, 7000), gene(0, 1, 0, 2, -3000)]
+        self.assert_folding_matches([Creature(0, 0, 0, len(genome), genome=genome)])
+
+    def test_packed_take_and_concat_match_repacking(self):
+        brains = [brain_cache.get(Creature(0, 0, 0, 12, rng=self.rng).genome) for _ in range(40)]
+        indices = self.rng.integers(0, len(brains), 60)
+        taken = take_brains(pack_brains(brains), indices)
+        joined = concat_brains([pack_brains(brains[:15]), pack_brains(brains[15:])])
+        for packed, expected in ((taken, pack_brains([brains[i] for i in indices])), (joined, pack_brains(brains))):
+            self.assertEqual(packed.keys(), expected.keys())
+            for key in expected:
+                np.testing.assert_array_equal(packed[key], expected[key])
+
+    def test_population_brains_follow_their_genomes(self):
+        world = self.make_world(40, 30, 200, steps=20, seed=11)
+        population = world.population
+        expected = pack_brains([brain_cache.get(genome) for genome in population.genomes])
+        for key in expected:
+            np.testing.assert_array_equal(population.brain_arrays[key], expected[key])
+
+        # Single-row changes, one row twice, are packed in on the next read
+        for row in (3, 0, len(population) - 1, 3):
+            population[row].genome = random_genomes(population.num_genes, self.rng)
+        self.assertIs(population[0].compiled_brain, brain_cache.get(population.genomes[0]))
+        expected = pack_brains([brain_cache.get(genome) for genome in population.genomes])
+        for key in expected:
+            np.testing.assert_array_equal(population.brain_arrays[key], expected[key])
+        self.assertEqual(population.changed_brains, {})
+
+if __name__ == '__main__':
+    unittest.main()
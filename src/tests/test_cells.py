@@ -0,0 +1,69 @@
+# test_cells.py
+
+import unittest
+import numpy as np
+from src.cells import CellStore
+from src.food import FoodLayer
+from src.pheromones import PheromoneField
+
+WIDTH, HEIGHT = 31, 17
+
+class CellStoreTest(unittest.TestCase):
+    def test_slots_follow_inserts_and_compaction(self):
+        rng = np.random.default_rng(2)
+        store = CellStore({'value': np.float64})
+        store.MERGE_SIZE = 16  # Exercise both index levels
+        reference = {}  # Cell -> value
+        for _ in range(200):
+            cells = rng.integers(0, 300, rng.integers(0, 20))
+            slots = store.insert(cells)
+            store.columns['value'][slots] = cells * 0.5
+            reference.update((cell, cell * 0.5) for cell in cells.tolist())
+            if rng.random() < 0.3:
+                keep = rng.random(len(store)) > 0.3
+                for cell in store.cells[:len(store)][~keep].tolist():
+                    del reference[cell]
+                store.compact(keep)
+            self.assertEqual(len(store), len(reference))
+            self.assertEqual(sorted(store.cells[:len(store)].tolist()), sorted(reference))
+            queries = rng.integers(0, 300, 40)
+            found = store.find(queries)
+            np.testing.assert_array_equal(found >= 0, [cell in reference for cell in queries.tolist()])
+            np.testing.assert_array_equal(store.cells[found[found >= 0]], queries[found >= 0])
+
+class FoodLayerTest(unittest.TestCase):
+    def test_spawn_matches_a_dense_grid(self):
+        rng = np.random.default_rng(1)
+        food = FoodLayer(WIDTH, HEIGHT)
+        dense = np.zeros((WIDTH, HEIGHT))
+        for _ in range(300):
+            # Few cells, so batches repeat cells and hit existing food
+            n = rng.integers(0, 6)
+            x, y, energy = rng.integers(0, 4, n), rng.integers(0, 3, n), rng.uniform(75, 150, n)
+            replaced = []
+            for cx, cy, value in zip(x, y, energy):
+                replaced.append(dense[cx, cy])
+                dense[cx, cy] = value
+            np.testing.assert_array_equal(food.spawn(x, y, energy), replaced)
+            np.testing.assert_array_equal(food.dense(), dense)
+        self.assertEqual(food.locations(), np.count_nonzero(dense))
+        self.assertAlmostEqual(food.total(), dense.sum())
+
+class PheromoneFieldTest(unittest.TestCase):
+    def test_lazy_decay_matches_a_dense_grid(self):
+        rng = np.random.default_rng(3)
+        field = PheromoneField(WIDTH, HEIGHT, decay=0.9, epsilon=0.05)
+        dense = np.zeros((WIDTH, HEIGHT))
+        for _ in range(100):
+            cells = rng.choice(WIDTH * HEIGHT, rng.integers(0, 10), replace=False)
+            x, y = cells // HEIGHT, cells % HEIGHT
+            field.deposit_many(x, y, 1.0)
+            dense[x, y] = 1.0
+            field.tick()
+            dense *= 0.9
+            dense[dense < 0.05] = 0
+            np.testing.assert_allclose(field.materialize(), dense, rtol=1e-12)
+            self.assertEqual(len(field), np.count_nonzero(dense))
+
+if __name__ == '__main__':
+    unittest.main()
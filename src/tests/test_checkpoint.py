@@ -0,0 +1,67 @@
+# test_checkpoint.py
+
+import io
+import unittest
+import numpy as np
+from src.population import Population
+from src.checkpoint import save_world, load_world
+from src.tests.helpers import WorldTestCase
+
+class CheckpointTest(WorldTestCase):
+    def run_world(self, world, steps):
+        for _ in range(steps):
+            world.update()
+
+    def round_trip(self, world):
+        file = io.BytesIO()
+        save_world(world, file)
+        file.seek(0)
+        restored, _ = load_world(file)
+        self.addCleanup(restored.close)
+        return restored
+
+    def assert_same_world(self, expected, actual):
+        self.assertEqual((expected.step_count, expected.generation), (actual.step_count, actual.generation))
+        self.assertEqual(len(expected.population), len(actual.population))
+        for name in Population.COLUMNS:
+            np.testing.assert_array_equal(getattr(expected.population, name), getattr(actual.population, name),
+                                          err_msg=name)
+        np.testing.assert_array_equal(expected.population.genomes, actual.population.genomes)
+        for key, array in expected.population.brain_arrays.items():
+            np.testing.assert_array_equal(array, actual.population.brain_arrays[key], err_msg=key)
+        np.testing.assert_array_equal(expected.food, actual.food)
+        np.testing.assert_array_equal(expected.pheromones, actual.pheromones)
+        np.testing.assert_array_equal(expected.occupancy.padded, actual.occupancy.padded)
+        self.assertEqual(expected.stats.population, actual.stats.population)
+
+    def test_restored_world_continues_exactly(self):
+        world = self.make_world(48, 32, 400, steps=10, seed=7, steps_per_generation=15, food_spawn_rate=3.5)
+        restored = self.round_trip(world)
+        self.assert_same_world(world, restored)
+
+        self.run_world(world, 25)
+        self.run_world(restored, 25)
+        self.assert_same_world(world, restored)
+
+    def test_restore_has_no_init_side_effects(self):
+        world = self.make_world(20, 20, 50, steps=3, seed=3, event_log=True)
+        restored = self.round_trip(world)
+        # No step-0 food or creatures beyond the saved ones
+        self.assertEqual(restored.events.summary()['recorded'], 0)
+        np.testing.assert_array_equal(world.food, restored.food)
+
+    def test_other_versions_are_rejected(self):
+        file = io.BytesIO()
+        save_world(self.make_world(10, 10, 5, seed=1), file)
+        file.seek(0)
+        with np.load(file) as archive:
+            arrays = dict(archive)
+        arrays['counters'][0] = 4
+        file = io.BytesIO()
+        np.savez(file, **arrays)
+        file.seek(0)
+        with self.assertRaisesRegex(ValueError, 'version 4'):
+            load_world(file)
+
+if __name__ == '__main__':
+    unittest.main()
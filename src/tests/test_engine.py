@@ -0,0 +1,71 @@
+# test_engine.py
+
+import time
+import unittest
+from src.engine import Frame, FrameBuffer, SimulationEngine
+from src.simulation import Simulation
+from src.tests.helpers import WorldTestCase
+
+class FrameBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.frames = FrameBuffer(buffer_size=3)
+        self.frames.open()
+
+    def publish(self, first, last):
+        for sequence in range(first, last + 1):
+            self.frames.publish(Frame(sequence))
+
+    def test_slow_subscriber_skips_to_the_newest_frame(self):
+        subscriber = self.frames.subscribe(keepalive=0.05)
+        self.publish(1, 10)
+        self.assertEqual(next(subscriber).sequence, 10)
+        # Frames still buffered arrive in order
+        self.publish(11, 12)
+        self.assertEqual([next(subscriber).sequence for _ in range(2)], [11, 12])
+        # Falling further behind than the buffer drops all but the newest
+        self.publish(13, 20)
+        self.assertEqual(next(subscriber).sequence, 20)
+        self.assertIsNone(next(subscriber))  # Keepalive
+
+    def test_finish_ends_subscribers_after_the_last_frame(self):
+        subscriber = self.frames.subscribe()
+        self.publish(1, 2)
+        self.frames.finish()
+        self.assertEqual([frame.sequence for frame in subscriber], [2])
+
+class SimulationEngineTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        simulation = Simulation()
+        simulation.start_simulation({'width': 30, 'height': 30, 'initial_population': 100, 'seed': 3})
+        self.addCleanup(simulation.world.close)
+        self.engine = SimulationEngine(simulation, buffer_size=2)
+        self.addCleanup(self.engine.stop)
+
+    def test_slow_subscriber_gets_the_newest_frame(self):
+        subscriber = self.engine.subscribe()
+        self.engine.start(target_step_rate=0)
+        first = next(subscriber)
+        time.sleep(0.3)  # The engine keeps stepping meanwhile
+        newest = next(subscriber)
+        self.assertGreater(newest.sequence, first.sequence + 1)  # The frames in between were dropped
+        self.assertIsNotNone(newest.stats)
+
+    def test_stop_ends_the_thread_and_its_subscribers(self):
+        subscriber = self.engine.subscribe()
+        self.engine.start(target_step_rate=200)
+        thread = self.engine.thread
+        self.assertTrue(self.engine.running)
+        last = next(subscriber).sequence
+        self.engine.stop()
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(self.engine.running)
+        # The subscriber gets what was published before the stop, then ends instead of waiting
+        remaining = [frame.sequence for frame in subscriber]
+        self.assertEqual((remaining or [last])[-1], self.engine.sequence)
+        steps = self.engine.simulation.world.step_count
+        time.sleep(0.05)
+        self.assertEqual(self.engine.simulation.world.step_count, steps)
+
+if __name__ == '__main__':
+    unittest.main()
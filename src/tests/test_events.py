@@ -0,0 +1,85 @@
+# test_events.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.events import EventLog, read_events, MOVE, BIRTH, DEATH, FOOD
+from src.tests.helpers import WorldTestCase
+
+ALL = {'move': 1.0, 'pheromone': 1.0, 'birth': 1.0, 'death': 1.0, 'food': 1.0}
+
+class EventLogTest(unittest.TestCase):
+    def test_ring_keeps_the_newest_records_in_order(self):
+        log = EventLog(capacity=8, rates=ALL)
+        for creature in range(5):
+            log.record(MOVE, creature, creature, 0)
+        log.record_many(MOVE, np.arange(5, 12), np.arange(5, 12), np.zeros(7))
+        self.assertEqual(log.count, 12)
+        np.testing.assert_array_equal(log.ordered()['creature'], np.arange(4, 12))
+        # A batch larger than the ring keeps its newest records
+        log.record_many(DEATH, np.arange(100, 120), np.zeros(20), np.zeros(20), value=np.arange(20.0))
+        np.testing.assert_array_equal(log.ordered()['creature'], np.arange(112, 120))
+        np.testing.assert_array_equal(log.ordered()['value'], np.arange(12.0, 20.0))
+        self.assertEqual(log.summary()['buffered'], 8)
+        self.assertEqual(log.summary()['recorded'], 32)
+
+    def test_sampling_keeps_every_nth_event_across_calls(self):
+        first, second = (EventLog(rates={'move': 0.25, 'food': 0}) for _ in range(2))
+        # Same events, split into calls differently
+        for creature in range(10):
+            first.record(MOVE, creature)
+        first.record_many(MOVE, np.arange(10, 30), np.zeros(20), np.zeros(20))
+        second.record_many(MOVE, np.arange(0, 7), np.zeros(7), np.zeros(7))
+        second.record_many(MOVE, np.arange(7, 30), np.zeros(23), np.zeros(23))
+        for log in (first, second):
+            np.testing.assert_array_equal(log.ordered()['creature'], np.arange(0, 30, 4))
+            log.record_many(FOOD, np.arange(5), np.zeros(5), np.zeros(5))
+            self.assertEqual(log.summary()['seen']['move'], 30)
+            self.assertEqual(log.summary()['seen']['food'], 0)
+        self.assertEqual(len(first.ordered()), 8)
+
+    def test_record_many_fills_every_field(self):
+        log = EventLog(rates=ALL)
+        log.step = 42
+        log.record_many(BIRTH, np.array([7, 8]), np.array([1, 2]), np.array([3, 4]),
+                        other=np.array([2**60 + 1, 5]), partner=np.array([2**60 + 3, 6]))
+        records = log.ordered()
+        self.assertEqual(records.dtype.names, ('type', 'step', 'creature', 'other', 'partner', 'x', 'y', 'value'))
+        np.testing.assert_array_equal(records['type'], [BIRTH, BIRTH])
+        np.testing.assert_array_equal(records['step'], [42, 42])
+        np.testing.assert_array_equal(records['creature'], [7, 8])
+        np.testing.assert_array_equal(records['x'], [1, 2])
+        np.testing.assert_array_equal(records['y'], [3, 4])
+        # Creature ids stay exact past float precision
+        np.testing.assert_array_equal(records['other'], [2**60 + 1, 5])
+        np.testing.assert_array_equal(records['partner'], [2**60 + 3, 6])
+        np.testing.assert_array_equal(records['value'], [0.0, 0.0])
+        self.assertEqual(log.recent(1)[0]['message'], "Creature 8 born at (2, 4) to creatures 5 and 6")
+
+    def test_sink_gets_every_record_in_order(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'events.bin')
+        log = EventLog(capacity=6, rates=ALL, path=path)
+        for start in range(0, 40, 4):
+            log.record_many(MOVE, np.arange(start, start + 4), np.zeros(4), np.zeros(4))
+        log.record(FOOD, -1, 1, 1, value=90.0)
+        log.close()
+        records = read_events(path)
+        np.testing.assert_array_equal(records['creature'], np.append(np.arange(40), -1))
+        self.assertEqual(records['value'][-1], 90.0)
+        self.assertEqual(log.summary()['dropped'], 0)
+
+class WorldEventsTest(WorldTestCase):
+    def test_births_name_both_parents(self):
+        world = self.make_world(20, 20, 200, steps=8, seed=2, event_log=True, steps_per_generation=4,
+                                min_reproduction_energy=0)
+        births = world.events.ordered()
+        births = births[births['type'] == BIRTH]
+        self.assertGreater(len(births), 0)
+        self.assertTrue(((births['other'] >= 0) & (births['partner'] >= 0)).all())
+        self.assertTrue((births['partner'] != births['other']).any())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# test_frames.py
+
+import base64
+import io
+import unittest
+import numpy as np
+from PIL import Image
+from src.frames import encode_frame, DeltaFrameEncoder
+from src.render import Viewport
+from src.tests.helpers import WorldTestCase
+
+WIDTH, HEIGHT = 5, 3
+CREATURES = [(0, 0), (4, 2), (2, 1), (2, 1)]
+
+def decode(message):
+    # (height, width, 3) frame back from any stateless format
+    if isinstance(message, list):
+        return np.array(message, dtype=np.uint8)
+    if isinstance(message, bytes):
+        return np.frombuffer(message, dtype=np.uint8).reshape(HEIGHT, WIDTH, 3)
+    data = base64.b64decode(message['data'])
+    if message['format'] == 'png':
+        return np.array(Image.open(io.BytesIO(data)).convert('RGB'))
+    return np.frombuffer(data, dtype=np.uint8).reshape(message['height'], message['width'], 3)
+
+class EncodeFrameTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        food = np.zeros((WIDTH, HEIGHT))
+        food[1, 2], food[3, 0] = 100.0, 400.0
+        pheromones = np.zeros((WIDTH, HEIGHT))
+        pheromones[4, 1], pheromones[0, 0] = 1.0, 0.5
+        world = self.known_world(WIDTH, HEIGHT, CREATURES, food, pheromones)
+        self.state = world.render_world_state()
+        # Rows are y, columns are x
+        self.expected = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        for x, y in CREATURES:
+            self.expected[y, x, 0] = 255
+        self.expected[2, 1, 1], self.expected[0, 3, 1] = 100, 255
+        self.expected[1, 4, 2], self.expected[0, 0, 2] = 255, 127
+
+    def test_render_matches_the_world(self):
+        np.testing.assert_array_equal(self.state, self.expected)
+
+    def test_formats_round_trip(self):
+        for frame_format in ('json', 'png', 'rgb', 'binary'):
+            message = encode_frame(self.state, frame_format)
+            if isinstance(message, dict):
+                self.assertEqual((message['format'], message['width'], message['height']),
+                                 (frame_format, WIDTH, HEIGHT))
+            np.testing.assert_array_equal(decode(message), self.expected, err_msg=frame_format)
+
+    def test_delta_needs_an_encoder(self):
+        with self.assertRaises(ValueError):
+            encode_frame(self.state, 'delta')
+
+def apply_delta(frame, message):
+    # The frame a client holds after receiving `message`
+    if message['type'] == 'key':
+        return np.frombuffer(base64.b64decode(message['data']), dtype=np.uint8).reshape(
+            message['height'], message['width'], 3).copy()
+    cells = np.frombuffer(base64.b64decode(message['cells']), dtype='<u4')
+    colors = np.frombuffer(base64.b64decode(message['colors']), dtype=np.uint8).reshape(-1, 3)
+    frame = frame.copy()
+    frame.reshape(-1, 3)[cells] = colors
+    return frame
+
+class DeltaFrameEncoderTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        # Short generations and free mating, so births, deaths and culling all show
+        self.world = self.make_world(30, 20, 150, steps=1, seed=5, steps_per_generation=6,
+                                     min_reproduction_energy=0, pheromone_energy_cost=0)
+
+    def stream(self, viewport=None):
+        # (message, expected frame) for each step
+        encoder = DeltaFrameEncoder(keyframe_interval=1000)
+        while True:
+            snapshot = self.world.render_snapshot()
+            state = snapshot.render(viewport)
+            yield encoder, encode_frame(state, 'delta', encoder, snapshot.changes(viewport)), state
+            self.world.update()
+
+    def test_keyframe_then_deltas_rebuild_every_frame(self):
+        for viewport in (None, Viewport(3, 2, 20, 15), Viewport(resolution=(7, 5), pooling='mean')):
+            stream = self.stream(viewport)
+            encoder, message, state = next(stream)
+            self.assertEqual(message['type'], 'key')
+            frame = apply_delta(None, message)
+            for _ in range(25):
+                encoder, message, state = next(stream)
+                self.assertEqual(message['type'], 'delta')
+                self.assertEqual(message['base'], message['frame'] - 1)
+                frame = apply_delta(frame, message)
+                np.testing.assert_array_equal(frame, state)
+
+    def test_deltas_carry_only_changed_cells(self):
+        stream = self.stream()
+        next(stream)
+        encoder, message, state = next(stream)
+        self.assertLess(message['count'], state.shape[0] * state.shape[1] // 2)
+        # The same step again changes nothing
+        snapshot = self.world.render_snapshot()
+        message = encoder.encode(snapshot.render(), snapshot.changes())
+        self.assertEqual((message['type'], message['count']), ('delta', 0))
+
+    def test_resync_gap_and_unknown_changes_send_keyframes(self):
+        stream = self.stream()
+        next(stream)
+        encoder, message, state = next(stream)
+        encoder.request_resync()
+        self.assertEqual(next(stream)[1]['type'], 'key')
+        self.assertEqual(next(stream)[1]['type'], 'delta')
+        self.world.update()  # A frame this stream never got
+        self.assertEqual(next(stream)[1]['type'], 'key')
+        self.assertEqual(next(stream)[1]['type'], 'delta')
+        self.world.food = self.world.food  # Changed outside a step
+        self.assertEqual(encoder.encode(state, self.world.render_snapshot().changes())['type'], 'key')
+        self.assertEqual(encoder.encode(state)['type'], 'key')
+
+if __name__ == '__main__':
+    unittest.main()
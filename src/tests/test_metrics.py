@@ -0,0 +1,29 @@
+# test_metrics.py
+
+import threading
+import unittest
+from src.metrics import Metrics
+
+class MetricsTest(unittest.TestCase):
+    def test_concurrent_updates_are_all_recorded(self):
+        metrics = Metrics(window=64)
+
+        def record():
+            for _ in range(2000):
+                metrics.count('frames')
+                metrics.observe('encoding', 0.001)
+                with metrics.timed('rendering'):
+                    pass
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters']['frames'], 8000)
+        self.assertEqual(snapshot['phases']['encoding']['count'], 8000)
+        self.assertIn('enki_phase_seconds_count{phase="encoding"} 8000', metrics.prometheus())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+# test_parallel.py
+
+import unittest
+import numpy as np
+from src.population import Population
+from src.parallel import TileBrains
+from src.brain import BrainBatch, brain_cache
+from src.genome import random_genomes
+from src.config import NUM_SENSORY_NEURONS
+from src.tests.helpers import WorldTestCase
+
+class TilePoolTest(WorldTestCase):
+    def test_workers_match_single_process_steps(self):
+        # Short generations with free mating, so the population turns over and its shared columns grow
+        params = {'seed': 13, 'steps_per_generation': 4, 'min_reproduction_energy': 0, 'reproduction_energy_cost': 0}
+        serial = self.make_world(40, 24, 120, **params)
+        tiled = self.make_world(40, 24, 120, **params, workers=3)
+        for _ in range(15):
+            serial.update()
+            tiled.update()
+            for name in Population.COLUMNS:
+                np.testing.assert_array_equal(getattr(serial.population, name),
+                                              getattr(tiled.population, name), err_msg=name)
+            np.testing.assert_array_equal(serial.population.genomes, tiled.population.genomes)
+            np.testing.assert_array_equal(serial.pheromones, tiled.pheromones)
+        self.assertGreater(tiled.population.capacity, 120)
+
+    def test_tile_brains_follow_membership(self):
+        rng = np.random.default_rng(4)
+        genomes = random_genomes((30, 12), rng)
+        ids = np.arange(30)
+        brains = TileBrains()
+        inputs = rng.random((20, NUM_SENSORY_NEURONS))
+        # Rows leaving, arriving, reordering and one creature's genome changing
+        for rows in (np.arange(20), np.arange(5, 25), np.arange(29, 9, -1)):
+            if rows[0] == 29:
+                genomes[15] = random_genomes((1, 12), rng)[0]
+            batch = brains.update(ids[rows], genomes[rows])
+            expected = BrainBatch.from_brains([brain_cache.get(genome) for genome in genomes[rows]])
+            np.testing.assert_array_equal(batch.predict(inputs), expected.predict(inputs))
+        self.assertIs(brains.update(ids[rows], genomes[rows]), batch)
+
+if __name__ == '__main__':
+    unittest.main()
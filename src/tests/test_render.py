@@ -0,0 +1,62 @@
+# test_render.py
+
+import unittest
+import numpy as np
+from src.render import Viewport
+from src.tests.helpers import WorldTestCase
+
+class ViewportTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        food = np.arange(15, dtype=np.float64).reshape(5, 3) * 10
+        self.world = self.known_world(5, 3, [(0, 0), (4, 2), (2, 1)], food)
+        self.full = self.world.render_world_state()
+
+    def test_partly_outside_views_are_clipped_to_the_world(self):
+        state = self.world.render_world_state(Viewport(3, 1, 10, 10))
+        np.testing.assert_array_equal(state, self.full[1:, 3:])
+        state = self.world.render_world_state(Viewport(1, 0, 3))  # Height runs to the world edge
+        np.testing.assert_array_equal(state, self.full[:, 1:4])
+
+    def test_views_outside_the_world_show_its_edge(self):
+        state = self.world.render_world_state(Viewport(10, 10, 4, 4))
+        np.testing.assert_array_equal(state, self.full[2:, 4:])
+        self.assertEqual(Viewport(10, 1, 4, 1).bounds(5, 3)[:4], (4, 1, 5, 2))
+
+    def test_invalid_views_are_rejected(self):
+        for arguments in ({'x': -1}, {'width': 0}, {'resolution': (0, 4)}, {'pooling': 'median'}):
+            with self.assertRaises(ValueError):
+                Viewport(**arguments)
+        with self.assertRaises(ValueError):
+            Viewport.parse('1,2,3')
+
+class PoolingTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        food = np.zeros((4, 4))
+        food[2, 0], food[3, 1], food[0, 2] = 100, 200, 40
+        pheromones = np.zeros((4, 4))
+        pheromones[1, 3] = 1.0
+        self.world = self.known_world(4, 4, [(0, 0), (1, 0), (3, 3)], food, pheromones)
+
+    def test_max_and_mean_pool_two_by_two_blocks(self):
+        # Pixel (row, column) covers cells x in [2 * column, 2 * column + 2), y in [2 * row, 2 * row + 2)
+        expected = {
+            'max': [[[255, 0, 0], [0, 200, 0]], [[0, 40, 255], [255, 0, 0]]],
+            'mean': [[[127, 0, 0], [0, 75, 0]], [[0, 10, 63], [63, 0, 0]]],
+        }
+        for pooling, pixels in expected.items():
+            state = self.world.render_world_state(Viewport(resolution=(2, 2), pooling=pooling))
+            np.testing.assert_array_equal(state, np.array(pixels, dtype=np.uint8), err_msg=pooling)
+
+    def test_resolution_keeps_the_aspect_ratio(self):
+        for viewport, shape in ((Viewport(resolution=(2, 2)), (2, 2, 3)), (Viewport(resolution=(4, 1)), (1, 1, 3)),
+                                (Viewport(0, 0, 4, 2, resolution=(2, 2)), (1, 2, 3)),
+                                (Viewport(resolution=(100, 100)), (4, 4, 3))):
+            self.assertEqual(self.world.render_world_state(viewport).shape, shape)
+        # One cell per pixel renders the same with either pooling
+        np.testing.assert_array_equal(self.world.render_world_state(Viewport(resolution=(9, 9), pooling='mean')),
+                                      self.world.render_world_state())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# test_rng.py
+
+import unittest
+import numpy as np
+from src.population import Population
+from src.rng import RandomStreams
+from src.tests.helpers import WorldTestCase
+
+class SeededRunTest(WorldTestCase):
+    def run_world(self, seed, steps=20):
+        world = self.make_world(32, 24, 200, steps=steps, seed=seed, steps_per_generation=8,
+                                min_reproduction_energy=0, collisions=True)
+        columns = {name: getattr(world.population, name).copy() for name in Population.COLUMNS}
+        return columns, world.population.genomes.copy(), world.food, world.pheromones.copy()
+
+    def test_same_seed_gives_the_same_run(self):
+        first, second = self.run_world(21), self.run_world(21)
+        for name in Population.COLUMNS:
+            np.testing.assert_array_equal(first[0][name], second[0][name], err_msg=name)
+        for expected, actual in zip(first[1:], second[1:]):
+            np.testing.assert_array_equal(expected, actual)
+
+    def test_other_seed_gives_another_run(self):
+        self.assertFalse(np.array_equal(self.run_world(21)[0]['x'], self.run_world(22)[0]['x']))
+
+    def test_streams_depend_only_on_seed_step_and_phase(self):
+        streams, replay = RandomStreams(5), RandomStreams(5)
+        streams.begin_step(3)
+        streams.stream('food').random(100)  # Drawing from one phase leaves the others alone
+        actions = streams.stream('actions').random(4)
+        replay.begin_step(3)
+        np.testing.assert_array_equal(replay.stream('actions').random(4), actions)
+        replay.begin_step(4)
+        self.assertFalse(np.array_equal(replay.stream('actions').random(4), actions))
+
+    def test_creature_genetics_follow_the_world_streams(self):
+        def offspring(seed):
+            world = self.make_world(16, 16, 4, steps=2, seed=seed)
+            rng = world.rng.stream('births')
+            first, second = world.population[0], world.population[1]
+            child = first.crossover(second, rng)
+            first.mutate(0.5, rng)
+            return child, first.genome
+
+        for expected, actual in zip(offspring(8), offspring(8)):
+            np.testing.assert_array_equal(expected, actual)
+        self.assertFalse(np.array_equal(offspring(8)[1], offspring(9)[1]))
+
+if __name__ == '__main__':
+    unittest.main()
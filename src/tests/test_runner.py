@@ -0,0 +1,62 @@
+# test_runner.py
+
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.runner import StatsWriter, STAT_COLUMNS, run_headless, main
+from src.tests.helpers import WorldTestCase
+
+PARAMS = {'width': 30, 'height': 20, 'initial_population': 120, 'seed': 6}
+
+class RunnerTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def expected_rows(self, steps, every):
+        # Stats of the same seeded world after each recorded update, and after the last
+        world = self.make_world(PARAMS['width'], PARAMS['height'], PARAMS['initial_population'], seed=PARAMS['seed'])
+        rows = []
+        for step in range(1, steps + 1):
+            world.update()
+            if step % every == 0 or step == steps:
+                rows.append([world.get_stats()[column] for column in STAT_COLUMNS])
+        return rows
+
+    def test_csv_gets_a_row_per_interval_and_the_last_step(self):
+        path = os.path.join(self.directory, 'stats.csv')
+        writer = StatsWriter(path)
+        try:
+            result = run_headless(PARAMS, steps=10, stats_every=3, writer=writer)
+        finally:
+            writer.close()
+        self.assertEqual(result['steps'], 10)
+        with open(path, newline='') as file:
+            header, *rows = list(csv.reader(file))
+        self.assertEqual(header, STAT_COLUMNS)
+        expected = self.expected_rows(10, 3)
+        self.assertEqual(len(rows), 4)
+        np.testing.assert_allclose(np.array(rows, dtype=np.float64), np.array(expected, dtype=np.float64))
+
+    def test_cli_writes_columnar_npz(self):
+        path = os.path.join(self.directory, 'stats.npz')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(['--steps', '8', '--width', '30', '--height', '20', '--population', '120', '--seed', '6',
+                  '--stats-every', '4', '--output', path])
+        self.assertIn('Ran 8 steps', output.getvalue())
+        expected = np.array(self.expected_rows(8, 4), dtype=np.float64)
+        with np.load(path) as data:
+            self.assertEqual(sorted(data.files), sorted(STAT_COLUMNS))
+            for index, column in enumerate(STAT_COLUMNS):
+                self.assertEqual(len(data[column]), 2)
+                np.testing.assert_allclose(data[column], expected[:, index], err_msg=column)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+# test_sensing.py
+
+import unittest
+import numpy as np
+from src.sensing import sense_population
+from src.tests.helpers import WorldTestCase
+
+RANDOM = 17  # Drawn from different streams by the two paths
+
+class SensingTest(WorldTestCase):
+    def test_batch_matches_per_creature_inputs(self):
+        # Non-square and crowded, so borders, stacked cells and probes all come up
+        world = self.make_world(23, 17, 300, steps=5, seed=5)
+        batch = sense_population(world)
+        scalar = np.array([world.get_creature_inputs(creature) for creature in world.population])
+        columns = [column for column in range(batch.shape[1]) if column != RANDOM]
+        np.testing.assert_allclose(batch[:, columns], scalar[:, columns], rtol=1e-12, atol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
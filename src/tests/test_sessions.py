@@ -0,0 +1,76 @@
+# test_sessions.py
+
+import threading
+import time
+import unittest
+from src.sessions import SessionManager, SessionLimitError
+from src.tests.helpers import WorldTestCase
+
+class GatedProcess:
+    # A worker process that only starts once `gate` is set
+    def __init__(self, process, gate):
+        self.process = process
+        self.gate = gate
+
+    def start(self):
+        self.gate.wait()
+        self.process.start()
+
+    def __getattr__(self, name):
+        return getattr(self.process, name)
+
+class GatedContext:
+    def __init__(self, context, gate):
+        self.context = context
+        self.gate = gate
+
+    def Pipe(self):
+        return self.context.Pipe()
+
+    def Process(self, **kwargs):
+        return GatedProcess(self.context.Process(**kwargs), self.gate)
+
+class SessionTest(WorldTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sessions = SessionManager(max_sessions=1)
+        self.addCleanup(self.sessions.close_all)
+
+    def test_frames_are_forwarded_only_while_watched(self):
+        session = self.sessions.start({'width': 24, 'height': 24, 'initial_population': 50, 'seed': 1})
+        time.sleep(0.3)
+        self.assertEqual(session.frames.sequence, 0)
+
+        frames = session.subscribe()
+        self.assertGreater(next(frames).sequence, 0)
+        self.assertTrue(session.watched)
+        frames.close()
+        self.assertFalse(session.watched)
+        self.assertEqual(session.viewers, 0)
+
+    def test_spawning_does_not_block_other_calls(self):
+        self.sessions.max_sessions = 2
+        running = self.sessions.create()
+        gate = threading.Event()
+        self.sessions.context = GatedContext(self.sessions.context, gate)
+        created = []
+        spawner = threading.Thread(target=lambda: created.append(self.sessions.create()))
+        spawner.start()
+        try:
+            while not self.sessions.starting:
+                time.sleep(0.01)
+            # The manager answers while the worker is still spawning, and the
+            # spawning session already counts against the limit
+            self.assertIs(self.sessions.get(running.id), running)
+            self.assertEqual(len(self.sessions.describe()), 1)
+            with self.assertRaises(SessionLimitError):
+                self.sessions.create()
+        finally:
+            gate.set()
+            spawner.join()
+        self.assertEqual(self.sessions.starting, 0)
+        self.assertIs(self.sessions.get(), created[0])
+        self.assertEqual(len(self.sessions), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# test_spatial.py
+
+import unittest
+import numpy as np
+from src.spatial import OccupancyGrid, BucketIndex
+from src.metrics import metrics
+
+class OccupancyGridTest(unittest.TestCase):
+    # Incremental updates must leave the grid exactly as a full rebuild would
+    WIDTH, HEIGHT = 13, 7
+
+    def assert_matches_rebuild(self, grid, x, y):
+        reference = OccupancyGrid(self.WIDTH, self.HEIGHT)
+        reference.rebuild(x, y)
+        np.testing.assert_array_equal(grid.counts, reference.counts)
+        np.testing.assert_array_equal(grid.head, reference.head)
+        for cx in range(self.WIDTH):
+            for cy in range(self.HEIGHT):
+                self.assertEqual(list(grid.rows_at(cx, cy)), list(reference.rows_at(cx, cy)))
+        border = np.concatenate((grid.padded[[0, -1]].ravel(), grid.padded[:, [0, -1]].ravel()))
+        self.assertFalse(border.any())
+
+    def test_incremental_updates_match_rebuild(self):
+        rng = np.random.default_rng(0)
+        n = 100
+        x = rng.integers(0, self.WIDTH, n)
+        y = rng.integers(0, self.HEIGHT, n)
+        grid = OccupancyGrid(self.WIDTH, self.HEIGHT)
+        grid.rebuild(x, y)
+        for _ in range(100):
+            operation = rng.integers(0, 3)
+            if operation == 0:
+                rows = rng.choice(n, rng.integers(0, n), replace=False)
+                x[rows] = rng.integers(0, self.WIDTH, len(rows))
+                y[rows] = rng.integers(0, self.HEIGHT, len(rows))
+                grid.move_many(rows, x[rows], y[rows])
+            elif operation == 1:
+                count = int(rng.integers(1, 5))
+                new_x = rng.integers(0, self.WIDTH, count)
+                new_y = rng.integers(0, self.HEIGHT, count)
+                grid.add_many(np.arange(n, n + count), new_x, new_y)
+                x, y, n = np.append(x, new_x), np.append(y, new_y), n + count
+            else:
+                keep = rng.random(n) > 0.2
+                x, y, n = x[keep], y[keep], int(np.count_nonzero(keep))
+                grid.rebuild(x, y)
+            self.assert_matches_rebuild(grid, x, y)
+
+    def test_box_queries_clip_to_grid(self):
+        grid = OccupancyGrid(self.WIDTH, self.HEIGHT)
+        grid.rebuild(np.array([0, 0, 12]), np.array([0, 0, 6]))
+        self.assertEqual(grid.count_in_box(-1, 1, -1, 1), 2)
+        self.assertEqual(grid.count_at(-1, 0), 0)
+        np.testing.assert_array_equal(grid.rows_in_box(10, 20, 5, 9), [2])
+
+class BucketIndexTest(unittest.TestCase):
+    def test_box_pairs_cover_every_row_in_reach(self):
+        rng = np.random.default_rng(1)
+        x, y = rng.integers(0, 30, 200), rng.integers(0, 20, 200)
+        qx, qy = rng.integers(0, 30, 50), rng.integers(0, 20, 50)
+        index = BucketIndex(x, y, 30, 20, 3)
+        before = metrics.counters.get('neighbor_queries', 0)
+        pairs = set()
+        for query, row in index.box_pairs(qx, qy, 3, 64):
+            pairs.update(zip(query.tolist(), row.tolist()))
+        self.assertEqual(metrics.counters['neighbor_queries'] - before, len(qx))
+        near = (np.abs(x[None, :] - qx[:, None]) <= 3) & (np.abs(y[None, :] - qy[:, None]) <= 3)
+        self.assertTrue(set(zip(*np.nonzero(near))) <= pairs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+# test_stats.py
+
+import unittest
+from src.stats import WorldStats
+from src.tests.helpers import WorldTestCase
+
+class WorldStatsTest(WorldTestCase):
+    def test_running_totals_match_a_full_recount(self):
+        # Generation ends, births, deaths, food spawns and pheromone decay all come up
+        world = self.make_world(30, 30, 300, seed=9, steps_per_generation=7, min_reproduction_energy=0,
+                                food_spawn_rate=2.5)
+        for step in range(40):
+            # Brains rarely emit early on, so lay some pheromone to decay
+            if step % 5 == 0:
+                world.deposit_pheromones(world.population.x[:30], world.population.y[:30])
+            world.update()
+            recount = WorldStats()
+            recount.ticks = world.stats.ticks
+            recount.resync(world)
+            running, expected = world.stats.summary(), recount.summary()
+            for key, value in expected.items():
+                self.assertAlmostEqual(running[key], value, places=9, msg=key)
+            self.assertEqual(world.stats.population, len(world.population))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# test_sweep.py
+
+import os
+import tempfile
+import unittest
+from src.sweep import plan_runs, run_sweep, load_results
+from src.tests.helpers import WorldTestCase
+
+class Interrupted(Exception):
+    pass
+
+class SweepTest(WorldTestCase):
+    def test_rerun_skips_completed_runs(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'results.jsonl')
+        base = {'width': 20, 'height': 20, 'initial_population': 40}
+        runs = plan_runs(base, [{'food_spawn_rate': rate} for rate in (0.5, 2.0)], seeds=[1, 2], steps=5)
+
+        def interrupt(result, completed, total):
+            raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            run_sweep(runs, path, workers=1, on_result=interrupt)
+        first = load_results(path)
+        self.assertEqual(len(first), 1)
+        with open(path, 'a') as file:
+            file.write('{"run_id": "cut sh')  # A line a crash left unfinished
+
+        executed = []
+        results = run_sweep(runs, path, workers=2, on_result=lambda result, *_: executed.append(result['run_id']))
+        self.assertNotIn(first[0]['run_id'], executed)
+        self.assertEqual(len(executed), len(runs) - 1)
+        self.assertEqual(sorted(result['run_id'] for result in results), sorted(run['run_id'] for run in runs))
+        self.assertEqual(len(load_results(path)), len(runs))
+        # Nothing is left to run
+        executed.clear()
+        self.assertEqual(len(run_sweep(runs, path, workers=1, on_result=executed.append)), len(runs))
+        self.assertEqual(executed, [])
+
+if __name__ == '__main__':
+    unittest.main()
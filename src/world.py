@@ -1,12 +1,26 @@
 # world.py
 
+import time
 import numpy as np
 import logging
 from .creature import Creature, Gene
-from .utils import handle_index_error, logging_decorator
-from PIL import Image
-import io
-import base64
+from .utils import handle_index_error
+from .spatial import OccupancyGrid, BucketIndex
+from .sensing import sense_population
+from .parallel import TilePool
+from .events import EventLog, MOVE, PHEROMONE, BIRTH, DEATH, FOOD
+from .metrics import metrics
+from .stats import WorldStats
+from .analytics import GenomeAnalytics
+from .pheromones import PheromoneField
+from .food import FoodLayer
+from .rng import RandomStreams
+from .actions import (action_targets, resolve_collisions, MOVE_RL, SET_OSCILLATOR_PERIOD,
+                      SET_LONGPROBE_DIST, SET_RESPONSIVENESS, EMIT_SIGNAL0)
+from .genome import random_genomes, crossover, mutate, similarity
+from .population import Population
+from .frames import encode_frame
+from .render import WorldSnapshot
 from .config import (
     WORLD_WIDTH, WORLD_HEIGHT, INITIAL_POPULATION,
     DEFAULT_MIN_REPRODUCTION_ENERGY, DEFAULT_MAX_AGE,
@@ -14,12 +28,27 @@ from .config import (
     DEFAULT_MOVE_ENERGY_COST, DEFAULT_IDLE_ENERGY_COST,
     DEFAULT_PHEROMONE_ENERGY_COST, DEFAULT_LONG_PROBE_ENERGY_COST,
     MUTATION_RATE, NUM_SENSORY_NEURONS, NUM_INTERNAL_NEURONS,
-    NUM_ACTION_NEURONS, DEFAULT_NUM_GENES
+    NUM_ACTION_NEURONS, DEFAULT_NUM_GENES, FRAME_FORMATS, DEFAULT_FRAME_FORMAT,
+    DEFAULT_STEPS_PER_GENERATION, DEFAULT_WORKERS, DEFAULT_EVENT_LOG, EVENT_LOG_CAPACITY,
+    MATING_RADIUS, PARTNER_RADIUS, PAIR_BATCH_SIZE, STATS_RESYNC_INTERVAL,
+    GENOME_STATS_INTERVAL, PHEROMONE_DECAY, PHEROMONE_EPSILON, FOOD_SPAWN_RATE, DEFAULT_COLLISIONS
 )
 from .creature import Gene
 
 class World:
     def __init__(self, width, height, initial_population, params):
+        self.setup(width, height, params, initial_population)
+        self.initialize_population(initial_population)
+
+    @classmethod
+    def from_state(cls, width, height, params, capacity=0):
+        # An empty world to restore saved state into: no creatures, no food and
+        # no events, so nothing is drawn or logged before the state arrives
+        world = cls.__new__(cls)
+        world.setup(width, height, params, capacity)
+        return world
+
+    def setup(self, width, height, params, capacity):
         self.width = max(1, width)
         self.height = max(1, height)
         self.params = {
@@ -32,42 +61,122 @@ class World:
             'pheromone_energy_cost': params.get('pheromone_energy_cost', DEFAULT_PHEROMONE_ENERGY_COST),
             'long_probe_energy_cost': params.get('long_probe_energy_cost', DEFAULT_LONG_PROBE_ENERGY_COST),
             'num_genes': int(params.get('num_genes', DEFAULT_NUM_GENES)),
+            'steps_per_generation': max(1, int(params.get('steps_per_generation', DEFAULT_STEPS_PER_GENERATION))),
+            'workers': max(0, int(params.get('workers', DEFAULT_WORKERS))),
+            'event_log': bool(params.get('event_log', DEFAULT_EVENT_LOG)),
+            'event_sample_rates': dict(params.get('event_sample_rates') or {}),
+            'event_log_path': params.get('event_log_path'),
+            'seed': params.get('seed'),
+            'collisions': bool(params.get('collisions', DEFAULT_COLLISIONS)),
+            'food_spawn_rate': max(0.0, float(params.get('food_spawn_rate', FOOD_SPAWN_RATE))),
+            'pheromone_epsilon': float(params.get('pheromone_epsilon', PHEROMONE_EPSILON)),
+            'genome_stats_interval': max(1, int(params.get('genome_stats_interval', GENOME_STATS_INTERVAL))),
         }
-        self.creatures = []
-        self.pheromones = np.zeros((width, height))
-        self.food = np.zeros((width, height))
+        self.rng = RandomStreams(self.params['seed'])
+        self.params['seed'] = self.rng.seed  # Recorded, so an unseeded run can be replayed
+        # With workers, the grids and columns they read live in the pool's shared
+        # memory from the start, so a step hands them over without copying
+        self.tile_pool = (TilePool(self.width, self.height, self.params['workers'])
+                          if self.params['workers'] > 1 else None)
+        allocate = self.tile_pool.allocate if self.tile_pool is not None else np.zeros
+        self.population = Population(self.params['num_genes'], capacity, allocate)
+        self.food_layer = FoodLayer(self.width, self.height)
+        self.occupancy = OccupancyGrid(self.width, self.height, allocate)
+        self.mating_requests = []  # Rows that asked to mate this step, resolved after all actions
+        self.events = (EventLog(EVENT_LOG_CAPACITY, self.params['event_sample_rates'], self.params['event_log_path'])
+                       if self.params['event_log'] else None)
+        self.stats = WorldStats()  # Kept up to date by every write below, read by get_stats
+        self.pheromone_field = PheromoneField(self.width, self.height, PHEROMONE_DECAY, self.params['pheromone_epsilon'],
+                                              on_evict=self.stats.pheromones_evicted, allocate=allocate)
+        self.genome_analytics = GenomeAnalytics(self.params['genome_stats_interval'])
+        # Cells whose rendering may differ from the frame of step `changed_since`,
+        # for delta frames; None when changes were made outside a step
+        self.changed_cells = []
+        self.changed_since = None
+        self.stepping = False
+        self.untracked_changes = True
         self.step_count = 0
         self.generation = 0
         self.logger = logging.getLogger(__name__)
-        self.initialize_population(initial_population)
+
+    @property
+    def creatures(self):
+        # Compatibility view of the population; views go stale once rows are compacted
+        return list(self.population)
+
+    @property
+    def pheromones(self):
+        # Dense view of the sparse field, brought up to date on read
+        return self.pheromone_field.materialize()
+
+    @pheromones.setter
+    def pheromones(self, grid):
+        self.pheromone_field.load(grid)
+        self.untracked_change()
+
+    @property
+    def food(self):
+        # Dense copy of the sparse food layer
+        return self.food_layer.dense()
+
+    @food.setter
+    def food(self, grid):
+        self.food_layer.load(grid)
+        self.untracked_change()
 
     def initialize_population(self, initial_population):
-        for _ in range(initial_population):
-            x = np.random.randint(0, self.width)
-            y = np.random.randint(0, self.height)
-            creature = Creature(x, y, 0, self.params['num_genes'])
-            self.creatures.append(creature)
+        rng = self.rng.stream('init')
+        x = rng.integers(0, self.width, initial_population)
+        y = rng.integers(0, self.height, initial_population)
+        genomes = random_genomes((initial_population, self.params['num_genes']), rng)
+        rows = self.population.spawn(x, y, 0, genomes, rng=rng)
+        self.stats.add_creatures(self.population.age[rows])
+        self.occupancy.rebuild(self.population.x, self.population.y)
         self.respawn_food()  # Ensure food is generated at the start
 
-    @logging_decorator
     def update_creatures(self):
-        if not self.creatures:
+        if len(self.population) == 0:
             self.logger.warning("No creatures to update")
             return
 
         try:
-            for creature in self.creatures:
-                inputs = self.get_creature_inputs(creature)
-                outputs = creature.predict(inputs)
-                self.process_creature_actions(creature, outputs)
-
-            # Remove creatures with no energy
-            self.creatures = [c for c in self.creatures if c.energy > 0]
+            # Sense from a snapshot of the step's start; children born this step act next step
+            pop = self.population
+            count = len(pop)
+            outputs = self.evaluate_brains()
+            self.stats.aged()  # Every row below ages by one in apply_actions
+            with metrics.timed('actions'):
+                old_x, old_y = pop.x.copy(), pop.y.copy()
+                self.apply_actions(np.arange(count), outputs)
+            with metrics.timed('mating'):
+                self.resolve_mating_requests()
+            # Rows only move at compaction, so the first `count` rows are still the movers
+            metrics.count('moves', int(np.count_nonzero((pop.x[:count] != old_x) | (pop.y[:count] != old_y))))
+
+            with metrics.timed('death_filtering'):
+                self.remove_dead_creatures()
 
         except Exception as e:
             self.logger.error(f"Error in update_creatures: {str(e)}", exc_info=True)
             raise
 
+    def evaluate_brains(self):
+        # Brain outputs for every row, from the state at the start of the step
+        if self.tile_pool is not None:
+            with metrics.timed('inference'):  # Tile workers sense and infer together
+                return self.tile_pool.evaluate(self)
+        with metrics.timed('sensing'):
+            inputs = self.get_population_inputs()
+        with metrics.timed('inference'):
+            return self.population.brain_batch().predict(inputs)
+
+    def close(self):
+        if self.tile_pool is not None:
+            self.tile_pool.close()
+            self.tile_pool = None
+        if self.events is not None:
+            self.events.close()
+
     def get_creature_inputs(self, creature):
         inputs = [
             creature.x / self.width,  # LOC_X
@@ -87,7 +196,7 @@ class World:
             creature.age / Creature.MAX_AGE,  # AGE
             self.is_blocked_fd(creature),  # BARRIER_FWD
             self.is_blocked_lr(creature),  # BARRIER_LR
-            np.random.random(),  # RANDOM
+            self.rng.random('sensing'),  # RANDOM
             self.get_pheromone_density(creature),  # SIGNAL0
             self.get_pheromone_gradient_fd(creature),  # SIGNAL0_FWD
             self.get_pheromone_gradient_lr(creature),  # SIGNAL0_LR
@@ -95,158 +204,296 @@ class World:
         assert len(inputs) == 21, f"Expected 21 inputs, got {len(inputs)}"
         return inputs
 
+    def get_population_inputs(self):
+        inputs = sense_population(self)
+        assert inputs.shape[1] == 21, f"Expected 21 inputs, got {inputs.shape[1]}"
+        return inputs
+
     def process_creature_actions(self, creature, outputs):
+        # One creature's share of update_creatures: the same kernel on a one-row
+        # mask, with its aging recorded in the stats and its mating request resolved
+        rows = np.array([creature.index])
+        self.stats.remove_creatures(self.population.age[rows])
+        self.apply_actions(rows, np.asarray(outputs, dtype=np.float64)[None, :])
+        self.stats.add_creatures(self.population.age[rows])
+        self.resolve_mating_requests()
+
+    def apply_actions(self, rows, outputs):
+        # Applies the brain outputs of `rows` as whole-column updates: settings,
+        # pheromone deposits on the starting cells, movement, energy and aging
         try:
-            # SET_LONGPROBE_DIST
-            creature.long_probe_distance = int(np.clip(outputs[Creature.ACTION_NEURONS.index('SET_LONGPROBE_DIST')] * 5, 1, 5))
+            pop = self.population
+            rows = np.asarray(rows, dtype=np.int64)
+            x, y = pop.x[rows].astype(np.int64), pop.y[rows].astype(np.int64)
+            direction = pop.direction[rows]
+            energy = pop.energy[rows]
 
-            # SET_OSCILLATOR_PERIOD
-            creature.oscillator_period = int(np.clip(outputs[Creature.ACTION_NEURONS.index('SET_OSCILLATOR_PERIOD')] * 10, 1, 10))
-            
-            # Check for reproduction
-            if outputs[Creature.ACTION_NEURONS.index('SET_OSCILLATOR_PERIOD')] > 0.5:
-                self.attempt_reproduction(creature)
+            pop.long_probe_distance[rows] = np.clip(outputs[:, SET_LONGPROBE_DIST] * 5, 1, 5).astype(np.int64)
+            pop.oscillator_period[rows] = np.clip(outputs[:, SET_OSCILLATOR_PERIOD] * 10, 1, 10).astype(np.int64)
+            # Reproduction requests of a step are paired in one batch
+            self.mating_requests.extend(rows[outputs[:, SET_OSCILLATOR_PERIOD] > 0.5].tolist())
 
             # EMIT_SIGNAL0
-            if outputs[Creature.ACTION_NEURONS.index('EMIT_SIGNAL0')] > 0.5:
-                self.pheromones[creature.x, creature.y] = 1.0
-                creature.energy -= self.params['pheromone_energy_cost']
-                self.log_event("Pheromone", f"Creature {creature.id} spawned pheromone at ({creature.x}, {creature.y})")
+            emit = outputs[:, EMIT_SIGNAL0] > 0.5
+            if emit.any():
+                self.deposit_pheromones(x[emit], y[emit])
+                energy[emit] -= self.params['pheromone_energy_cost']
+                if self.events is not None:
+                    self.events.record_many(PHEROMONE, pop.id[rows[emit]], x[emit], y[emit])
 
             # Movement
-            move_x = outputs[Creature.ACTION_NEURONS.index('MOVE_X')]
-            move_y = outputs[Creature.ACTION_NEURONS.index('MOVE_Y')]
-            move_forward = outputs[Creature.ACTION_NEURONS.index('MOVE_FORWARD')] > 0.5
-            move_rl = outputs[Creature.ACTION_NEURONS.index('MOVE_RL')]
-            move_random = outputs[Creature.ACTION_NEURONS.index('MOVE_RANDOM')] > 0.5
-
-            old_x, old_y = creature.x, creature.y
-
-            if move_forward:
-                creature.x, creature.y = self.get_forward_position(creature)
-            elif move_random:
-                creature.x, creature.y = self.get_random_neighbor(creature)
-            else:
-                dx = int(np.clip(move_x * 3, -1, 1))
-                dy = int(np.clip(move_y * 3, -1, 1))
-                creature.x = (creature.x + dx) % self.width
-                creature.y = (creature.y + dy) % self.height
-
-            if move_rl != 0:
-                creature.direction = (creature.direction + (1 if move_rl > 0 else -1)) % 8
-
-            if (creature.x, creature.y) != (old_x, old_y):
-                creature.energy -= self.params['move_energy_cost']
-                self.log_event("Move", f"Creature {creature.id} moved from ({old_x}, {old_y}) to ({creature.x}, {creature.y})")
-            else:
-                creature.energy -= self.params['idle_energy_cost']
-
-            creature.last_move_x = creature.x - old_x
-            creature.last_move_y = creature.y - old_y
+            new_x, new_y = action_targets(x, y, direction, outputs, self.rng.stream('actions'), self.width, self.height)
+            moving = (new_x != x) | (new_y != y)
+            if self.params['collisions']:
+                cells = pop.x.astype(np.int64) * self.height + pop.y
+                targets = cells.copy()
+                targets[rows] = new_x * self.height + new_y
+                everyone = np.zeros(len(pop), dtype=bool)
+                everyone[rows] = moving
+                moving = resolve_collisions(cells, targets, everyone)[rows]
+                new_x, new_y = np.where(moving, new_x, x), np.where(moving, new_y, y)
+            pop.x[rows] = new_x
+            pop.y[rows] = new_y
+            move_rl = outputs[:, MOVE_RL]
+            pop.direction[rows] = (direction + np.sign(move_rl).astype(np.int64)) % 8
+            if moving.any():
+                self.occupancy.move_many(rows[moving], new_x[moving], new_y[moving])
+                self.mark_changed(x[moving], y[moving])
+                self.mark_changed(new_x[moving], new_y[moving])
+                if self.events is not None:
+                    self.events.record_many(MOVE, pop.id[rows[moving]], new_x[moving], new_y[moving])
+            energy -= np.where(moving, self.params['move_energy_cost'], self.params['idle_energy_cost'])
+            pop.last_move_x[rows] = new_x - x
+            pop.last_move_y[rows] = new_y - y
 
             # SET_RESPONSIVENESS
-            creature.responsiveness = np.clip(outputs[Creature.ACTION_NEURONS.index('SET_RESPONSIVENESS')], 0, 1)
+            pop.responsiveness[rows] = np.clip(outputs[:, SET_RESPONSIVENESS], 0, 1)
 
             # Aging and energy cap
-            creature.age += 1
-            creature.energy = min(creature.energy, Creature.MAX_ENERGY)
+            pop.age[rows] += 1
+            pop.energy[rows] = np.minimum(energy, Creature.MAX_ENERGY)
 
         except Exception as e:
-            self.logger.error(f"Error processing creature {creature.id}: {str(e)}", exc_info=True)
+            self.logger.error(f"Error applying actions: {str(e)}", exc_info=True)
             raise
 
+    def deposit_pheromones(self, x, y):
+        cells = np.unique(np.asarray(x, dtype=np.int64) * self.height + y)
+        x, y = cells // self.height, cells % self.height
+        self.mark_changed(x, y)
+        self.stats.pheromone_set(self.pheromones[x, y], np.ones(len(cells)))
+        self.pheromone_field.deposit_many(x, y, 1.0)
+
     def attempt_reproduction(self, creature):
-        for partner in self.creatures:
-            if partner != creature and self.distance(creature, partner) <= 10:
-                if partner.oscillator_period > 0.5:
-                    child = self.create_child(creature, partner)
-                    if child:
-                        self.creatures.append(child)
-                        creature.energy -= self.params['reproduction_energy_cost']
-                        partner.energy -= self.params['reproduction_energy_cost']
-                        self.log_event("Reproduction", f"Creature {creature.id} and {partner.id} reproduced, creating creature {child.id}")
-                    break
+        self.mate([creature.index])
+
+    def resolve_mating_requests(self):
+        rows, self.mating_requests = self.mating_requests, []
+        self.mate(rows)
+
+    def mate(self, rows):
+        # Each row mates with the first row in row order within MATING_RADIUS whose
+        # oscillator qualifies; every child is spawned in one batch
+        pop = self.population
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        partners = self.first_in_radius(rows, MATING_RADIUS, pop.oscillator_period > 0.5)
+        found = partners >= 0
+        self.pair_up(rows[found], partners[found])
+
+    def pair_up(self, parents1, parents2):
+        self.spawn_children(parents1, parents2)
+        # A creature in several pairings pays for each of them
+        energy = self.population.energy
+        np.subtract.at(energy, parents1, self.params['reproduction_energy_cost'])
+        np.subtract.at(energy, parents2, self.params['reproduction_energy_cost'])
+
+    def first_in_radius(self, rows, radius, eligible):
+        # Lowest eligible row within Euclidean `radius` of each query row, or -1
+        pop = self.population
+        x, y = pop.x.astype(np.int64), pop.y.astype(np.int64)
+        index = BucketIndex(x, y, self.width, self.height, radius)
+        none = np.iinfo(np.int64).max
+        partners = np.full(len(rows), none, dtype=np.int64)
+        for query, candidate in index.box_pairs(x[rows], y[rows], radius, PAIR_BATCH_SIZE):
+            owner = rows[query]
+            match = (((x[candidate] - x[owner]) ** 2 + (y[candidate] - y[owner]) ** 2 <= radius * radius) &
+                     (candidate != owner) & eligible[candidate])
+            np.minimum.at(partners, query[match], candidate[match])
+        partners[partners == none] = -1
+        return partners
+
+    def random_in_box(self, rows, radius, eligible):
+        # A uniformly chosen eligible row within `radius` cells along both axes, or -1
+        pop = self.population
+        x, y = pop.x.astype(np.int64), pop.y.astype(np.int64)
+        index = BucketIndex(x, y, self.width, self.height, radius)
+        partners = np.full(len(rows), -1, dtype=np.int64)
+        for query, candidate in index.box_pairs(x[rows], y[rows], radius, PAIR_BATCH_SIZE):
+            owner = rows[query]
+            match = ((np.abs(x[candidate] - x[owner]) <= radius) & (np.abs(y[candidate] - y[owner]) <= radius) &
+                     (candidate != owner) & eligible[candidate])
+            query, candidate = query[match], candidate[match]
+            if len(query) == 0:
+                continue
+            # The highest random key within each query's candidates wins
+            order = np.lexsort((self.rng.stream('reproduction').random(len(query)), query))
+            last = np.flatnonzero(np.append(query[order][1:] != query[order][:-1], True))
+            partners[query[order][last]] = candidate[order][last]
+        return partners
+
+    def remove_dead_creatures(self):
+        alive = self.population.energy > 0
+        if not alive.all():
+            metrics.count('deaths', len(alive) - int(np.count_nonzero(alive)))
+            if self.events is not None:
+                pop = self.population
+                dead = ~alive
+                self.events.record_many(DEATH, pop.id[dead], pop.x[dead], pop.y[dead], value=pop.energy[dead])
+            self.mark_changed(self.population.x[~alive], self.population.y[~alive])
+            self.stats.remove_creatures(self.population.age[~alive])
+            self.population.compact(alive)
+            self.occupancy.rebuild(self.population.x, self.population.y)
 
     def distance(self, creature1, creature2):
         return np.sqrt((creature1.x - creature2.x) ** 2 + (creature1.y - creature2.y) ** 2)
 
     def update(self):
         try:
+            self.rng.begin_step(self.step_count)
+            self.begin_changes()
             self.perform_step()
             self.step_count += 1
             
-            if self.step_count % self.params.get('steps_per_generation', 100) == 0:
+            if self.step_count % self.params['steps_per_generation'] == 0:
                 self.end_generation()
         except Exception as e:
             self.logger.error(f"Error updating world: {str(e)}", exc_info=True)
             raise
+        finally:
+            self.stepping = False
+
+    def begin_changes(self):
+        # Every active pheromone cell fades this step
+        self.changed_since = None if self.untracked_changes else self.step_count
+        self.changed_cells = [self.pheromone_field.store.cells[:len(self.pheromone_field)].copy()]
+        self.untracked_changes = False
+        self.stepping = True
+
+    def mark_changed(self, x, y):
+        if not self.stepping:
+            self.untracked_change()
+        self.changed_cells.append(np.asarray(x, dtype=np.int64) * self.height + np.asarray(y, dtype=np.int64))
+
+    def untracked_change(self):
+        # A change outside a step: the frames until the next step's end are keyframes
+        self.untracked_changes = True
+        self.changed_since = None
 
     def update_pheromones(self):
-        self.pheromones *= 0.99
+        self.pheromone_field.tick()
+        self.stats.pheromones_decayed(PHEROMONE_DECAY)
 
     def perform_step(self):
         self.step_count += 1
+        if self.events is not None:
+            self.events.step = self.step_count
         if self.step_count % 50 == 0:
             self.generation += 1
             self.logger.info(f"New generation marker: {self.generation}")
 
         self.update_creatures()
-        self.update_pheromones()
-        self.update_food()
+        with metrics.timed('pheromone_decay'):
+            self.update_pheromones()
+        with metrics.timed('food'):
+            self.update_food()
+        if self.step_count % STATS_RESYNC_INTERVAL == 0:
+            # Bounds the float drift of the running totals
+            self.stats.resync(self)
 
-        self.logger.debug(f"Step {self.step_count} completed. Population: {len(self.creatures)}")
+        self.logger.debug(f"Step {self.step_count} completed. Population: {len(self.population)}")
 
     def end_generation(self):
         self.generation += 1
         self.logger.info(f"Generation {self.generation} completed")
         
-        self.evaluate_creatures()
-        self.reproduce()
-        self.remove_unfit_creatures()
+        with metrics.timed('reproduction'):
+            self.evaluate_creatures()
+            self.reproduce()
+        with metrics.timed('selection'):
+            culled = len(self.population)
+            self.remove_unfit_creatures()
+            metrics.count('culled', culled - len(self.population))
 
     def evaluate_creatures(self):
-        for creature in self.creatures:
-            creature.fitness = creature.energy  # Simple fitness function based on energy
+        self.population.fitness = self.population.energy  # Simple fitness function based on energy
 
     def remove_unfit_creatures(self):
-        self.creatures.sort(key=lambda c: c.fitness, reverse=True)
-        self.creatures = self.creatures[:len(self.creatures)//2]  # Keep top 50%
+        # Stable descending sort, same tie order as list.sort(reverse=True)
+        order = np.argsort(-self.population.fitness, kind='stable')
+        culled = order[len(order)//2:]
+        self.mark_changed(self.population.x[culled], self.population.y[culled])
+        self.stats.remove_creatures(self.population.age[culled])
+        self.population.select(order[:len(order)//2])  # Keep top 50%
+        self.occupancy.rebuild(self.population.x, self.population.y)
 
     def reproduce(self):
-        new_creatures = []
-        for creature in self.creatures:
-            reproduction_chance = creature.get_average_reproduction_chance()
-            if (creature.energy > self.params['min_reproduction_energy'] and
-                np.random.random() < reproduction_chance):
-                partner = self.find_partner(creature)
-                if partner:
-                    child = self.create_child(creature, partner)
-                    new_creatures.append(child)
-                    creature.energy -= self.params['reproduction_energy_cost']
-                    partner.energy -= self.params['reproduction_energy_cost']
-                    self.log_event("Reproduction", f"Creature {creature.id} and {partner.id} reproduced, creating creature {child.id}")
-        self.creatures.extend(new_creatures)
+        # Every pairing is resolved from the energies at the start of the pass, in one batch
+        pop = self.population
+        if len(pop) == 0:
+            return
+        rolls = self.rng.stream('reproduction').random(len(pop))
+        initiators = np.flatnonzero((pop.energy > self.params['min_reproduction_energy']) &
+                                    (rolls < pop.reproduction_chances()))
+        partners = self.random_in_box(initiators, PARTNER_RADIUS, self.partner_eligibility())
+        found = partners >= 0
+        self.pair_up(initiators[found], partners[found])
+
+    def partner_eligibility(self):
+        return (self.population.energy > 30) & (self.population.age < 100)
 
     def find_partner(self, creature):
-        potential_partners = [c for c in self.creatures if c != creature and
-                              abs(c.x - creature.x) <= 1 and abs(c.y - creature.y) <= 1 and
-                              c.energy > 30 and c.age < 100]
-        return np.random.choice(potential_partners) if potential_partners else None
+        pop = self.population
+        metrics.count('neighbor_queries')
+        candidates = self.occupancy.rows_in_box(creature.x - PARTNER_RADIUS, creature.x + PARTNER_RADIUS,
+                                                creature.y - PARTNER_RADIUS, creature.y + PARTNER_RADIUS)
+        candidates = candidates[(candidates != creature.index) & self.partner_eligibility()[candidates]]
+        return pop[int(self.rng.stream('reproduction').choice(candidates))] if len(candidates) else None
 
     def create_child(self, parent1, parent2):
+        rows = self.spawn_children([parent1.index], [parent2.index])
+        return self.population[int(rows[0])]
+
+    def spawn_children(self, parents1, parents2):
         try:
-            child_x, child_y = (parent1.x + parent2.x) // 2, (parent1.y + parent2.y) // 2
-            child = Creature(child_x, child_y, max(parent1.generation, parent2.generation) + 1, num_genes=self.params['num_genes'])
-            
+            pop = self.population
+            parents1 = np.asarray(parents1, dtype=np.int64)
+            parents2 = np.asarray(parents2, dtype=np.int64)
+            if len(parents1) == 0:
+                return parents1
+            child_x = (pop.x[parents1] + pop.x[parents2]) // 2
+            child_y = (pop.y[parents1] + pop.y[parents2]) // 2
+            generation = np.maximum(pop.generation[parents1], pop.generation[parents2]) + 1
+
             # Crossover
-            child.genome = parent1.crossover(parent2)
-            
+            rng = self.rng.stream('births')
+            genomes = crossover(pop.genomes[parents1], pop.genomes[parents2], rng)
+
             # Mutation
-            mutation_rate = MUTATION_RATE / (1 + 0.01 * self.generation)            
-            child.mutate(mutation_rate)
-            
-            child.brain = child.create_brain()
-            return child
+            mutation_rate = MUTATION_RATE / (1 + 0.01 * self.generation)
+            genomes = mutate(genomes, mutation_rate, rng)
+
+            # Brains are compiled once, from the final genomes
+            rows = pop.spawn(child_x, child_y, generation, genomes, rng=rng)
+            self.mark_changed(child_x, child_y)
+            self.stats.add_creatures(pop.age[rows])
+            self.occupancy.add_many(rows, child_x, child_y)
+            metrics.count('births', len(rows))
+            if self.events is not None:
+                self.events.record_many(BIRTH, pop.id[rows], child_x, child_y, other=pop.id[parents1],
+                                        partner=pop.id[parents2])
+            return rows
         except Exception as e:
             self.logger.error(f"Error creating child: {str(e)}", exc_info=True)
             raise
@@ -256,10 +503,20 @@ class World:
             self.respawn_food()
 
     def respawn_food(self):
-        if np.random.random() < 0.7:
-            x, y = np.random.randint(0, self.width), np.random.randint(0, self.height)
-            self.food[x, y] = np.random.uniform(75, 150)
-            logging.info(f"New food spawned at ({x}, {y}) with energy {self.food[x, y]:.2f}")
+        # Whole cells of the rate always spawn, the fraction is a chance
+        rng = self.rng.stream('food')
+        rate = self.params['food_spawn_rate']
+        count = int(rate) + (rng.random() < rate - int(rate))
+        if count == 0:
+            return
+        x = rng.integers(0, self.width, count)
+        y = rng.integers(0, self.height, count)
+        energy = rng.uniform(75, 150, count)
+        replaced = self.food_layer.spawn(x, y, energy)
+        self.mark_changed(x, y)
+        self.stats.food_set(replaced, energy)
+        if self.events is not None:
+            self.events.record_many(FOOD, np.full(count, -1), x, y, value=energy)
 
     # Helper methods for get_creature_inputs
     def get_pheromone_gradient_lr(self, creature):
@@ -278,8 +535,8 @@ class World:
         return np.mean(neighborhood)
 
     def is_blocked_lr(self, creature):
-        left_blocked = creature.x == 0 or any(c.x == creature.x - 1 and c.y == creature.y for c in self.creatures)
-        right_blocked = creature.x == self.width - 1 or any(c.x == creature.x + 1 and c.y == creature.y for c in self.creatures)
+        left_blocked = creature.x == 0 or self.occupancy.count_at(creature.x - 1, creature.y) > 0
+        right_blocked = creature.x == self.width - 1 or self.occupancy.count_at(creature.x + 1, creature.y) > 0
         return (left_blocked + right_blocked) / 2  # Average of left and right blockage
 
     def is_blocked_fd(self, creature):
@@ -290,20 +547,19 @@ class World:
         return np.sin(2 * np.pi * self.step_count / creature.oscillator_period)
 
     def get_population_gradient_lr(self, creature):
-        left_count = sum(1 for c in self.creatures if c.x == creature.x - 1 and abs(c.y - creature.y) <= 1)
-        right_count = sum(1 for c in self.creatures if c.x == creature.x + 1 and abs(c.y - creature.y) <= 1)
+        left_count = self.occupancy.count_in_box(creature.x - 1, creature.x - 1, creature.y - 1, creature.y + 1)
+        right_count = self.occupancy.count_in_box(creature.x + 1, creature.x + 1, creature.y - 1, creature.y + 1)
         return (right_count - left_count + 3) / 6  # Normalize to 0-1 range
 
     def get_population_density(self, creature):
-        neighborhood = [(x, y) for x in range(creature.x-1, creature.x+2) for y in range(creature.y-1, creature.y+2)]
-        count = sum(1 for c in self.creatures if (c.x, c.y) in neighborhood)
+        count = self.occupancy.count_in_box(creature.x - 1, creature.x + 1, creature.y - 1, creature.y + 1)
         return count / 9  # Normalize by the size of the neighborhood
 
     def get_population_gradient_fd(self, creature):
         forward_pos = self.get_forward_position(creature)
         backward_pos = self.get_reverse_position(creature)
-        forward_count = sum(1 for c in self.creatures if (c.x, c.y) == forward_pos)
-        backward_count = sum(1 for c in self.creatures if (c.x, c.y) == backward_pos)
+        forward_count = self.occupancy.count_at(*forward_pos)
+        backward_count = self.occupancy.count_at(*backward_pos)
         return (forward_count - backward_count + 1) / 2  # Normalize to 0-1 range
 
     def get_long_range_population_fd(self, creature):
@@ -312,7 +568,7 @@ class World:
         for i in range(1, creature.long_probe_distance + 1):
             x = (forward_pos[0] + i * (forward_pos[0] - creature.x)) % self.width
             y = (forward_pos[1] + i * (forward_pos[1] - creature.y)) % self.height
-            count += sum(1 for c in self.creatures if c.x == x and c.y == y)
+            count += self.occupancy.count_at(x, y)
         return count / (creature.long_probe_distance * 5)  # Normalize
 
     def get_long_range_blockage_fd(self, creature):
@@ -320,7 +576,7 @@ class World:
         for i in range(1, creature.long_probe_distance + 1):
             x = (forward_pos[0] + i * (forward_pos[0] - creature.x)) % self.width
             y = (forward_pos[1] + i * (forward_pos[1] - creature.y)) % self.height
-            if any(c.x == x and c.y == y for c in self.creatures):
+            if self.occupancy.count_at(x, y) > 0:
                 return i / creature.long_probe_distance
         return 1.0
 
@@ -341,51 +597,47 @@ class World:
         return 0.0
 
     def calculate_genetic_similarity(self, creature1, creature2):
-        similar_genes = sum(1 for g1, g2 in zip(creature1.genome, creature2.genome)
-                            if g1.source_type == g2.source_type and g1.source_num == g2.source_num
-                            and g1.sink_type == g2.sink_type and g1.sink_num == g2.sink_num)
-        return similar_genes / len(creature1.genome)
+        return similarity(creature1.genome, creature2.genome)
 
-    def get_world_state(self):
-        state = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        
-        # Set food (green)
-        state[:, :, 1] = np.minimum(self.food, 255).astype(np.uint8)
-        
-        # Set pheromones (blue)
-        state[:, :, 2] = np.minimum(self.pheromones * 255, 255).astype(np.uint8)
-        
-        # Set creatures (red)
-        for creature in self.creatures:
-            state[creature.y, creature.x, 0] = 255
-        
-        return state.tolist()
+    def render_snapshot(self):
+        changed = np.unique(np.concatenate(self.changed_cells)) if self.changed_since is not None else None
+        return WorldSnapshot(self.width, self.height, self.population.x.copy(), self.population.y.copy(),
+                             *self.food_layer.state(), *self.pheromone_field.levels(),
+                             step=self.step_count, since=self.changed_since, changed_cells=changed)
+
+    def render_world_state(self, viewport=None):
+        return self.render_snapshot().render(viewport)
+
+    def get_world_state(self, viewport=None):
+        return self.render_world_state(viewport).tolist()
+
+    def encode_world_state(self, frame_format=DEFAULT_FRAME_FORMAT, frame_encoder=None):
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError(f"Unknown frame format '{frame_format}', expected one of {FRAME_FORMATS}")
+        snapshot = self.render_snapshot()
+        return encode_frame(snapshot.render(), frame_format, frame_encoder, snapshot.changes())
 
-    def simulation_data(self):
+    def get_stats(self):
+        started = time.perf_counter()
         stats = {
             'step_count': self.step_count,
-            'population': len(self.creatures),
+            'population': len(self.population),
             'generation': self.generation,
-            'total_pheromone': np.sum(self.pheromones),
-            'pheromone_locations': np.count_nonzero(self.pheromones),
-            'total_food': np.sum(self.food),
-            'food_locations': np.count_nonzero(self.food),
-            'avg_creature_age': np.mean([c.age for c in self.creatures]) if self.creatures else 0,
-            'oldest_creature_age': max([c.age for c in self.creatures]) if self.creatures else 0
+            **self.stats.summary(),
         }
-        
+        metrics.observe('stats', time.perf_counter() - started)
+        return stats
+
+    def simulation_data(self, frame_format=DEFAULT_FRAME_FORMAT, frame_encoder=None):
         return {
-            'stats': stats,
-            'world_state': self.get_world_state(),
+            'stats': self.get_stats(),
+            'world_state': self.encode_world_state(frame_format, frame_encoder),
             'median_genome': self.get_median_genome(),
             'isSimulationOver': self.is_simulation_over()
         }
 
     def is_simulation_over(self):
-        return len(self.creatures) == 0
-
-    def log_event(self, event_type, details):
-        logging.info(f"{event_type}: {details}")
+        return len(self.population) == 0
 
     def get_reverse_position(self, creature):
         dx, dy = self.get_direction_vector(creature.direction)
@@ -413,32 +665,19 @@ class World:
         return new_x, new_y
 
     def get_random_neighbor(self, creature):
-        dx = np.random.randint(-1, 2)
-        dy = np.random.randint(-1, 2)
+        dx = self.rng.integers('actions', -1, 2)
+        dy = self.rng.integers('actions', -1, 2)
         new_x = (creature.x + dx) % self.width
         new_y = (creature.y + dy) % self.height
         return new_x, new_y
 
     def get_creature_at(self, position):
         x, y = position
-        for creature in self.creatures:
-            if creature.x == x and creature.y == y:
-                return creature
-        return None
+        row = self.occupancy.first_at(x, y)
+        return self.population[row] if row != -1 else None
     
     def get_median_genome(self):
-        if not self.creatures:
-            return []
-        all_genomes = [c.genome for c in self.creatures]
-        median_genome = []
-        for gene_index in range(len(all_genomes[0])):
-            median_gene = Gene()
-            median_gene.source_type = int(np.median([genome[gene_index].source_type for genome in all_genomes]))
-            median_gene.source_num = int(np.median([genome[gene_index].source_num for genome in all_genomes]))
-            median_gene.sink_type = int(np.median([genome[gene_index].sink_type for genome in all_genomes]))
-            median_gene.sink_num = int(np.median([genome[gene_index].sink_num for genome in all_genomes]))
-            median_gene.weight = int(np.median([genome[gene_index].weight for genome in all_genomes]))
-            median_genome.append(median_gene)
-        return [gene.__dict__ for gene in median_genome]
-
+        return self.genome_analytics.get(self)['median_genome']
 
+    def get_genome_stats(self):
+        return self.genome_analytics.get(self)